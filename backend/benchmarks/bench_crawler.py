@@ -0,0 +1,283 @@
+"""
+Tarayıcı benchmark'ı ve doğrulaması: depodaki *_urunler.json verilerinden
+ciceksepeti.vip işaretlemesiyle (o-productCard, o-productDetail__title,
+gallery-top, m-productContent__info) kategori/detay sayfaları ve görseller
+üreten yerel bir HTTP sunucusu başlatır, scraper_v2'yi ona karşı çalıştırır
+ve üretilen JSON'ları beklenen çıktıyla karşılaştırır.
+
+Kullanım (backend/ klasöründen):
+    python benchmarks/bench_crawler.py --categories Gul,Orkide --latency 50 --fail-rate 0.05
+
+Sunucu her yanıtı --latency ms geciktirir; --fail-rate oranındaki yollar ilk
+denemede 503 döner (yeniden deneme yolu), --truncate-rate oranındaki görseller
+ilk denemede gövdenin yarısında bağlantıyı keser (indirme aşamasının üstel
+geri çekilmeli yeniden denemesi) ve ETag/If-None-Match'i destekler.
+Önce tek worker / tek bağlantı ile (eski sıralı tarayıcıya denk), sonra
+varsayılan ayarlarla çalıştırılır; ardından bir ürün değiştirilip aynı
+klasörde artımlı tarama yapılır (yalnızca o ürün yeniden yazılmalı, 304'ler
+dönmeli ve "Ad (2)" kopya klasörleri oluşmamalı). Görsel deposunda her
+benzersiz URL tek blob olmalı ve tüm local_images yolları çözülebilmeli.
+"""
+import argparse
+import asyncio
+import hashlib
+import html
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import urlsplit
+
+REPO_DIR = Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(REPO_DIR))
+
+import scraper_v2  # noqa: E402
+from image_store import ImageStore  # noqa: E402
+
+
+def fixture_path(url: str) -> str:
+    """Gerçek URL'yi yerel sunucudaki yola çevir (CDN host'u yolun başına alınır)"""
+    parts = urlsplit(url)
+    if parts.hostname == "cdn.ciceksepeti.vip":
+        return f"/cdn.ciceksepeti.vip{parts.path}"
+    return parts.path
+
+
+class FixtureSite:
+    """JSON kayıtlarından sayfa gövdeleri ve beklenen scraper çıktısı üretir"""
+
+    def __init__(self, categories, base_url: str):
+        self.base_url = base_url
+        self.pages = {}
+        self.expected = {}
+        for cat in categories:
+            path = REPO_DIR / f"{cat['name'].lower()}_urunler.json"
+            products = [p for p in json.loads(path.read_text(encoding="utf-8")) if p.get("url")]
+            self.add_category(cat, products)
+
+    def local(self, url: str) -> str:
+        return self.base_url + fixture_path(url)
+
+    def add_category(self, cat, products):
+        cards, expected = [], []
+        for product in products:
+            lines = [line.strip() for line in product["description"].split("\n") if line.strip()]
+            contents = [c for c in product["contents"] if c in lines]
+            images = [self.local(url) for url in product["all_images"]]
+            price = product["price"]
+            value = price[:-len(",00 TL")] if price.endswith(",00 TL") else None
+            detail_path = fixture_path(product["url"])
+            first_image = images[0] if images else ""
+            cards.append(
+                '<div class="o-productCard">'
+                f'<a class="o-productCard__link" href="{html.escape(detail_path)}">'
+                f'<img src="{html.escape(first_image)}">'
+                f'<strong class="o-productCard__name">{html.escape(product["name"])}</strong>'
+                + (f'<span class="o-productCard__priceContent--value">{html.escape(value)}</span>' if value else "")
+                + "</a></div>"
+            )
+            body = "".join(
+                f"<ul><li>{html.escape(line)}</li></ul>" if line in contents else f"<p>{html.escape(line)}</p>"
+                for line in lines
+            )
+            gallery = "".join(f'<div class="swiper-slide"><img src="{html.escape(url)}"></div>' for url in images)
+            # Küçük thumbnail'lar /s/ -> /l/ dönüşümüyle aynı görsele çıkar (tekrar ayıklama)
+            thumbs = "".join(
+                f'<div class="swiper-slide" style="background-image: url(&quot;{html.escape(url.replace("/l/", "/s/"))}&quot;)"></div>'
+                for url in images
+            )
+            self.pages[detail_path] = (
+                f'<html><body><h1 class="o-productDetail__title">{html.escape(product["name"])}</h1>'
+                f'<span>Çiçek Sepeti Kodu:</span><span>{html.escape(product["product_code"])}</span>'
+                f'<div class="gallery-top">{gallery}</div><div class="gallery-thumbs">{thumbs}</div>'
+                f'<div class="m-productContent__info">{body}</div></body></html>'
+            ).encode("utf-8")
+            expected.append({
+                "product_code": product["product_code"].strip() or "Bilinmiyor",
+                "name": product["name"],
+                "price": price if value else "Fiyat bulunamadı",
+                "url": self.base_url + detail_path,
+                "all_images": list(dict.fromkeys(images)),
+                "contents": [line for line in lines if line in contents],
+                "description": "\n".join(lines),
+            })
+        self.pages[fixture_path(cat["url"])] = ("<html><body>" + "".join(cards) + "</body></html>").encode("utf-8")
+        self.expected[cat["name"]] = expected
+
+    def body(self, path: str):
+        if path in self.pages:
+            return self.pages[path], "text/html; charset=utf-8"
+        if path.startswith("/cdn.ciceksepeti.vip/"):
+            # Yola göre sabit, ~20 KB görsel gövdesi
+            seed = hashlib.sha256(path.encode("utf-8")).digest()
+            return seed * 640, "image/jpeg"
+        return None, None
+
+
+def start_server(site_holder, latency: float, fail_rate: float, truncate_rate: float = 0.0):
+    failed_once = set()
+    lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            time.sleep(latency)
+            path = urlsplit(self.path).path
+            digest = int(hashlib.md5(path.encode("utf-8")).hexdigest(), 16)
+            with lock:
+                fail = (digest % 1000) < fail_rate * 1000 and path not in failed_once
+                truncate = (
+                    not fail and path.startswith("/cdn.ciceksepeti.vip/")
+                    and (digest // 1000 % 1000) < truncate_rate * 1000 and ("cut", path) not in failed_once
+                )
+                if fail:
+                    failed_once.add(path)
+                if truncate:
+                    failed_once.add(("cut", path))
+            if fail:
+                self.send_response(503)
+                self.send_header("Retry-After", "0")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            body, content_type = site_holder[0].body(path)
+            if body is None:
+                self.send_response(404)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+            if self.headers.get("If-None-Match") == etag:
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            if truncate:
+                self.wfile.write(body[:len(body) // 2])
+                self.close_connection = True
+                return
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, failed_once
+
+
+def verify(site: FixtureSite, output_dir: Path) -> list:
+    problems = []
+    store = ImageStore(str(output_dir / "images"))
+    combined = json.loads((output_dir / "tum_urunler.json").read_text(encoding="utf-8"))
+    expected_all = []
+    for cat_name, expected in site.expected.items():
+        produced = json.loads((output_dir / f"{cat_name.lower()}_urunler.json").read_text(encoding="utf-8"))
+        expected_all.extend(expected)
+        if len(produced) != len(expected):
+            problems.append(f"{cat_name}: {len(produced)} ürün, beklenen {len(expected)}")
+            continue
+        for got, want in zip(produced, expected):
+            for key, value in want.items():
+                if got[key] != value:
+                    problems.append(f"{cat_name}/{want['name']}: {key} farklı")
+            if len(got["local_images"]) != min(5, len(want["all_images"])):
+                problems.append(f"{cat_name}/{want['name']}: {len(got['local_images'])} görsel indirildi")
+            for relative in got["local_images"]:
+                if store.resolve(relative) is None:
+                    problems.append(f"{cat_name}/{want['name']}: {relative} çözülemedi")
+    if [p["url"] for p in combined] != [p["url"] for p in expected_all]:
+        problems.append("tum_urunler.json sırası/içeriği farklı")
+    # Sabit içerik yola bağlı: her benzersiz görsel URL'si tam olarak bir blob
+    unique_urls = {url for p in combined for url in p["all_images"][:5]}
+    if len(store.blobs) != len(unique_urls):
+        problems.append(f"depoda {len(store.blobs)} blob, beklenen {len(unique_urls)}")
+    return problems
+
+
+def folder_names(output_dir: Path) -> list:
+    """Manifest'teki Kategori/Ürün klasörleri"""
+    return sorted({key.rsplit("/", 1)[0] for key in ImageStore(str(output_dir / "images")).products})
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--categories", default="Gul,Orkide,Kokina")
+    parser.add_argument("--latency", type=float, default=30.0, help="Sunucu yanıt gecikmesi (ms)")
+    parser.add_argument("--fail-rate", type=float, default=0.05, help="İlk denemede 503 dönen yol oranı")
+    parser.add_argument("--truncate-rate", type=float, default=0.05, help="İlk denemede yarıda kesilen görsel oranı")
+    parser.add_argument("--skip-sequential", action="store_true", help="Tek worker'lı karşılaştırmayı atla")
+    args = parser.parse_args()
+
+    holder = [None]
+    server, failed_once = start_server(holder, args.latency / 1000, args.fail_rate, args.truncate_rate)
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    selected = [cat for cat in scraper_v2.categories if cat["name"] in args.categories.split(",")]
+    holder[0] = site = FixtureSite(selected, base_url)
+
+    runs = [("paralel", [])]
+    if not args.skip_sequential:
+        runs.insert(0, ("sıralı", ["--workers", "1", "--image-workers", "1", "--per-host", "1", "--rate", "0", "--image-rate", "0"]))
+
+    def crawl(output_dir, extra):
+        failed_once.clear()
+        argv = ["--categories", args.categories, "--base-url", base_url, "--output-dir", output_dir, "--rate", "0", "--image-rate", "0", *extra]
+        with open(os.devnull, "w") as devnull:
+            stdout, sys.stdout = sys.stdout, devnull
+            try:
+                return asyncio.run(scraper_v2.main(scraper_v2.parse_args(argv)))
+            finally:
+                sys.stdout = stdout
+
+    results = []
+    for label, extra in runs:
+        with tempfile.TemporaryDirectory() as tmp:
+            summary = crawl(tmp, extra)
+            results.append((label, summary, verify(site, Path(tmp))))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        crawl(tmp, [])
+        folders_before = folder_names(Path(tmp))
+        # Bir ürünün açıklamasını değiştir: yalnızca o ürün yeniden emit edilmeli
+        product = next(expected[0] for expected in site.expected.values() if expected)
+        path = urlsplit(product["url"]).path
+        site.pages[path] = site.pages[path].replace(b'<div class="m-productContent__info">', b'<div class="m-productContent__info"><p>Yeni satir</p>')
+        product["description"] = "Yeni satir\n" + product["description"]
+        summary = crawl(tmp, [])
+        problems = verify(site, Path(tmp))
+        changed = json.loads((Path(tmp) / "degisiklikler.json").read_text(encoding="utf-8"))
+        if [p["name"] for p in changed] != [product["name"]]:
+            problems.append(f"degisiklikler.json: {len(changed)} ürün, beklenen 1")
+        if folder_names(Path(tmp)) != folders_before:
+            problems.append("artımlı taramada yeni klasör açıldı")
+        results.append(("artımlı", summary, problems))
+
+    server.shutdown()
+    ok = all(not problems for _, _, problems in results)
+    print(f"\n{'mod':<10} {'istek':>7} {'tekrar':>7} {'hata':>5} {'MB':>7} {'sn':>8} {'istek/sn':>9} {'fark':>6}")
+    for label, summary, problems in results:
+        print(f"{label:<10} {summary['requests']:>7} {summary['retries']:>7} {summary['errors']:>5} "
+              f"{summary['bytes'] / 1024 / 1024:>7.1f} {summary['elapsed_seconds']:>8.2f} "
+              f"{summary['requests_per_second']:>9.1f} {len(problems):>6}")
+        if "state" in summary and label == "artımlı":
+            print(f"   {summary['state']}")
+        print(f"   görsel deposu: {summary['images']}")
+        pipeline = summary["image_pipeline"]
+        print(f"   indirme aşaması: {pipeline['done']} görsel, {pipeline['failed']} hata, {pipeline['retries']} tekrar, "
+              f"{pipeline['bytes_per_second'] / 1024:.0f} KB/sn")
+        for problem in problems[:10]:
+            print(f"   {problem}")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
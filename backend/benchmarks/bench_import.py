@@ -0,0 +1,99 @@
+"""
+Import benchmark'ı: depodaki 19 kategori JSON dosyasını eski döngüyle
+(ürün başına insert_one) ve yeni batch'li bulk_write upsert hattıyla içe
+aktarır; süreleri ve ikinci çalıştırmadaki tekrar sayısını karşılaştırır.
+
+Kullanım (backend/ klasöründen):
+    python benchmarks/bench_import.py --batch-size 500 --repeat 3
+
+MONGO_URL ortam değişkeni kullanılır; veriler BENCH_DB_NAME (varsayılan
+"cicekci_bench") veritabanına yazılır.
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+os.environ.setdefault("DB_NAME", "cicekci_bench")
+
+import server  # noqa: E402
+
+
+def load_files(repo_dir: Path):
+    files = []
+    for path in sorted(repo_dir.glob("*_urunler.json")):
+        if path.name == "tum_urunler.json":
+            continue
+        items = [server.ImportProductItem(**p) for p in json.loads(path.read_text(encoding="utf-8"))]
+        files.append((path.name.replace("_urunler.json", ""), items))
+    return files
+
+
+async def legacy_import(items, category_name):
+    """Eski import_products döngüsü: her ürün için ayrı insert_one"""
+    for item in items:
+        category_slug = server.resolve_category_slug(item, category_name)
+        await server.db.products.insert_one({
+            "id": str(uuid.uuid4()),
+            "title": item.name,
+            "description": item.description,
+            "price": server.parse_price(item.price),
+            "category": category_slug,
+            "image": item.all_images[0] if item.all_images else "",
+            "badge": "Yeni",
+            "is_bestseller": False,
+            "product_code": item.product_code,
+            "source_url": item.url,
+            "all_images": item.all_images,
+            "contents": item.contents,
+            "created_at": datetime.now(timezone.utc).isoformat(),
+        })
+
+
+async def bulk_import(items, category_name, batch_size):
+    data = server.ImportRequest(products=items, category_name=category_name)
+    return await server.import_products(data, batch_size=batch_size, background=False)
+
+
+async def run(label, files, importer):
+    started = time.perf_counter()
+    for category_name, items in files:
+        await importer(items, category_name)
+    elapsed = time.perf_counter() - started
+    count = await server.db.products.count_documents({})
+    return elapsed, count
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-size", type=int, default=server.IMPORT_BATCH_SIZE)
+    parser.add_argument("--repeat", type=int, default=3, help="dosya setini kaç kez çoğaltarak import et")
+    args = parser.parse_args()
+
+    server.db = server.client[os.environ.get("BENCH_DB_NAME", "cicekci_bench")]
+    files = load_files(BACKEND_DIR.parent) * args.repeat
+    total_items = sum(len(items) for _, items in files)
+    print(f"{len(files)} dosya, {total_items} ürün (x{args.repeat})\n")
+
+    await server.db.products.delete_many({})
+    elapsed, count = await run("legacy", files, legacy_import)
+    print(f"eski döngü  : {elapsed:7.2f} s  {total_items / elapsed:8.0f} ürün/s  koleksiyonda {count} ürün")
+
+    await server.db.products.delete_many({})
+    await server.ensure_indexes()
+    elapsed, count = await run("bulk", files, lambda items, cat: bulk_import(items, cat, args.batch_size))
+    print(f"bulk upsert : {elapsed:7.2f} s  {total_items / elapsed:8.0f} ürün/s  koleksiyonda {count} ürün")
+
+    await server.db.products.delete_many({})
+    server.client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
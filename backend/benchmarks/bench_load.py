@@ -0,0 +1,331 @@
+"""
+Yük testi: API'yi eşzamanlı istemcilerle sürer ve senaryo başına
+throughput, p50/p95/p99 gecikme ve hata sayısını ölçer. Sonuç JSON rapor
+olarak yazılır; --compare ile önceki bir commit'in raporuyla karşılaştırılır
+ve eşiği aşan gerileme varsa çıkış kodu 1 olur.
+
+Kullanım (backend/ klasöründen):
+    python benchmarks/bench_load.py --products 20000 --concurrency 32 --duration 10 --report load.json
+    python benchmarks/bench_load.py --report yeni.json --compare load.json --max-regression 0.2
+    python benchmarks/bench_load.py --url http://localhost:8001 --scenarios products_page1,search
+    python benchmarks/bench_load.py --scenarios import_json_under_reads --upload-size 2000
+
+import_json_under_reads senaryosu okuma istemcileri çalışırken arka arkaya
+JSON dosyası yükler (/api/import/json-file); rapordaki gecikmeler okumalara
+aittir, yüklemelerin süresi ve ürün/s değeri "import" altında verilir.
+
+Varsayılan olarak uygulama süreç içinde (httpx ASGITransport) çalıştırılır;
+MONGO_URL kullanılır ve veriler BENCH_DB_NAME (varsayılan "cicekci_bench")
+veritabanına yazılır. Mongo yoksa --mongomock ile mongomock_motor (kuruluysa)
+kullanılabilir; o modda Mongo süreleri gerçekçi değildir. --url verilirse
+çalışan bir sunucu ölçülür ve tohumlama o sunucunun /api/seed'i ile yapılır.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import httpx
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+os.environ.setdefault("DB_NAME", "cicekci_bench")
+
+SEARCH_TERMS = ["gül", "orkide", "kırmızı", "buket", "papatya", "lilyum", "saksı", "sepet", "aranjman", "kutu"]
+
+
+def percentile(sorted_values, fraction: float) -> float:
+    """Doğrusal enterpolasyonlu yüzdelik (sıralı liste)"""
+    if not sorted_values:
+        return 0.0
+    position = (len(sorted_values) - 1) * fraction
+    low = int(position)
+    high = min(low + 1, len(sorted_values) - 1)
+    return sorted_values[low] + (sorted_values[high] - sorted_values[low]) * (position - low)
+
+
+def summarize(latencies, errors: int, statuses: dict, elapsed: float, bytes_read: int) -> dict:
+    values = sorted(latencies)
+    count = len(values)
+    return {
+        "requests": count,
+        "errors": errors,
+        "statuses": statuses,
+        "elapsed_seconds": round(elapsed, 3),
+        "throughput_rps": round(count / elapsed, 1) if elapsed > 0 else 0.0,
+        "bytes_per_request": round(bytes_read / count) if count else 0,
+        "latency_ms": {
+            "mean": round(sum(values) / count, 2) if count else 0.0,
+            "p50": round(percentile(values, 0.50), 2),
+            "p95": round(percentile(values, 0.95), 2),
+            "p99": round(percentile(values, 0.99), 2),
+            "max": round(values[-1], 2) if values else 0.0,
+        },
+    }
+
+
+class Scenarios:
+    """Senaryo adı -> (rng) -> (method, path, kwargs) üreten fonksiyonlar"""
+
+    def __init__(self, product_ids, categories, total: int, deep_page: int, upload_size: int = 1000):
+        self.product_ids = product_ids
+        self.categories = categories
+        self.deep_page = max(1, min(deep_page, total // 24))
+        self.upload_size = upload_size
+        self.import_counter = 0
+
+    def products_page1(self, rng):
+        category = rng.choice(self.categories + [None])
+        params = {"page": 1, "per_page": 24}
+        if category:
+            params["category"] = category
+        return "GET", "/api/products", {"params": params}
+
+    def products_deep(self, rng):
+        return "GET", "/api/products", {"params": {"page": rng.randint(self.deep_page // 2 or 1, self.deep_page), "per_page": 24}}
+
+    def products_filtered(self, rng):
+        low = rng.choice([0, 250, 500, 1000])
+        params = {"min_price": low, "max_price": low + 1000, "sort": rng.choice(["price_asc", "price_desc", "newest"]), "facets": "true"}
+        return "GET", "/api/products", {"params": params}
+
+    def product_detail(self, rng):
+        return "GET", f"/api/products/{rng.choice(self.product_ids)}", {}
+
+    def search(self, rng):
+        return "GET", "/api/search", {"params": {"q": rng.choice(SEARCH_TERMS), "per_page": 20}}
+
+    def categories_list(self, rng):
+        return "GET", "/api/categories", {}
+
+    def import_products(self, rng):
+        # Her istek 20 yeni ürün yazar; yazmalar önbellek sürümlerini artırır, bu yüzden en sonda koşar
+        self.import_counter += 1
+        batch = self.import_counter
+        items = [
+            {"name": f"Yük Testi Ürünü {batch}-{n}", "price": f"{rng.randint(200, 3000)} TL", "url": f"https://bench.local/{batch}/{n}"}
+            for n in range(20)
+        ]
+        return "POST", "/api/import/products", {"params": {"background": "false"}, "json": {"category_name": "Yuk_Testi", "products": items}}
+
+    def mixed_reads(self, rng):
+        # Vitrin, arama ve detay okumaları; yükleme sürerken gecikmeleri ölçülür
+        return rng.choice([self.products_page1, self.products_filtered, self.search, self.product_detail])(rng)
+
+    def import_json_file(self, rng):
+        # Her yükleme upload_size yeni ürünlük bir JSON dosyası; dosya adı kategoriyi belirler
+        self.import_counter += 1
+        batch = self.import_counter
+        items = [
+            {"name": f"Yük Testi Dosyası {batch}-{n}", "price": f"{rng.randint(200, 3000)},00 TL",
+             "url": f"https://bench.local/dosya/{batch}/{n}", "all_images": [f"https://bench.local/img/{batch}/{n}.jpg"]}
+            for n in range(self.upload_size)
+        ]
+        body = json.dumps(items, ensure_ascii=False).encode("utf-8")
+        return "POST", "/api/import/json-file", {
+            "params": {"background": "false"},
+            "files": {"file": ("yuk_testi_dosya_urunler.json", body, "application/json")},
+        }
+
+
+SCENARIO_ORDER = [
+    ("products_page1", "products_page1"),
+    ("products_deep", "products_deep"),
+    ("products_filtered", "products_filtered"),
+    ("product_detail", "product_detail"),
+    ("search", "search"),
+    ("categories", "categories_list"),
+    ("import", "import_products"),
+    ("import_json_under_reads", "mixed_reads"),
+]
+# Okuma senaryosu süresince tek istemciyle arka planda çalışan yazma
+BACKGROUND_WRITERS = {"import_json_under_reads": "import_json_file"}
+
+
+async def run_scenario(client: httpx.AsyncClient, factory, concurrency: int, duration: float, max_requests: int, seed: int) -> dict:
+    latencies, statuses = [], {}
+    counters = {"errors": 0, "issued": 0, "bytes": 0}
+    deadline = time.perf_counter() + duration
+
+    async def worker(number: int):
+        rng = random.Random(seed * 1000 + number)
+        while time.perf_counter() < deadline and counters["issued"] < max_requests:
+            counters["issued"] += 1
+            method, path, kwargs = factory(rng)
+            started = time.perf_counter()
+            try:
+                response = await client.request(method, path, **kwargs)
+                body = response.content
+            except httpx.HTTPError:
+                counters["errors"] += 1
+                statuses["error"] = statuses.get("error", 0) + 1
+                continue
+            latencies.append((time.perf_counter() - started) * 1000)
+            counters["bytes"] += len(body)
+            statuses[str(response.status_code)] = statuses.get(str(response.status_code), 0) + 1
+            if response.status_code >= 400:
+                counters["errors"] += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(n) for n in range(concurrency)))
+    return summarize(latencies, counters["errors"], statuses, time.perf_counter() - started, counters["bytes"])
+
+
+async def run_with_writer(client: httpx.AsyncClient, reads, writes, concurrency: int, duration: float,
+                          max_requests: int, seed: int, upload_size: int) -> dict:
+    """Okumaları ölç; aynı süre boyunca tek bir istemci arka arkaya yazar"""
+    result, writer = await asyncio.gather(
+        run_scenario(client, reads, concurrency, duration, max_requests, seed),
+        run_scenario(client, writes, 1, duration, max_requests, seed + 1),
+    )
+    uploads = writer["requests"] - writer["errors"]
+    writer["products_per_second"] = round(uploads * upload_size / writer["elapsed_seconds"], 1) if writer["elapsed_seconds"] > 0 else 0.0
+    result["import"] = writer
+    return result
+
+
+async def prepare(client: httpx.AsyncClient, products: int, seed: int, in_process: bool):
+    """Kataloğu deterministik üret, örnek ürün id'leri ve kategori slug'larını topla"""
+    response = await client.post("/api/seed", params={"size": products, "seed": seed, "reset": "true", "background": "false"}, timeout=None)
+    response.raise_for_status()
+    if in_process:
+        import server
+        if server.search_rebuild_task is not None:
+            await server.search_rebuild_task  # arama senaryosu regex fallback'i ölçmesin
+    categories = [c["slug"] for c in (await client.get("/api/categories")).json()]
+    product_ids, cursor = [], None
+    while len(product_ids) < 2000:
+        params = {"per_page": 100, "fields": "id"}
+        if cursor:
+            params["cursor"] = cursor
+        page = (await client.get("/api/products", params=params)).json()
+        product_ids.extend(p["id"] for p in page["products"])
+        cursor = page["next_cursor"]
+        if not cursor:
+            break
+    return categories, product_ids
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, capture_output=True, text=True, check=True).stdout.strip()
+    except Exception:
+        return ""
+
+
+def compare(report: dict, baseline: dict, max_regression: float) -> bool:
+    """p95 ve throughput'u önceki raporla karşılaştır; gerileme varsa False"""
+    print(f"\n{'senaryo':<20} {'p95 önce':>10} {'p95 şimdi':>10} {'fark':>8} {'rps önce':>10} {'rps şimdi':>10}")
+    ok = True
+    for name, current in report["scenarios"].items():
+        previous = baseline.get("scenarios", {}).get(name)
+        if previous is None:
+            continue
+        p95_before, p95_now = previous["latency_ms"]["p95"], current["latency_ms"]["p95"]
+        change = (p95_now - p95_before) / p95_before if p95_before else 0.0
+        rps_before, rps_now = previous["throughput_rps"], current["throughput_rps"]
+        regressed = change > max_regression or (rps_before and (rps_before - rps_now) / rps_before > max_regression)
+        ok = ok and not regressed
+        flag = "  GERİLEME" if regressed else ""
+        print(f"{name:<20} {p95_before:>10.2f} {p95_now:>10.2f} {change:>+8.1%} {rps_before:>10.1f} {rps_now:>10.1f}{flag}")
+    return ok
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="Çalışan sunucu (verilmezse uygulama süreç içinde başlatılır)")
+    parser.add_argument("--mongomock", action="store_true", help="Süreç içi modda Mongo yerine mongomock_motor kullan")
+    parser.add_argument("--products", type=int, default=20_000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=10.0, help="Senaryo başına saniye")
+    parser.add_argument("--max-requests", type=int, default=100_000, help="Senaryo başına en fazla istek")
+    parser.add_argument("--deep-page", type=int, default=200)
+    parser.add_argument("--upload-size", type=int, default=1000, help="import_json_under_reads'te dosya başına ürün")
+    parser.add_argument("--scenarios", default=",".join(name for name, _ in SCENARIO_ORDER))
+    parser.add_argument("--report", help="JSON raporun yazılacağı dosya")
+    parser.add_argument("--compare", help="Karşılaştırılacak önceki JSON rapor")
+    parser.add_argument("--max-regression", type=float, default=0.2, help="İzin verilen p95/throughput gerilemesi (0.2 = %%20)")
+    args = parser.parse_args()
+
+    in_process = not args.url
+    if in_process:
+        import server
+        if args.mongomock:
+            try:
+                from mongomock_motor import AsyncMongoMockClient
+            except ImportError:
+                parser.error("--mongomock için mongomock_motor paketi kurulu olmalı")
+            server.db = AsyncMongoMockClient()[os.environ.get("BENCH_DB_NAME", "cicekci_bench")]
+        else:
+            server.db = server.client[os.environ.get("BENCH_DB_NAME", "cicekci_bench")]
+        await server.app.router.startup()
+        transport = httpx.ASGITransport(app=server.app)
+        client = httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=30.0)
+    else:
+        client = httpx.AsyncClient(
+            base_url=args.url, timeout=30.0,
+            limits=httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency),
+        )
+
+    try:
+        categories, product_ids = await prepare(client, args.products, args.seed, in_process)
+        scenarios = Scenarios(product_ids, categories, args.products, args.deep_page, args.upload_size)
+        selected = set(args.scenarios.split(","))
+        results = {}
+        print(f"\n{'senaryo':<20} {'istek':>7} {'hata':>5} {'rps':>9} {'p50':>8} {'p95':>8} {'p99':>8} {'maks':>8}")
+        for name, method in SCENARIO_ORDER:
+            if name not in selected:
+                continue
+            if name in BACKGROUND_WRITERS:
+                result = await run_with_writer(
+                    client, getattr(scenarios, method), getattr(scenarios, BACKGROUND_WRITERS[name]),
+                    args.concurrency, args.duration, args.max_requests, args.seed, args.upload_size,
+                )
+            else:
+                result = await run_scenario(client, getattr(scenarios, method), args.concurrency, args.duration, args.max_requests, args.seed)
+            results[name] = result
+            latency = result["latency_ms"]
+            print(f"{name:<20} {result['requests']:>7} {result['errors']:>5} {result['throughput_rps']:>9.1f} "
+                  f"{latency['p50']:>8.2f} {latency['p95']:>8.2f} {latency['p99']:>8.2f} {latency['max']:>8.2f}")
+            if "import" in result:
+                writer = result["import"]
+                print(f"{'  + json yükleme':<20} {writer['requests']:>7} {writer['errors']:>5} {writer['throughput_rps']:>9.1f} "
+                      f"{writer['latency_ms']['p50']:>8.2f} {writer['latency_ms']['p95']:>8.2f} {writer['latency_ms']['p99']:>8.2f} "
+                      f"{writer['latency_ms']['max']:>8.2f}  ({writer['products_per_second']:.0f} ürün/s)")
+    finally:
+        await client.aclose()
+        if in_process:
+            await server.app.router.shutdown()
+
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "target": args.url or ("in-process/mongomock" if args.mongomock else "in-process"),
+            "products": args.products,
+            "seed": args.seed,
+            "concurrency": args.concurrency,
+            "duration_seconds": args.duration,
+        },
+        "scenarios": results,
+    }
+    if args.report:
+        Path(args.report).write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding="utf-8")
+        print(f"\nRapor yazıldı: {args.report}")
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text(encoding="utf-8"))
+        if not compare(report, baseline, args.max_regression):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,98 @@
+"""
+Konum proxy'si benchmark'ı: Photon/Nominatim yerine yerel bir stub upstream
+kullanır (httpx.MockTransport, ayarlanabilir gecikme) ve
+
+  1) tuş vuruşu benzeri tekrarlı sorgu akışında önbellek isabet oranını,
+  2) aynı sorgu için eşzamanlı N isteğin tek upstream çağrısına
+     indirgendiğini (single-flight)
+
+raporlar. Mongo veya ağ erişimi gerektirmez.
+
+Kullanım (backend/ klasöründen):
+    python benchmarks/bench_locations.py --requests 2000 --latency 0.15
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+from pathlib import Path
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "cicekci_bench")
+
+import server  # noqa: E402
+
+PLACES = ["Kadıköy", "Beşiktaş", "Çankaya", "Karşıyaka", "Nilüfer", "Üsküdar", "Şişli", "Bornova", "Muratpaşa", "Selçuklu"]
+
+
+def stub_transport(latency: float, calls: dict):
+    async def handler(request: httpx.Request):
+        calls[request.url.path] = calls.get(request.url.path, 0) + 1
+        await asyncio.sleep(latency)
+        q = request.url.params.get("q", "")
+        return httpx.Response(200, json={"features": [{"properties": {
+            "name": q.title(), "district": "Merkez", "city": "İstanbul", "country": "Türkiye", "osm_value": "suburb"
+        }}]})
+    return httpx.MockTransport(handler)
+
+
+def keystroke_queries(count: int, seed: int):
+    """Kullanıcıların yer adlarını harf harf yazdığı bir akış üret (Zipf benzeri popülerlik)"""
+    rng = random.Random(seed)
+    weights = [1 / (rank + 1) for rank in range(len(PLACES))]
+    queries = []
+    while len(queries) < count:
+        place = rng.choices(PLACES, weights)[0]
+        for end in range(2, len(place) + 1):
+            queries.append(place[:end] if rng.random() > 0.1 else place[:end].upper())
+    return queries[:count]
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.15, help="stub upstream gecikmesi (s)")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    calls = {}
+    server.http_client = httpx.AsyncClient(transport=stub_transport(args.latency, calls))
+
+    # 1) Tuş vuruşu akışı: `concurrency` kullanıcı aynı anda yazıyor
+    queries = keystroke_queries(args.requests, args.seed)
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async def one(q):
+        async with semaphore:
+            await server.search_locations(q=q)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(q) for q in queries))
+    elapsed = time.perf_counter() - started
+    stats = server.location_cache.stats()
+    upstream = sum(calls.values())
+    print(f"{len(queries)} istek {elapsed:.2f} s içinde tamamlandı")
+    print(f"önbellek isabet oranı: {stats['hit_ratio']:.2%} ({stats['hits']} isabet / {stats['misses']} kaçırma)")
+    print(f"upstream çağrısı: {upstream}, birleştirilen istek: {server.location_upstream['coalesced']}")
+
+    # 2) Single-flight: önbellekte olmayan tek sorgu için eşzamanlı 50 istek
+    calls.clear()
+    server.location_cache.invalidate()
+    results = await asyncio.gather(*(server.search_locations(q="  Moda  Kadıköy ") for _ in range(50)))
+    upstream = sum(calls.values())
+    identical = all(r == results[0] for r in results)
+    print(f"\n50 eşzamanlı aynı sorgu -> {upstream} upstream çağrısı, sonuçlar aynı: {identical}")
+
+    await server.http_client.aclose()
+    if upstream != 1 or not identical:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,120 @@
+"""
+Sayfalama benchmark'ı: klasik skip/limit ile keyset (cursor) modunu karşılaştırır;
+facet sayımlarının (kategori / fiyat / rozet) süresini de ölçer.
+
+Kullanım (backend/ klasöründen):
+    python benchmarks/bench_pagination.py --products 100000 --page 40 --sort price_desc
+
+MONGO_URL ortam değişkeni kullanılır; veriler BENCH_DB_NAME (varsayılan
+"cicekci_bench") veritabanına yazılır ve asıl veritabanına dokunulmaz.
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import orjson
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DB_NAME", "cicekci_bench")
+
+import server  # noqa: E402
+
+CATEGORIES = ["gul", "orkide", "tasarim", "aycicegi", "papatya-gerbera", "kokina", "saksi-cicekleri", "antoryum"]
+
+
+async def seed(db, count: int):
+    existing = await db.products.count_documents({})
+    if existing == count:
+        print(f"Mevcut {existing} ürün kullanılıyor")
+        return
+    await db.products.delete_many({})
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    batch = []
+    for i in range(count):
+        batch.append({
+            "id": f"bench-{i:07d}",
+            "title": f"Bench Ürün {i}",
+            "description": "Benchmark ürünü",
+            "price": 299 + (i % 270) * 10,
+            "category": CATEGORIES[i % len(CATEGORIES)],
+            "image": "",
+            "badge": "Aynı Gün Teslimat",
+            "is_bestseller": i % 10 == 0,
+            "created_at": start + timedelta(seconds=i),
+        })
+        if len(batch) == 5000:
+            await db.products.insert_many(batch, ordered=False)
+            batch = []
+    if batch:
+        await db.products.insert_many(batch, ordered=False)
+    print(f"{count} ürün eklendi")
+
+
+async def list_page(category, page=1, cursor=None, per_page=24, sort="created_at", facets=False):
+    # request verilmediği için ilk sayfa önbelleği devre dışı; her çağrı Mongo'ya gider
+    response = await server.get_products(
+        category=category, bestseller=None, page=page, per_page=per_page, cursor=cursor, fields=None,
+        categories=None, min_price=None, max_price=None, badge=None, sort=sort, facets=facets,
+    )
+    return orjson.loads(response.body)
+
+
+async def cursor_for_page(category, page: int, per_page=24, sort="created_at"):
+    """N. sayfanın başına gelmek için cursor zincirini yürü"""
+    cursor = None
+    for _ in range(page - 1):
+        result = await list_page(category, cursor=cursor, per_page=per_page, sort=sort)
+        cursor = result["next_cursor"]
+    return cursor
+
+
+async def timed(coro_factory, repeat: int):
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        await coro_factory()
+        samples.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(samples), max(samples)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--products", type=int, default=100_000)
+    parser.add_argument("--page", type=int, default=40)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--sort", default="created_at", choices=sorted(server.PRODUCT_SORTS))
+    args = parser.parse_args()
+
+    server.db = server.client[os.environ.get("BENCH_DB_NAME", "cicekci_bench")]
+    await seed(server.db, args.products)
+    await server.ensure_indexes()
+
+    print(f"\n{'filtre':<12} {'mod':<8} {'sayfa':>6} {'medyan ms':>10} {'maks ms':>9}")
+    for category in (None, "gul"):
+        deep_cursor = await cursor_for_page(category, args.page, sort=args.sort)
+        rows = [
+            ("page", 1, lambda: list_page(category, page=1, sort=args.sort)),
+            ("page", args.page, lambda: list_page(category, page=args.page, sort=args.sort)),
+            ("cursor", 1, lambda: list_page(category, sort=args.sort)),
+            ("cursor", args.page, lambda: list_page(category, cursor=deep_cursor, sort=args.sort)),
+        ]
+        for mode, page, factory in rows:
+            median, worst = await timed(factory, args.repeat)
+            print(f"{category or 'tümü':<12} {mode:<8} {page:>6} {median:>10.2f} {worst:>9.2f}")
+        # Facet önbelleğini her ölçümde boşalt: aggregation'ın kendisi ölçülsün
+        async def facets_uncached():
+            server.product_facets_cache.invalidate()
+            return await list_page(category, sort=args.sort, facets=True)
+        median, worst = await timed(facets_uncached, args.repeat)
+        print(f"{category or 'tümü':<12} {'facets':<8} {1:>6} {median:>10.2f} {worst:>9.2f}")
+
+    server.client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,99 @@
+"""
+Arama index'i benchmark'ı: depodaki *_urunler.json dosyalarındaki gerçek
+başlık/açıklamaları N ürüne çoğaltır, SearchIndex'i kurar ve sorgu
+gecikmesinin p50/p99 değerlerini raporlar (p99 ilk, önek önbelleği boş
+çağrıyı da içerir; "ilk ms" ayrıca gösterilir); ardından SuggestIndex'in kurulum,
+soğuk (önbelleksiz) önek ve warm() sonrası sürelerini ölçer. Mongo gerektirmez.
+
+Kullanım (backend/ klasöründen):
+    python benchmarks/bench_search.py --products 100000
+"""
+import argparse
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+from search_index import SearchIndex, SuggestIndex  # noqa: E402
+
+QUERIES = [
+    "gül", "kırmızı gül", "orkide", "ORKİDE", "ayçiçeği", "papatya buketi",
+    "beyaz", "vazoda", "gu", "kirmizi g", "doğum günü", "lilyum", "sepet", "xyzt",
+]
+SUGGEST_QUERIES = ["g", "k", "gu", "kır", "orkide", "kirmizi g", "ayçiçeği b"]
+
+
+def load_catalog(repo_dir: Path):
+    catalog = []
+    for path in sorted(repo_dir.glob("*_urunler.json")):
+        for item in json.loads(path.read_text(encoding="utf-8")):
+            catalog.append({
+                "title": item.get("name", ""),
+                "description": item.get("description", ""),
+                "category": path.stem.replace("_urunler", ""),
+            })
+    return catalog
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--products", type=int, default=100_000)
+    parser.add_argument("--rounds", type=int, default=50)
+    args = parser.parse_args()
+
+    catalog = load_catalog(BACKEND_DIR.parent)
+    products = []
+    for i in range(args.products):
+        base = catalog[i % len(catalog)]
+        # Öneriler başlıkta birleştiği için farklı başlık sayısı da büyüsün
+        products.append({**base, "id": f"p{i}", "title": f"{base['title']} #{i % 5000}", "is_bestseller": i % 10 == 0})
+    index = SearchIndex()
+    started = time.perf_counter()
+    index.add_many(products)
+    print(f"{args.products} ürün index'lendi: {time.perf_counter() - started:.1f} s")
+
+    print(f"\n{'sorgu':<16} {'sonuç':>7} {'ilk ms':>8} {'p50 ms':>8} {'p99 ms':>8}")
+    all_samples = []
+    for query in QUERIES:
+        samples = []
+        for _ in range(args.rounds):
+            t0 = time.perf_counter()
+            total, _ = index.search(query, offset=0, limit=20)
+            samples.append((time.perf_counter() - t0) * 1000)
+        first = samples[0]
+        samples.sort()
+        all_samples.extend(samples)
+        p99 = samples[min(len(samples) - 1, int(len(samples) * 0.99))]
+        print(f"{query:<16} {total:>7} {first:>8.2f} {statistics.median(samples):>8.2f} {p99:>8.2f}")
+
+    all_samples.sort()
+    print(f"\nGenel p50 {statistics.median(all_samples):.2f} ms, "
+          f"p99 {all_samples[int(len(all_samples) * 0.99)]:.2f} ms")
+
+    suggest = SuggestIndex()
+    started = time.perf_counter()
+    suggest.add_many(products)
+    print(f"\nÖneri index'i: {len(suggest)} öneri, kurulum {time.perf_counter() - started:.2f} s")
+    cold = {}
+    for query in SUGGEST_QUERIES:
+        t0 = time.perf_counter()
+        suggest.suggest(query)
+        cold[query] = (time.perf_counter() - t0) * 1000
+    suggest._cache.clear()
+    started = time.perf_counter()
+    suggest.warm()
+    print(f"warm(): {time.perf_counter() - started:.2f} s")
+    suggest.add({"id": "yeni", "title": "Kırmızı Gül Kutusu", "is_bestseller": True})
+    print(f"\n{'önek':<16} {'soğuk ms':>9} {'warm ms':>8}   (warm ölçümü tek ekleme sonrası)")
+    for query in SUGGEST_QUERIES:
+        t0 = time.perf_counter()
+        suggest.suggest(query)
+        print(f"{query:<16} {cold[query]:>9.2f} {(time.perf_counter() - t0) * 1000:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Ürün listesi serileştirme micro-benchmark'ı: 100 ürünlük bir sayfanın eski
+yol (string created_at -> datetime döngüsü + jsonable_encoder + json.dumps,
+tüm alanlar) ile yeni yol (kart projeksiyonu + BSON tarihi + orjson)
+arasındaki farkını ölçer. Mongo gerektirmez; ürünler depodaki
+*_urunler.json dosyalarından import'taki alanlarla üretilir.
+
+Kullanım (backend/ klasöründen):
+    python benchmarks/bench_serialization.py --per-page 100 --rounds 2000
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+from fastapi.encoders import jsonable_encoder
+from starlette.responses import JSONResponse
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "cicekci_bench")
+
+import server  # noqa: E402
+
+
+def load_page(repo_dir: Path, per_page: int) -> list:
+    """Import edilmiş ürün belgeleriyle aynı alanlara sahip bir sayfa"""
+    docs = []
+    for path in sorted(repo_dir.glob("*_urunler.json")):
+        for item in json.loads(path.read_text(encoding="utf-8")):
+            docs.append({
+                "id": f"p{len(docs)}",
+                "title": item.get("name", ""),
+                "description": item.get("description", ""),
+                "price": server.parse_price(item.get("price", "0")),
+                "category": path.stem.replace("_urunler", ""),
+                "image": (item.get("all_images") or [""])[0],
+                "product_code": item.get("product_code", ""),
+                "source_url": item.get("url", ""),
+                "all_images": item.get("all_images", []),
+                "contents": item.get("contents", []),
+                "badge": "Aynı Gün Teslimat",
+                "is_bestseller": len(docs) % 7 == 0,
+                "created_at": datetime.now(timezone.utc).replace(tzinfo=None, microsecond=0),
+            })
+            if len(docs) == per_page:
+                return docs
+    return docs
+
+
+def legacy_render(page: list) -> bytes:
+    products = [{**p, "created_at": p["created_at"].isoformat() + "+00:00"} for p in page]  # Mongo'dan string gelir
+    for p in products:
+        if isinstance(p.get("created_at"), str):
+            p["created_at"] = datetime.fromisoformat(p["created_at"])
+    content = {"products": products, "total": 1000, "page": 1, "per_page": len(page), "total_pages": 10}
+    return JSONResponse(jsonable_encoder(content)).body
+
+
+def fast_render(page: list) -> bytes:
+    products = [{k: p[k] for k in server.PRODUCT_CARD_FIELDS if k in p} for p in page]  # projeksiyonu Mongo yapar
+    content = {"products": products, "total": 1000, "page": 1, "per_page": len(page), "total_pages": 10, "next_cursor": None}
+    return server.FastJSONResponse(content).body
+
+
+def measure(render, page: list, rounds: int):
+    # Kopyalama/projeksiyon maliyeti iki yolda da ölçümün içinde
+    samples = []
+    body = b""
+    for _ in range(rounds):
+        t0 = time.perf_counter()
+        body = render(page)
+        samples.append((time.perf_counter() - t0) * 1000)
+    samples.sort()
+    return statistics.median(samples), samples[int(len(samples) * 0.99) - 1], len(body)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--per-page", type=int, default=100)
+    parser.add_argument("--rounds", type=int, default=2000)
+    args = parser.parse_args()
+
+    page = load_page(BACKEND_DIR.parent, args.per_page)
+    print(f"{len(page)} ürünlük sayfa, {args.rounds} tekrar\n")
+    print(f"{'yol':<10} {'p50 ms':>8} {'p99 ms':>8} {'gövde KB':>9}")
+    results = {}
+    for name, render in (("eski", legacy_render), ("orjson", fast_render)):
+        p50, p99, size = measure(render, page, args.rounds)
+        results[name] = p50
+        print(f"{name:<10} {p50:>8.3f} {p99:>8.3f} {size / 1024:>9.1f}")
+    print(f"\nHızlanma (p50): {results['eski'] / results['orjson']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
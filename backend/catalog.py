@@ -0,0 +1,199 @@
+"""
+/api/seed için örnek katalog: kategoriler, banner'lar, elle yazılmış vitrin
+ürünleri ve şablonlardan üretilen ürünler.
+
+generate_products() verilen tohum (seed) ile her çalıştırmada aynı ürünleri
+aynı sırayla üretir; id'ler, fiyatlar, rozetler ve created_at değerleri
+rastgele sayı üretecinden türetilir. Üretim akış halindedir, 1M ürün bile
+belleğe toplanmadan batch'ler halinde yazılabilir. Aynı tohumla daha küçük
+bir katalog, büyüğünün ilk N ürünüdür.
+"""
+import random
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Iterator, List, Tuple
+
+# Üretilen ürünlerin created_at başlangıcı; her ürün bir saniye sonra gelir
+CATALOG_EPOCH = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+# Categories (Scraper kategorileriyle uyumlu)
+CATEGORIES = [
+    {"name": "Kokina", "slug": "kokina", "description": "Yeni yılın gözdesi", "icon": "🎄"},
+    {"name": "Doğum Günü Çiçekleri", "slug": "dogum-gunu", "description": "Özel günler için", "icon": "🎂"},
+    {"name": "Sevgiliye Çiçek", "slug": "sevgi-ask", "description": "Aşkınızı çiçeklerle ifade edin", "icon": "❤️"},
+    {"name": "Çiçek Buketleri", "slug": "cicek-buketleri", "description": "Her ocasyon için buketler", "icon": "💐"},
+    {"name": "Saksı Çiçekleri", "slug": "saksi-cicekleri", "description": "Kalıcı saksı bitkileri", "icon": "🪴"},
+    {"name": "Yeni İşe Çiçek", "slug": "yeni-is-terfi", "description": "Başarıları kutlayın", "icon": "🎊"},
+    {"name": "Orkide", "slug": "orkide", "description": "Şık, zarif ve kalıcı hediye", "icon": "🌸"},
+    {"name": "Geçmiş Olsun Çiçekleri", "slug": "gecmis-olsun", "description": "Sevdiklerinize şifa dileyin", "icon": "💐"},
+    {"name": "Gül", "slug": "gul", "description": "Aşkın en klasik hali", "icon": "🌹"},
+    {"name": "Açılış Tören Çiçekleri", "slug": "acilis-kutlama", "description": "Açılış ve kutlamalar için", "icon": "🎉"},
+    {"name": "Çelenk", "slug": "celenk", "description": "Cenaze ve anma çelenkleri", "icon": "🕊️"},
+    {"name": "Yeni Bebek", "slug": "dogum-yeni-bebek", "description": "Yeni hayatı kutlayın", "icon": "👶"},
+    {"name": "Ayçiçeği", "slug": "aycicegi", "description": "Güneş gibi parlak", "icon": "🌻"},
+    {"name": "Papatyalar", "slug": "papatya-gerbera", "description": "Neşeli ve canlı çiçekler", "icon": "🌼"},
+    {"name": "Antoryum", "slug": "antoryum", "description": "Egzotik ve şık", "icon": "❤️"},
+    {"name": "Hüsnüyusuf", "slug": "husnuyusuf", "description": "Romantik ve zarif", "icon": "💜"},
+    {"name": "Tasarım Çiçekler", "slug": "tasarim", "description": "Özel aranjmanlar ve butik işler", "icon": "🎨"},
+    {"name": "Kırmızı Gül", "slug": "kirmizi-gul", "description": "Aşkın sembolü kırmızı güller", "icon": "🌹"},
+    {"name": "Beyaz Gül", "slug": "beyaz-gul", "description": "Saflık ve zarafetin simgesi", "icon": "🤍"},
+    {"name": "Nikah / Düğün", "slug": "nikah-dugun", "description": "Mutlu günlerinize özel", "icon": "💒"},
+]
+
+BANNERS = [
+    {"image": "https://images.unsplash.com/photo-1487530811176-3780de880c2d?w=1200&h=400&fit=crop", "title": "Yaz Koleksiyonu", "link": "/kategori/tasarim", "order": 1},
+    {"image": "https://images.unsplash.com/photo-1561181286-d3fee7d55364?w=1200&h=400&fit=crop", "title": "Güller Festivali", "link": "/kategori/gul", "order": 2},
+    {"image": "https://images.unsplash.com/photo-1508610048659-a06b669e3321?w=1200&h=400&fit=crop", "title": "Orkide Şıklığı", "link": "/kategori/orkide", "order": 3},
+]
+
+# Elle yazılmış vitrin ürünleri; katalog her zaman bunlarla başlar
+FEATURED_PRODUCTS = [
+    # Products - Güller
+    {"title": "Kırmızı Gül Buketi", "description": "11 adet kırmızı gülden oluşan romantik buket", "price": 599, "category": "gul", "image": "https://images.unsplash.com/photo-1518621736915-f3b1c41bfd00?w=400&h=400&fit=crop", "is_bestseller": True, "badge": "Aynı Gün Teslimat"},
+    {"title": "Pembe Gül Aranjmanı", "description": "21 adet pembe gül özel vazo içinde", "price": 899, "category": "gul", "image": "https://images.unsplash.com/photo-1455659817273-f96807779a8a?w=400&h=400&fit=crop", "is_bestseller": True, "badge": "Aynı Gün Teslimat"},
+    {"title": "Beyaz Gül Buketi", "description": "15 adet beyaz gül zarif ambalajda", "price": 749, "category": "gul", "image": "https://images.unsplash.com/photo-1582794543139-8ac9cb0f7b11?w=400&h=400&fit=crop", "is_bestseller": False, "badge": "Aynı Gün Teslimat"},
+    {"title": "Karışık Renkli Güller", "description": "25 adet karışık renkli gül sepeti", "price": 1099, "category": "gul", "image": "https://images.unsplash.com/photo-1494972308805-463bc619d34e?w=400&h=400&fit=crop", "is_bestseller": False, "badge": "Aynı Gün Teslimat"},
+    {"title": "Sarı Gül Buketi", "description": "9 adet sarı gül dostluk buketi", "price": 449, "category": "gul", "image": "https://images.unsplash.com/photo-1586968304848-f29e3c95cb2c?w=400&h=400&fit=crop", "is_bestseller": False, "badge": "Aynı Gün Teslimat"},
+    {"title": "Lüks Gül Kutusu", "description": "50 adet premium gül özel kutuda", "price": 2499, "category": "gul", "image": "https://images.unsplash.com/photo-1548586196-aa5803b77379?w=400&h=400&fit=crop", "is_bestseller": False, "badge": "Premium"},
+    # Products - Orkideler
+    {"title": "Beyaz Orkide", "description": "Tek dallı beyaz orkide seramik saksıda", "price": 799, "category": "orkide", "image": "https://images.unsplash.com/photo-1567748157439-651aca2ff064?w=400&h=400&fit=crop", "is_bestseller": True, "badge": "Aynı Gün Teslimat"},
+    {"title": "Mor Orkide", "description": "Çift dallı mor orkide premium saksıda", "price": 1299, "category": "orkide", "image": "https://images.unsplash.com/photo-1610397648930-477b8c7f0943?w=400&h=400&fit=crop", "is_bestseller": True, "badge": "Aynı Gün Teslimat"},
+    {"title": "Pembe Orkide", "description": "Tek dallı pembe orkide zarif ambalajda", "price": 849, "category": "orkide", "image": "https://images.unsplash.com/photo-1566873535350-a3f5d4a804b7?w=400&h=400&fit=crop", "is_bestseller": False, "badge": "Aynı Gün Teslimat"},
+    {"title": "Sarı Orkide", "description": "Nadir sarı orkide özel seramik saksıda", "price": 999, "category": "orkide", "image": "https://images.unsplash.com/photo-1612363148951-15f16817648f?w=400&h=400&fit=crop", "is_bestseller": False, "badge": "Aynı Gün Teslimat"},
+    {"title": "İkili Orkide Set", "description": "2 adet tek dallı orkide şık kutuda", "price": 1599, "category": "orkide", "image": "https://images.unsplash.com/photo-1590755726405-6c2e1f9a7dfe?w=400&h=400&fit=crop", "is_bestseller": False, "badge": "Premium"},
+    # Products - Tasarım
+    {"title": "Butik Aranjman", "description": "Mevsim çiçeklerinden özel tasarım", "price": 699, "category": "tasarim", "image": "https://images.unsplash.com/photo-1563241527-3004b7be0ffd?w=400&h=400&fit=crop", "is_bestseller": True, "badge": "Aynı Gün Teslimat"},
+    {"title": "Pastel Rüya", "description": "Pastel tonlarda özel aranjman", "price": 899, "category": "tasarim", "image": "https://images.unsplash.com/photo-1520763185298-1b434c919102?w=400&h=400&fit=crop", "is_bestseller": True, "badge": "Aynı Gün Teslimat"},
+    {"title": "Tropikal Esen", "description": "Egzotik çiçeklerle tropikal tasarım", "price": 1199, "category": "tasarim", "image": "https://images.unsplash.com/photo-1525310072745-f49212b5ac6d?w=400&h=400&fit=crop", "is_bestseller": False, "badge": "Premium"},
+    {"title": "Vintage Şıklık", "description": "Klasik tarzda nostaljik buket", "price": 799, "category": "tasarim", "image": "https://images.unsplash.com/photo-1561181286-d3fee7d55364?w=400&h=400&fit=crop", "is_bestseller": False, "badge": "Aynı Gün Teslimat"},
+    {"title": "Modern Minimalist", "description": "Sade ve şık modern aranjman", "price": 649, "category": "tasarim", "image": "https://images.unsplash.com/photo-1487530811176-3780de880c2d?w=400&h=400&fit=crop", "is_bestseller": False, "badge": "Aynı Gün Teslimat"},
+    # Products - Papatya / Gerbera
+    {"title": "Papatya Buketi", "description": "Taze papatyalardan neşeli buket", "price": 399, "category": "papatya-gerbera", "image": "https://images.unsplash.com/photo-1490750967868-88aa4486c946?w=400&h=400&fit=crop", "is_bestseller": False, "badge": "Aynı Gün Teslimat"},
+    {"title": "Gerbera Aranjmanı", "description": "Renkli gerberalardan canlı aranjman", "price": 549, "category": "papatya-gerbera", "image": "https://images.unsplash.com/photo-1518882605630-8eb573696572?w=400&h=400&fit=crop", "is_bestseller": False, "badge": "Aynı Gün Teslimat"},
+    # Products - Antoryum
+    {"title": "Kırmızı Antoryum", "description": "Tek dallı kırmızı antoryum şık saksıda", "price": 699, "category": "antoryum", "image": "https://images.unsplash.com/photo-1598880940371-c756e015fea1?w=400&h=400&fit=crop", "is_bestseller": True, "badge": "Aynı Gün Teslimat"},
+    {"title": "Beyaz Antoryum", "description": "Zarif beyaz antoryum seramik saksıda", "price": 749, "category": "antoryum", "image": "https://images.unsplash.com/photo-1596438459194-f275f413d6ff?w=400&h=400&fit=crop", "is_bestseller": False, "badge": "Aynı Gün Teslimat"},
+    # Products - Kokina
+    {"title": "Kokina Aranjmanı", "description": "Yeni yıla özel kokina düzenlemesi", "price": 899, "category": "kokina", "image": "https://images.unsplash.com/photo-1512418490979-92798cec1380?w=400&h=400&fit=crop", "is_bestseller": True, "badge": "Yeni Yıl Özel"},
+    {"title": "Lüks Kokina Sepeti", "description": "Premium kokina sepet aranjmanı", "price": 1299, "category": "kokina", "image": "https://images.unsplash.com/photo-1482517967863-00e15c9b44be?w=400&h=400&fit=crop", "is_bestseller": False, "badge": "Premium"},
+    # Products - Lilyum
+    {"title": "Beyaz Lilyum Buketi", "description": "Mis kokulu beyaz lilyumlar", "price": 649, "category": "lilyum", "image": "https://images.unsplash.com/photo-1468327768560-75b778cbb551?w=400&h=400&fit=crop", "is_bestseller": False, "badge": "Aynı Gün Teslimat"},
+    {"title": "Pembe Lilyum", "description": "Zarif pembe lilyum aranjmanı", "price": 699, "category": "lilyum", "image": "https://images.unsplash.com/photo-1508610048659-a06b669e3321?w=400&h=400&fit=crop", "is_bestseller": False, "badge": "Aynı Gün Teslimat"},
+    # Products - Ayçiçeği
+    {"title": "Ayçiçeği Buketi", "description": "Neşeli ayçiçeği buketi", "price": 449, "category": "aycicegi", "image": "https://images.unsplash.com/photo-1551731409-43eb3e517a1a?w=400&h=400&fit=crop", "is_bestseller": False, "badge": "Aynı Gün Teslimat"},
+    {"title": "Güneş Sepeti", "description": "Ayçiçeği ve mevsim çiçekleri sepeti", "price": 599, "category": "aycicegi", "image": "https://images.unsplash.com/photo-1557844352-761f2565b576?w=400&h=400&fit=crop", "is_bestseller": False, "badge": "Aynı Gün Teslimat"},
+    # Products - Çiçek Buketleri
+    {"title": "Karışık Buket", "description": "Mevsim çiçeklerinden renkli buket", "price": 499, "category": "cicek-buketleri", "image": "https://images.unsplash.com/photo-1561181286-d3fee7d55364?w=400&h=400&fit=crop", "is_bestseller": False, "badge": "Aynı Gün Teslimat"},
+    {"title": "Romantik Buket", "description": "Aşka özel romantik çiçek buketi", "price": 699, "category": "cicek-buketleri", "image": "https://images.unsplash.com/photo-1487530811176-3780de880c2d?w=400&h=400&fit=crop", "is_bestseller": False, "badge": "Aynı Gün Teslimat"},
+    # Products - Saksı Çiçekleri
+    {"title": "Bonsai Ağacı", "description": "Şık bonsai ağacı seramik saksıda", "price": 899, "category": "saksi-cicekleri", "image": "https://images.unsplash.com/photo-1567331711402-509c12c41959?w=400&h=400&fit=crop", "is_bestseller": False, "badge": "Aynı Gün Teslimat"},
+    {"title": "Sukulent Set", "description": "3'lü sukulent bitki seti", "price": 399, "category": "saksi-cicekleri", "image": "https://images.unsplash.com/photo-1459411552884-841db9b3cc2a?w=400&h=400&fit=crop", "is_bestseller": False, "badge": "Aynı Gün Teslimat"},
+]
+
+IMAGES = [
+    "https://images.unsplash.com/photo-1518621736915-f3b1c41bfd00?w=400&h=400&fit=crop",
+    "https://images.unsplash.com/photo-1455659817273-f96807779a8a?w=400&h=400&fit=crop",
+    "https://images.unsplash.com/photo-1582794543139-8ac9cb0f7b11?w=400&h=400&fit=crop",
+    "https://images.unsplash.com/photo-1494972308805-463bc619d34e?w=400&h=400&fit=crop",
+    "https://images.unsplash.com/photo-1567748157439-651aca2ff064?w=400&h=400&fit=crop",
+    "https://images.unsplash.com/photo-1610397648930-477b8c7f0943?w=400&h=400&fit=crop",
+    "https://images.unsplash.com/photo-1563241527-3004b7be0ffd?w=400&h=400&fit=crop",
+    "https://images.unsplash.com/photo-1520763185298-1b434c919102?w=400&h=400&fit=crop",
+    "https://images.unsplash.com/photo-1490750967868-88aa4486c946?w=400&h=400&fit=crop",
+    "https://images.unsplash.com/photo-1551731409-43eb3e517a1a?w=400&h=400&fit=crop",
+    "https://images.unsplash.com/photo-1487530811176-3780de880c2d?w=400&h=400&fit=crop",
+    "https://images.unsplash.com/photo-1561181286-d3fee7d55364?w=400&h=400&fit=crop",
+    "https://images.unsplash.com/photo-1525310072745-f49212b5ac6d?w=400&h=400&fit=crop",
+    "https://images.unsplash.com/photo-1598880940371-c756e015fea1?w=400&h=400&fit=crop",
+    "https://images.unsplash.com/photo-1468327768560-75b778cbb551?w=400&h=400&fit=crop",
+    "https://images.unsplash.com/photo-1508610048659-a06b669e3321?w=400&h=400&fit=crop",
+    "https://images.unsplash.com/photo-1518882605630-8eb573696572?w=400&h=400&fit=crop",
+    "https://images.unsplash.com/photo-1586968304848-f29e3c95cb2c?w=400&h=400&fit=crop",
+    "https://images.unsplash.com/photo-1548586196-aa5803b77379?w=400&h=400&fit=crop",
+    "https://images.unsplash.com/photo-1566873535350-a3f5d4a804b7?w=400&h=400&fit=crop",
+]
+
+PRODUCT_TEMPLATES = [
+    # Güller
+    {"names": ["Kırmızı Gül", "Pembe Gül", "Beyaz Gül", "Sarı Gül", "Turuncu Gül", "Mor Gül"], "category": "gul", "suffix": ["Buketi", "Sepeti", "Aranjmanı", "Kutusu"]},
+    {"names": ["7'li Gül", "11'li Gül", "21'li Gül", "31'li Gül", "51'li Gül", "101'li Gül"], "category": "gul", "suffix": ["Buketi", "Sepeti"]},
+    # Orkide
+    {"names": ["Beyaz Orkide", "Mor Orkide", "Pembe Orkide", "Sarı Orkide", "Mini Orkide", "Jumbo Orkide"], "category": "orkide", "suffix": ["Tek Dal", "Çift Dal", "3 Dal", "5 Dal"]},
+    # Lilyum
+    {"names": ["Beyaz Lilyum", "Pembe Lilyum", "Sarı Lilyum", "Turuncu Lilyum"], "category": "lilyum", "suffix": ["Buketi", "Sepeti", "Aranjmanı"]},
+    # Ayçiçeği
+    {"names": ["Ayçiçeği", "Güneş Çiçeği"], "category": "aycicegi", "suffix": ["Buketi", "Sepeti", "5'li", "10'lu", "15'li"]},
+    # Papatya/Gerbera
+    {"names": ["Papatya", "Gerbera", "Renkli Gerbera", "Beyaz Papatya"], "category": "papatya-gerbera", "suffix": ["Buketi", "Sepeti", "Aranjmanı"]},
+    # Tasarım
+    {"names": ["Tasarım", "Butik", "Özel", "Premium", "Lüks", "Minimalist", "Modern", "Vintage", "Bohem"], "category": "tasarim", "suffix": ["Aranjman", "Buket", "Sepet", "Kutu"]},
+    # Saksı
+    {"names": ["Orkide Saksı", "Bonsai", "Sukulent", "Kaktüs", "Monstera", "Zamioculcas", "Ficus", "Pothos"], "category": "saksi-cicekleri", "suffix": ["", "Seti", "Koleksiyonu"]},
+    # Antoryum
+    {"names": ["Kırmızı Antoryum", "Beyaz Antoryum", "Pembe Antoryum"], "category": "antoryum", "suffix": ["", "Aranjmanı", "Saksıda"]},
+    # Kokina
+    {"names": ["Kokina", "Atatürk Çiçeği"], "category": "kokina", "suffix": ["", "Aranjmanı", "Sepeti", "Mini"]},
+    # Karanfil
+    {"names": ["Kırmızı Karanfil", "Beyaz Karanfil", "Pembe Karanfil", "Renkli Karanfil"], "category": "karanfil", "suffix": ["Buketi", "Sepeti"]},
+    # Hüsnüyusuf
+    {"names": ["Hüsnüyusuf", "Leylak"], "category": "husnuyusuf", "suffix": ["Buketi", "Aranjmanı"]},
+    # Çiçek Buketleri
+    {"names": ["Mevsim Çiçekleri", "Kır Çiçekleri", "Romantik", "Sevgi", "Aşk", "Özel Gün"], "category": "cicek-buketleri", "suffix": ["Buketi", "Sepeti", "Aranjmanı"]},
+]
+
+BADGES = ["Aynı Gün Teslimat", "Hızlı Teslimat", "Özel Fiyat", "Çok Satan", "Yeni", "Premium"]
+
+
+def random_id(rng: random.Random) -> str:
+    """Tohuma bağlı, uuid4 biçiminde id"""
+    return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+
+def build_reference_data(rng: random.Random) -> Tuple[List[dict], List[dict]]:
+    categories = [{"id": random_id(rng), **category} for category in CATEGORIES]
+    banners = [{"id": random_id(rng), **banner} for banner in BANNERS]
+    return categories, banners
+
+
+def template_titles() -> Iterator[Tuple[str, str]]:
+    """
+    (başlık, kategori) çiftlerini sonsuza kadar üret. Her şablon kombinasyonu
+    5'li varyasyon gruplarıyla (#2..#5) tekrarlanır; katalog büyüdükçe
+    sonraki turlar #6, #7... ile devam eder.
+    """
+    round_number = 0
+    while True:
+        for template in PRODUCT_TEMPLATES:
+            for name in template["names"]:
+                for suffix in template["suffix"]:
+                    for i in range(round_number * 5, round_number * 5 + 5):
+                        title = f"{name} {suffix}".strip()
+                        if i > 0:
+                            title = f"{title} #{i+1}"
+                        yield title, template["category"]
+        round_number += 1
+
+
+def generate_products(size: int, rng: random.Random) -> Iterator[dict]:
+    """Vitrin ürünleri + şablon ürünleri; toplam `size` adet"""
+    for number, product in enumerate(FEATURED_PRODUCTS[:size]):
+        yield {
+            "id": random_id(rng),
+            **product,
+            "created_at": CATALOG_EPOCH + timedelta(seconds=number),
+        }
+
+    titles = template_titles()
+    for number in range(len(FEATURED_PRODUCTS), size):
+        title, category = next(titles)
+        yield {
+            "id": random_id(rng),
+            "title": title,
+            "description": f"{title} - Özenle hazırlanmış taze çiçekler ile sevdiklerinizi mutlu edin",
+            "price": rng.randint(29, 299) * 10 + 9,  # 299 - 2999 arası
+            "category": category,
+            "image": IMAGES[number % len(IMAGES)],
+            "is_bestseller": rng.random() < 0.1,
+            "badge": rng.choice(BADGES),
+            "created_at": CATALOG_EPOCH + timedelta(seconds=number),
+        }
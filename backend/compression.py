@@ -0,0 +1,157 @@
+"""
+HTTP yanıt sıkıştırma: Accept-Encoding'e göre brotli (paket kuruluysa) veya
+gzip. CompressionMiddleware küçük ve sıkıştırılamayan yanıtlara dokunmaz;
+önceden sıkıştırılmış (Content-Encoding taşıyan) yanıtları olduğu gibi geçirir.
+Önbellekteki gövdeler compress_variants() ile bir kez sıkıştırılıp saklanır.
+"""
+import gzip
+import zlib
+from typing import Dict, Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+
+try:
+    import brotli
+except ImportError:  # brotli opsiyonel; yoksa yalnızca gzip kullanılır
+    brotli = None
+
+
+COMPRESSIBLE_TYPES = ("application/json", "text/", "application/javascript", "image/svg+xml")
+
+
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    """İstemcinin kabul ettiği en iyi kodlama: önce br, sonra gzip"""
+    accepted = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name.strip().lower()] = quality
+    for encoding in ("br", "gzip"):
+        if encoding == "br" and brotli is None:
+            continue
+        if accepted.get(encoding, accepted.get("*", 0.0)) > 0:
+            return encoding
+    return None
+
+
+def compress(body: bytes, encoding: str, level: int) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=level)
+    return gzip.compress(body, compresslevel=level, mtime=0)
+
+
+def compress_variants(body: bytes, minimum_size: int = 1024, gzip_level: int = 9, brotli_quality: int = 9) -> Dict[str, bytes]:
+    """
+    Önbelleğe konacak gövdenin tüm kodlamaları (küçük gövdeler sıkıştırılmaz).
+    Brotli 11 100 ürünlük sayfada ~70 ms sürer, 9 ise ~5 ms ve %10 daha büyük;
+    nadiren yeniden kurulan gövdeler için 11 verilebilir.
+    """
+    variants = {"identity": body}
+    if len(body) >= minimum_size:
+        variants["gzip"] = compress(body, "gzip", gzip_level)
+        if brotli is not None:
+            variants["br"] = compress(body, "br", brotli_quality)
+    return variants
+
+
+class _StreamCompressor:
+    def __init__(self, encoding: str, level: int):
+        if encoding == "br":
+            self._brotli = brotli.Compressor(quality=level)
+            self._zlib = None
+        else:
+            self._brotli = None
+            self._zlib = zlib.compressobj(level, zlib.DEFLATED, 31)  # 31: gzip başlığı
+
+    def process(self, chunk: bytes) -> bytes:
+        if self._brotli is not None:
+            return self._brotli.process(chunk)
+        return self._zlib.compress(chunk)
+
+    def finish(self) -> bytes:
+        if self._brotli is not None:
+            return self._brotli.finish()
+        return self._zlib.flush()
+
+
+class CompressionMiddleware:
+    """Saf ASGI middleware; tek parça ve akış (StreamingResponse) yanıtlarını destekler"""
+
+    def __init__(self, app, minimum_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 4):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.levels = {"gzip": gzip_level, "br": brotli_quality}
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+        pending = b""
+        state = None  # None: karar verilmedi, "pass" veya "compress"
+        compressor = None
+
+        async def send_compressed(message):
+            nonlocal start_message, pending, state, compressor
+            if message["type"] == "http.response.start":
+                start_message = message  # gövdenin ilk parçası gelene kadar beklet
+                return
+            if message["type"] != "http.response.body" or state == "pass":
+                await send(message)
+                return
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if state == "compress":
+                chunk = compressor.process(body)
+                if not more_body:
+                    chunk += compressor.finish()
+                await send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+                return
+
+            headers = MutableHeaders(raw=start_message["headers"])
+            if (
+                "content-encoding" in headers
+                or start_message["status"] in (204, 206, 304)
+                or not headers.get("content-type", "").startswith(COMPRESSIBLE_TYPES)
+            ):
+                state = "pass"
+                await send(start_message)
+                await send(message)
+                return
+            # Parça parça gelen (ör. BaseHTTPMiddleware'den geçen) gövdeyi eşiğe kadar biriktir
+            pending += body
+            if more_body and len(pending) < self.minimum_size:
+                return
+            if len(pending) < self.minimum_size:
+                state = "pass"
+                await send(start_message)
+                await send({"type": "http.response.body", "body": pending})
+                return
+
+            headers.add_vary_header("Accept-Encoding")
+            headers["Content-Encoding"] = encoding
+            if not more_body:
+                body = compress(pending, encoding, self.levels[encoding])
+                headers["Content-Length"] = str(len(body))
+                await send(start_message)
+                await send({"type": "http.response.body", "body": body})
+                return
+            del headers["Content-Length"]
+            state = "compress"
+            compressor = _StreamCompressor(encoding, self.levels[encoding])
+            await send(start_message)
+            await send({"type": "http.response.body", "body": compressor.process(pending), "more_body": True})
+            pending = b""
+
+        await self.app(scope, receive, send_compressed)
@@ -0,0 +1,159 @@
+"""
+Çevrimdışı Türkiye konum sözlüğü (il / ilçe / mahalle).
+
+data/gazetteer_tr.tsv dosyası startup'ta sıralı bir önek index'ine yüklenir.
+Paketle gelen veri 81 ilin ve 973 ilçenin tamamını içerir; mahalleler
+GAZETTEER_PATH ile verilen aynı biçimdeki (.tsv.gz olabilir) bir dosyadan
+gelir. /api/locations/search tam ad eşleşmesinde yalnızca buradan döner,
+önek eşleşmelerini Photon/Nominatim sonuçlarıyla birleştirir, eşleşme
+yoksa doğrudan upstream'e gider. Sonuçlar upstream ile aynı
+{"display_name", "name", "district", "city", "type"} biçimindedir.
+"""
+import bisect
+import gzip
+import sys
+import time
+from pathlib import Path
+from typing import List, Tuple
+
+from search_index import tokenize
+
+
+# Aynı ada sahip kayıtlarda önce il, sonra ilçe, sonra mahalle gelir
+LEVEL_ORDER = {"province": 0, "district": 1, "neighbourhood": 2}
+
+
+def location_key(item: dict) -> Tuple[str, ...]:
+    """
+    Sonucun katlanmış (il, ilçe, mahalle) yolu; boş ve art arda tekrarlanan
+    seviyeler atılır. Sözlükteki "Kadıköy/İstanbul" ilçe kaydı (ad = ilçe) ile
+    Photon'un ilçesiz "Kadıköy, İstanbul" sonucu aynı anahtarı verir.
+    """
+    key = []
+    for part in (item.get("city", ""), item.get("district", ""), item.get("name", "")):
+        folded = " ".join(tokenize(part or ""))
+        if folded and (not key or key[-1] != folded):
+            key.append(folded)
+    return tuple(key)
+
+
+class Gazetteer:
+    def __init__(self):
+        self._keys: List[Tuple[str, int]] = []   # (katlanmış ad, kayıt no) sıralı
+        self._records: List[tuple] = []          # (ad, ilçe, il, tür, katlanmış üst seviyeler)
+        self._parents = {}                       # (ilçe, il) -> paylaşılan katlanmış üst seviye tuple'ı
+        self.load_ms = 0.0
+        self.memory_bytes = 0
+        self.source = ""
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def load(self, path: Path):
+        """TSV (il, ilçe, mahalle) dosyasını yükle; süre ve bellek kullanımını ölç"""
+        started = time.perf_counter()
+        opener = gzip.open if path.suffix == ".gz" else open
+        with opener(path, "rt", encoding="utf-8") as f:
+            for line in f:
+                if not line.strip() or line.startswith("#"):
+                    continue
+                province, district, neighbourhood = (line.rstrip("\n").split("\t") + ["", ""])[:3]
+                self.add(province.strip(), district.strip(), neighbourhood.strip())
+        self._keys.sort()
+        self.load_ms = round((time.perf_counter() - started) * 1000, 1)
+        self.memory_bytes = self._measure_memory()
+        self.source = str(path)
+
+    def _measure_memory(self) -> int:
+        """Index'in kapladığı belleği nesne boyutlarından hesapla (paylaşılan nesneler bir kez)"""
+        seen = set()
+        total = sys.getsizeof(self._keys) + sys.getsizeof(self._records) + sys.getsizeof(self._parents)
+
+        def size(obj) -> int:
+            if id(obj) in seen:
+                return 0
+            seen.add(id(obj))
+            return sys.getsizeof(obj)
+
+        for key in self._keys:
+            total += size(key) + size(key[0])
+        for record in self._records:
+            total += size(record) + sum(size(part) for part in record[:4])
+            parents = record[4]
+            if id(parents) not in seen:
+                total += size(parents) + sum(size(p) for p in parents)
+        return total
+
+    def add(self, province: str, district: str = "", neighbourhood: str = ""):
+        if neighbourhood:
+            name, kind = neighbourhood, "neighbourhood"
+        elif district:
+            name, kind = district, "district"
+        else:
+            name, kind = province, "province"
+        tokens = tokenize(name)
+        if not tokens:
+            return
+        # İl/ilçe adları binlerce mahallede tekrarlanır; string ve tuple'ları paylaş
+        district, province = sys.intern(district), sys.intern(province)
+        parent_key = (district if neighbourhood else "", province if kind != "province" else "")
+        parents = self._parents.get(parent_key)
+        if parents is None:
+            parents = self._parents[parent_key] = tuple(tokenize(" ".join(parent_key)))
+        number = len(self._records)
+        self._records.append((name, district, province, kind, parents))
+        # Çok kelimeli adlar kelime başlarından da bulunabilsin ("Kemal Paşa" -> "pasa")
+        for start in range(len(tokens)):
+            self._keys.append((" ".join(tokens[start:]), number))
+
+    def _format(self, record: tuple) -> dict:
+        name, district, province, kind, _ = record
+        if kind == "province":
+            return {"display_name": f"{province}, Türkiye", "name": province, "district": "", "city": province, "type": kind}
+        if kind == "district":
+            return {"display_name": f"{district}/{province}, Türkiye", "name": district, "district": district, "city": province, "type": kind}
+        return {"display_name": f"{name}, {district}/{province}, Türkiye", "name": name, "district": district, "city": province, "type": kind}
+
+    def _range(self, prefix: str):
+        lo = bisect.bisect_left(self._keys, (prefix,))
+        hi = bisect.bisect_left(self._keys, (prefix + "\x7f",))
+        return self._keys[lo:hi]
+
+    def lookup(self, query: str, limit: int = 8) -> Tuple[List[dict], bool]:
+        """
+        Önce sorgunun tamamını ad öneki olarak dene ("kadikoy", "yeni mah");
+        olmazsa ilk kelimeyi ad, kalanları üst seviye (ilçe/il) öneki say
+        ("moda kadikoy", "cankaya ankara").
+
+        İkinci değer eşleşmenin tam olup olmadığıdır: sorgu bir adın tam
+        kelimeleriyle ("kadikoy", "pasa") ya da ad + tam üst seviye
+        kelimeleriyle ("cankaya ankara") örtüşüyorsa True. Yalnızca önek
+        eşleşmesi ("kad") False döner; sözlük eksik olabileceğinden çağıran
+        bu durumda upstream'e de sormalıdır.
+        """
+        tokens = tokenize(query)
+        if not tokens:
+            return [], False
+        prefix = " ".join(tokens)
+        matches, complete = set(), False
+        for key, number in self._range(prefix):
+            matches.add(number)
+            complete = complete or key == prefix
+        if not matches and len(tokens) > 1:
+            rest = tokens[1:]
+            for key, number in self._range(tokens[0]):
+                parents = self._records[number][4]
+                if all(any(p.startswith(t) for p in parents) for t in rest):
+                    matches.add(number)
+                    complete = complete or (key == tokens[0] and all(t in parents for t in rest))
+        ranked = sorted(matches, key=lambda n: (LEVEL_ORDER[self._records[n][3]], len(self._records[n][0]), self._records[n][0]))
+        return [self._format(self._records[n]) for n in ranked[:limit]], complete
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._records),
+            "keys": len(self._keys),
+            "load_ms": self.load_ms,
+            "memory_bytes": self.memory_bytes,
+            "source": self.source,
+        }
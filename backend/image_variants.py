@@ -0,0 +1,139 @@
+"""
+Ürün görsellerinin küçük türevleri (AVIF/WebP) için manifest okuyucu.
+
+Türevler depo kökünde image_derivatives.py ile üretilir; images/derivatives.json
+görsel URL'sini (ve local_images yolunu) içerik özetine, özeti de sabit
+genişlikli dosyalara eşler. Kart yanıtlarına eklenen image_variants alanı
+<picture>/<source srcset> için hazırdır:
+
+    {"width": 600, "height": 660, "src": ".../<sha>-320.webp",
+     "sources": [{"type": "image/avif", "srcset": ".../<sha>-160.avif 160w, ..."}, ...]}
+
+Dosya adları içerikten türediği için yanıtlar immutable önbelleklenebilir.
+Manifest değişirse (yeni üretim) en geç poll_interval saniyede yeniden okunur;
+`version` kart önbelleği ve ETag anahtarlarına girer.
+"""
+import json
+import re
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+
+MEDIA_TYPES = {"avif": "image/avif", "webp": "image/webp"}
+# Tarayıcı ilk desteklediği <source>'u seçer: önce en küçük biçim
+FORMAT_ORDER = ("avif", "webp")
+DERIVED_NAME = re.compile(r"[0-9a-f]{64}-\d{1,5}\.(avif|webp)")
+SHARD = re.compile(r"[0-9a-f]{2}")
+FALLBACK_WIDTH = 320  # srcset desteklemeyen istemciler için src
+
+
+def normalize_path(local_path: str) -> str:
+    return local_path.replace("\\", "/").strip("/")
+
+
+class ImageVariants:
+    def __init__(self, root: Path, base_url: str = "/api/images", poll_interval: float = 30.0):
+        self.root = Path(root)
+        self.manifest_path = self.root / "derivatives.json"
+        self.base_url = base_url.rstrip("/")
+        self.poll_interval = poll_interval
+        self.version = 0
+        self.images: Dict[str, dict] = {}
+        self.urls: Dict[str, str] = {}
+        self.paths: Dict[str, str] = {}
+        self._metadata: Dict[str, dict] = {}
+        self._mtime = None
+        self._checked: Optional[float] = None
+        self.hits = 0
+        self.misses = 0
+
+    def refresh(self, force: bool = False) -> bool:
+        """Manifest değiştiyse yeniden oku (en fazla poll_interval'da bir stat)"""
+        now = time.monotonic()
+        if not force and self._checked is not None and now - self._checked < self.poll_interval:
+            return False
+        self._checked = now
+        try:
+            mtime = self.manifest_path.stat().st_mtime
+        except OSError:
+            mtime = None
+        if mtime == self._mtime:
+            return False
+        data = {}
+        if mtime is not None:
+            try:
+                data = json.loads(self.manifest_path.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                return False  # yazılırken okunduysa sonraki kontrolde tekrar denenir
+        self.images = data.get("images", {})
+        self.urls = data.get("urls", {})
+        self.paths = {normalize_path(path): digest for path, digest in data.get("paths", {}).items()}
+        self._metadata = {}
+        self._mtime = mtime
+        self.version += 1
+        return True
+
+    def digest_for(self, image: str) -> Optional[str]:
+        if image.startswith("/images/"):
+            return self.paths.get(normalize_path(image[len("/images/"):]))
+        return self.urls.get(image)
+
+    def metadata(self, digest: str) -> Optional[dict]:
+        cached = self._metadata.get(digest)
+        if cached is not None:
+            return cached
+        entry = self.images.get(digest)
+        if not entry or not entry.get("variants"):
+            return None
+        by_format = {}
+        for variant in entry["variants"]:
+            by_format.setdefault(variant["format"], []).append(variant)
+        sources = []
+        for fmt in FORMAT_ORDER:
+            variants = sorted(by_format.get(fmt, []), key=lambda v: v["width"])
+            if variants:
+                srcset = ", ".join(f"{self.base_url}/{v['path']} {v['width']}w" for v in variants)
+                sources.append({"type": MEDIA_TYPES[fmt], "srcset": srcset})
+        fallback_variants = sorted(by_format.get("webp") or entry["variants"], key=lambda v: v["width"])
+        fallback = next((v for v in fallback_variants if v["width"] >= FALLBACK_WIDTH), fallback_variants[-1])
+        cached = self._metadata[digest] = {
+            "width": entry["width"],
+            "height": entry["height"],
+            "src": f"{self.base_url}/{fallback['path']}",
+            "sources": sources,
+        }
+        return cached
+
+    def attach(self, products: Iterable[dict]):
+        """image alanı türevi olan ürünlere image_variants ekle (yerinde)"""
+        for product in products:
+            image = product.get("image")
+            if not image:
+                continue
+            digest = self.digest_for(image)
+            metadata = self.metadata(digest) if digest else None
+            if metadata is None:
+                self.misses += 1
+                continue
+            self.hits += 1
+            product["image_variants"] = metadata
+
+    def file_path(self, shard: str, name: str) -> Optional[Path]:
+        """derived/<shard>/<ad> isteğini diskteki dosyaya çevir (yol dışına çıkılamaz)"""
+        if not SHARD.fullmatch(shard) or not DERIVED_NAME.fullmatch(name) or not name.startswith(shard):
+            return None
+        path = self.root / "derived" / shard / name
+        return path if path.is_file() else None
+
+    def media_type(self, name: str) -> str:
+        return MEDIA_TYPES[name.rsplit(".", 1)[-1]]
+
+    def stats(self) -> dict:
+        return {
+            "version": self.version,
+            "images": len(self.images),
+            "urls": len(self.urls),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
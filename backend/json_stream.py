@@ -0,0 +1,49 @@
+"""
+Parça parça okunan JSON dizisi / NDJSON içeriğinden ürün nesnelerini çözer.
+
+Dosyanın tamamı belleğe alınmaz: her feed() çağrısı o ana kadar tamamlanmış
+nesneleri döndürür, yarım kalan kısım bir sonraki parçayı bekler. Hem
+`[{...}, {...}]` hem de satır başına bir nesne (NDJSON) kabul edilir.
+"""
+import codecs
+import json
+from typing import List
+
+
+class JSONItemDecoder:
+    # Tek bir nesnenin bu boyutu aşması bozuk/eksik veri demektir
+    MAX_PENDING_CHARS = 16 * 1024 * 1024
+    SEPARATORS = " \t\r\n,[]"
+
+    def __init__(self):
+        self._text = codecs.getincrementaldecoder("utf-8-sig")()
+        self._decoder = json.JSONDecoder()
+        self._buffer = ""
+        self.items_decoded = 0
+
+    def feed(self, chunk: bytes) -> List:
+        buffer = self._buffer + self._text.decode(chunk)
+        items = []
+        position, length = 0, len(buffer)
+        while True:
+            while position < length and buffer[position] in self.SEPARATORS:
+                position += 1
+            if position >= length:
+                break
+            try:
+                item, end = self._decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                break  # nesne henüz tamamlanmadı
+            items.append(item)
+            position = end
+        self._buffer = buffer[position:]
+        if len(self._buffer) > self.MAX_PENDING_CHARS:
+            raise ValueError("JSON nesnesi çok büyük veya dosya bozuk")
+        self.items_decoded += len(items)
+        return items
+
+    def close(self):
+        """Dosya bittiğinde yarım kalan veri varsa hata ver"""
+        rest = self._buffer + self._text.decode(b"", final=True)
+        if rest.strip(self.SEPARATORS):
+            raise ValueError("Geçersiz veya yarım kalmış JSON")
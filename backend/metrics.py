@@ -0,0 +1,297 @@
+"""
+İstek seviyesinde performans ölçümü ve Prometheus metin biçiminde dışa aktarım.
+
+- MetricsMiddleware: route başına gecikme histogramı, durum kodu sayacı,
+  uçuştaki istek göstergesi ve (istenirse) Server-Timing başlığı
+- MongoCommandListener: pymongo komut süreleri (Motor, işi thread'de yaparken
+  context'i kopyalar; süreler o isteğin Server-Timing'ine de yazılır)
+- InstrumentedTransport: httpx upstream çağrılarının süresi
+- span(): uygulama içi bölümler (ör. import'ta pydantic doğrulaması)
+
+Harici bağımlılık yoktur; çıktı Prometheus text exposition 0.0.4 biçimindedir.
+"""
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Optional, Sequence, Tuple
+
+import httpx
+from pymongo import monitoring
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.routing import Match
+
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+HTTP_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+MONGO_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()  # CommandListener executor thread'lerinden çağrılır
+        self._values: Dict[Tuple[str, ...], object] = {}
+
+    def _key(self, labels: dict) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            lines.extend(self._render_value(key, value))
+        return lines
+
+    def _render_value(self, key, value) -> list:
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = HTTP_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                # [kova sayıları..., toplam, adet]; kovalar render'da kümülatif yapılır
+                state = self._values[key] = [0] * len(self.buckets) + [0.0, 0]
+            for position, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[position] += 1
+                    break
+            state[-2] += value
+            state[-1] += 1
+
+    def _render_value(self, key, state) -> list:
+        lines, cumulative = [], 0
+        for position, bound in enumerate(self.buckets):
+            cumulative += state[position]
+            labels = _format_labels(self.labelnames, key, f'le="{_format_value(bound)}"')
+            lines.append(f"{self.name}_bucket{labels} {cumulative}")
+        labels = _format_labels(self.labelnames, key)
+        lines.append(f"{self.name}_sum{labels} {_format_value(state[-2])}")
+        lines.append(f"{self.name}_count{labels} {state[-1]}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> bytes:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return ("\n".join(lines) + "\n").encode("utf-8")
+
+
+REGISTRY = Registry()
+http_requests = REGISTRY.register(Counter(
+    "http_requests_total", "Tamamlanan HTTP istekleri", ("method", "route", "status")))
+http_latency = REGISTRY.register(Histogram(
+    "http_request_duration_seconds", "HTTP istek süresi (yanıt gövdesi gönderilene kadar)", ("method", "route")))
+http_in_flight = REGISTRY.register(Gauge(
+    "http_requests_in_flight", "İşlenmekte olan HTTP istekleri", ("method",)))
+mongo_latency = REGISTRY.register(Histogram(
+    "mongodb_command_duration_seconds", "MongoDB komut süresi", ("command",), MONGO_BUCKETS))
+mongo_failures = REGISTRY.register(Counter(
+    "mongodb_command_failures_total", "Hata ile biten MongoDB komutları", ("command",)))
+upstream_latency = REGISTRY.register(Histogram(
+    "upstream_request_duration_seconds", "Harici HTTP çağrıları (yanıt başlıkları gelene kadar)", ("host", "status")))
+span_latency = REGISTRY.register(Histogram(
+    "app_span_duration_seconds", "Uygulama içi ölçülen bölümler", ("span",), MONGO_BUCKETS))
+
+
+# ===== İSTEK BAŞINA SÜRELER (Server-Timing) =====
+class RequestTimings:
+    """Bir isteğin alt bileşenlerde (mongo, upstream, ...) geçirdiği toplam süre"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.durations: Dict[str, float] = {}
+        self.counts: Dict[str, int] = {}
+
+    def add(self, name: str, seconds: float):
+        with self._lock:
+            self.durations[name] = self.durations.get(name, 0.0) + seconds
+            self.counts[name] = self.counts.get(name, 0) + 1
+
+    def header(self, total: float) -> str:
+        parts = [f"app;dur={total * 1000:.1f}"]
+        with self._lock:
+            for name, seconds in sorted(self.durations.items()):
+                parts.append(f'{name};dur={seconds * 1000:.1f};desc="{self.counts[name]}x"')
+        return ", ".join(parts)
+
+
+current_timings: ContextVar[Optional[RequestTimings]] = ContextVar("current_timings", default=None)
+
+
+def record(name: str, seconds: float):
+    timings = current_timings.get()
+    if timings is not None:
+        timings.add(name, seconds)
+
+
+@contextmanager
+def span(name: str):
+    """with span("validation"): ... -> histogram + o isteğin Server-Timing'i"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        span_latency.observe(elapsed, span=name)
+        record(name, elapsed)
+
+
+# ===== MONGODB =====
+class MongoCommandListener(monitoring.CommandListener):
+    """AsyncIOMotorClient(..., event_listeners=[MongoCommandListener()])"""
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        seconds = event.duration_micros / 1_000_000
+        mongo_latency.observe(seconds, command=event.command_name)
+        record("mongo", seconds)
+
+    def failed(self, event):
+        seconds = event.duration_micros / 1_000_000
+        mongo_latency.observe(seconds, command=event.command_name)
+        mongo_failures.inc(command=event.command_name)
+        record("mongo", seconds)
+
+
+# ===== HTTPX =====
+class InstrumentedTransport(httpx.AsyncBaseTransport):
+    """Upstream çağrılarını süre ve durum koduyla kaydeden transport sarmalayıcısı"""
+
+    def __init__(self, transport: httpx.AsyncBaseTransport):
+        self._transport = transport
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        started = time.perf_counter()
+        status = "error"
+        try:
+            response = await self._transport.handle_async_request(request)
+            status = str(response.status_code)
+            return response
+        finally:
+            elapsed = time.perf_counter() - started
+            upstream_latency.observe(elapsed, host=request.url.host, status=status)
+            record("upstream", elapsed)
+
+    async def aclose(self):
+        await self._transport.aclose()
+
+
+# ===== ASGI MIDDLEWARE =====
+def route_label(app, scope) -> str:
+    """Route şablonu (/api/products/{product_id}); eşleşmeyenler tek etikette toplanır"""
+    route = scope.get("route")
+    if route is None:
+        # Route'a ulaşmadan dönen yanıtlar (ör. 304) için eşleşen route'u bul
+        for candidate in getattr(app, "routes", ()):
+            match, _ = candidate.matches(scope)
+            if match == Match.FULL:
+                route = candidate
+                break
+    return getattr(route, "path", None) or "unmatched"
+
+
+class MetricsMiddleware:
+    """
+    En dışa eklenmelidir. server_timing=True ise her yanıta, değilse yalnızca
+    'X-Server-Timing: 1' başlığıyla gelen isteklere Server-Timing eklenir.
+    """
+
+    def __init__(self, app, router=None, server_timing: bool = False):
+        self.app = app
+        self.router = router
+        self.server_timing = server_timing
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        method = scope["method"]
+        timings = RequestTimings()
+        token = current_timings.set(timings)
+        add_header = self.server_timing or Headers(scope=scope).get("x-server-timing") == "1"
+        status = 500
+        started = time.perf_counter()
+
+        async def send_timed(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if add_header:
+                    headers = MutableHeaders(scope=message)
+                    headers.append("Server-Timing", timings.header(time.perf_counter() - started))
+            await send(message)
+
+        http_in_flight.inc(method=method)
+        try:
+            await self.app(scope, receive, send_timed)
+        finally:
+            elapsed = time.perf_counter() - started
+            http_in_flight.dec(method=method)
+            route = route_label(self.router, scope)
+            http_latency.observe(elapsed, method=method, route=route)
+            http_requests.inc(method=method, route=route, status=str(status))
+            current_timings.reset(token)
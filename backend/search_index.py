@@ -0,0 +1,555 @@
+"""
+Ürün araması için süreç içi ters index (inverted index).
+
+Başlık, kategori ve açıklama Türkçe'ye duyarlı şekilde ASCII'ye katlanır
+(İ/ı -> i, ş -> s, ğ -> g, ç -> c, ö -> o, ü -> u), kelimelere bölünür ve
+BM25 ile sıralanır. Sorgunun son kelimesi yazılırken arandığı için önek
+olarak genişletilir ("gül buk" -> "gul buketi"). SuggestIndex aynı
+normalizasyonla başlık/kategori önerileri üretir.
+
+Posting listeleri kompakt array.array'lerde tutulur (posting başına 12 bayt)
+ve sorgu anında numpy ile skorlanır; 100k ürünlük katalogda tek sorgu
+birkaç milisaniyede cevaplanır.
+"""
+import bisect
+import heapq
+import math
+import re
+import unicodedata
+from array import array
+from collections import Counter
+from contextlib import contextmanager
+from typing import Iterable, List, Optional, Tuple
+
+import numpy as np
+
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def fold_turkish(text: str) -> str:
+    """
+    Türkçe karakterleri ASCII karşılıklarına çevir ve küçük harfe indir.
+    ş/ğ/ç/ö/ü ve "İ".lower() sonucundaki birleşik nokta NFKD ile ayrışır;
+    ayrışmayan tek harf noktasız ı'dır.
+    """
+    text = text.lower()
+    if text.isascii():
+        return text
+    text = text.replace("ı", "i")
+    return unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode("ascii")
+
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN_RE.findall(fold_turkish(text))
+
+
+# Alan ağırlıkları: başlıkta geçen kelime açıklamada geçenden daha değerli
+FIELD_WEIGHTS = {"title": 3.0, "category": 2.0, "description": 1.0}
+
+# Index'e alınacak ürün alanları (Mongo projection'ı için)
+INDEXED_FIELDS = {"_id": 0, "id": 1, "title": 1, "category": 1, "description": 1, "is_bestseller": 1}
+
+
+class SearchIndex:
+    """
+    Ürün id'lerini döndüren BM25 ters index'i.
+
+    Her ürün bir slot numarası alır. Posting'ler (slot, impact, frekans)
+    üçlüleridir; impact BM25 terim bileşenidir ve sorgu anında sadece idf ile
+    çarpılıp toplanır. Uzunluk normalizasyonu tüm belgeler için aynı ortalama
+    uzunlukla (_norm_length) yapılır: add_many partinin sonunda gerçek ortalama
+    bu değerden NORM_TOLERANCE'tan fazla saptıysa bütün impact'ler saklanan
+    frekanslardan tek geçişte yeniden hesaplanır, böylece skorlar ekleme
+    sırasına bağlı olmaz. Toplu kurulum normalize=False ile ekleyip sonda
+    normalize() çağırır.
+
+    Çok terime genişleyen önekler ("gu" -> gul, gun, guzel...) yüz binlerce
+    posting'e dokunur; genişletilmiş grubun skorları PREFIX_CACHE_SIZE
+    önek için saklanır ve index her değiştiğinde düşürülür. Silinen
+    ürünlerin slot'ları ölü işaretlenir, ölü posting sayısı canlıları geçince
+    sıkıştırılır.
+    """
+
+    K1 = 1.2
+    B = 0.75
+    MAX_PREFIX_EXPANSIONS = 50
+    PREFIX_WEIGHT = 0.8
+    NORM_TOLERANCE = 0.01
+    PREFIX_CACHE_SIZE = 64
+    PREFIX_CACHE_MIN_POSTINGS = 20000
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self._ids: List[Optional[str]] = []   # slot -> ürün id (silinmişse None)
+        self._slots = {}                      # ürün id -> slot
+        self._alive = bytearray()
+        self._bestseller = bytearray()
+        self._lengths = array("f")
+        self._postings = {}                   # terim -> (array('i') slot, array('f') impact, array('f') frekans)
+        self._vocab: List[str] = []           # sıralı terim listesi (önek araması)
+        self._total_length = 0.0
+        self._norm_length = 0.0               # impact'lerin hesaplandığı ortalama uzunluk
+        self._count = 0
+        self._dead = 0
+        self._prefix_cache = {}               # son kelime -> (slot'lar, grup skorları)
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __contains__(self, product_id: str) -> bool:
+        return product_id in self._slots
+
+    def add(self, product: dict):
+        self.add_many((product,))
+
+    def add_many(self, products: Iterable[dict], normalize: bool = True):
+        for product in products:
+            self._insert(product)
+        if normalize:
+            self.normalize(force=False)
+
+    def _insert(self, product: dict):
+        product_id = product.get("id")
+        if not product_id:
+            return
+        if product_id in self._slots:
+            self.remove(product_id)
+
+        frequencies = {}
+        for field, weight in FIELD_WEIGHTS.items():
+            text = product.get(field)
+            if not text:
+                continue
+            for term, count in Counter(tokenize(text)).items():
+                frequencies[term] = frequencies.get(term, 0.0) + count * weight
+        length = sum(frequencies.values())
+
+        slot = len(self._ids)
+        self._ids.append(product_id)
+        self._slots[product_id] = slot
+        self._alive.append(1)
+        self._bestseller.append(1 if product.get("is_bestseller") else 0)
+        self._lengths.append(length)
+        self._total_length += length
+        self._count += 1
+        self._prefix_cache.clear()
+
+        if not self._norm_length:
+            self._norm_length = length or 1.0
+        norm = self.K1 * (1 - self.B + self.B * length / self._norm_length)
+        k1_plus = self.K1 + 1
+        for term, freq in frequencies.items():
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = (array("i"), array("f"), array("f"))
+                bisect.insort(self._vocab, term)
+            postings[0].append(slot)
+            postings[1].append(freq * k1_plus / (freq + norm))
+            postings[2].append(freq)
+
+    def normalize(self, force: bool = True):
+        """
+        Impact'leri güncel ortalama uzunlukla yeniden hesapla. force=False
+        iken ortalama _norm_length'ten NORM_TOLERANCE'tan az saptıysa atlanır
+        (tek ürünlük yazmalar her seferinde tüm index'i gezmesin).
+        """
+        if not self._count:
+            return
+        average = self._total_length / self._count or 1.0
+        if not force and abs(average - self._norm_length) <= self.NORM_TOLERANCE * self._norm_length:
+            return
+        lengths = np.frombuffer(self._lengths, dtype=np.float32)
+        norms = (self.K1 * (1 - self.B + self.B * lengths / np.float32(average))).astype(np.float32)
+        k1_plus = np.float32(self.K1 + 1)
+        for slots, impacts, frequencies in self._postings.values():
+            slot_view = np.frombuffer(slots, dtype=np.int32)
+            freq_view = np.frombuffer(frequencies, dtype=np.float32)
+            impact_view = np.frombuffer(impacts, dtype=np.float32)
+            impact_view[:] = freq_view * k1_plus / (freq_view + norms[slot_view])
+            del slot_view, freq_view, impact_view
+        del lengths
+        self._norm_length = average
+        self._prefix_cache.clear()
+
+    def remove(self, product_id: str):
+        slot = self._slots.pop(product_id, None)
+        if slot is None:
+            return
+        self._ids[slot] = None
+        self._alive[slot] = 0
+        self._total_length -= self._lengths[slot]
+        self._count -= 1
+        self._dead += 1
+        self._prefix_cache.clear()
+        if self._dead > max(1000, self._count):
+            self.compact()
+
+    def compact(self):
+        """Ölü slot'lara ait posting'leri ve boşalan terimleri temizle"""
+        alive = np.frombuffer(self._alive, dtype=np.uint8).astype(bool)
+        for term in list(self._postings):
+            slots, impacts, frequencies = self._postings[term]
+            slot_view = np.frombuffer(slots, dtype=np.int32)
+            keep = alive[slot_view]
+            if keep.all():
+                continue
+            if not keep.any():
+                del self._postings[term]
+                position = bisect.bisect_left(self._vocab, term)
+                if position < len(self._vocab) and self._vocab[position] == term:
+                    del self._vocab[position]
+                continue
+            impact_view = np.frombuffer(impacts, dtype=np.float32)
+            freq_view = np.frombuffer(frequencies, dtype=np.float32)
+            self._postings[term] = (
+                array("i", slot_view[keep].tobytes()),
+                array("f", impact_view[keep].tobytes()),
+                array("f", freq_view[keep].tobytes()),
+            )
+            del slot_view, impact_view, freq_view
+        self._dead = 0
+        self._prefix_cache.clear()
+
+    def _idf(self, df: int) -> float:
+        return math.log(1 + max(self._count - df + 0.5, 0.5) / (df + 0.5))
+
+    def _arrays(self, term: str):
+        slots, impacts, _ = self._postings[term]
+        return np.frombuffer(slots, dtype=np.int32), np.frombuffer(impacts, dtype=np.float32)
+
+    def _expand_prefix(self, prefix: str) -> List[str]:
+        start = bisect.bisect_left(self._vocab, prefix)
+        terms = []
+        for term in self._vocab[start:start + self.MAX_PREFIX_EXPANSIONS]:
+            if not term.startswith(prefix):
+                break
+            terms.append(term)
+        return terms
+
+    def _term_scores(self, term: str, factor: float = 1.0, idf_cap: Optional[float] = None):
+        slots, impacts = self._arrays(term)
+        idf = self._idf(len(slots))
+        if factor != 1.0 and idf_cap is not None:
+            idf = min(idf, idf_cap)
+        return slots, impacts * np.float32(idf * factor)
+
+    def _prefix_scores(self, last: str, expansions: List[str]):
+        """Son kelimenin genişletmeleri: her slot için en iyi terimin skoru (slot'lar, skorlar)"""
+        if len(expansions) == 1:
+            return self._term_scores(expansions[0], 1.0 if expansions[0] == last else self.PREFIX_WEIGHT)
+        cached = self._prefix_cache.get(last)
+        if cached is not None:
+            return cached
+        # Yazılan kelime tam terim olarak varsa genişletmeler ondan nadir (yüksek
+        # idf) olduğu için öne geçmesin: "gul" ararken "guller" "gul"ü ezmemeli
+        idf_cap = self._idf(len(self._postings[last][0])) if last in self._postings else None
+        best = np.zeros(len(self._ids), dtype=np.float32)
+        postings = 0
+        for term in expansions:
+            slots, scores = self._term_scores(term, 1.0 if term == last else self.PREFIX_WEIGHT, idf_cap)
+            best[slots] = np.maximum(best[slots], scores)
+            postings += len(slots)
+        slots = np.flatnonzero(best).astype(np.int32)
+        result = (slots, best[slots])
+        if postings >= self.PREFIX_CACHE_MIN_POSTINGS:
+            if len(self._prefix_cache) >= self.PREFIX_CACHE_SIZE:
+                del self._prefix_cache[next(iter(self._prefix_cache))]
+            self._prefix_cache[last] = result
+        return result
+
+    def search(self, query: str, offset: int = 0, limit: int = 20) -> Tuple[int, List[str]]:
+        """Tüm kelimeleri içeren ürünleri skora göre sırala; (toplam, id listesi) döndür"""
+        terms = tokenize(query)
+        if not terms or not self._count:
+            return 0, []
+
+        # Her grup bir sorgu kelimesinin (slot'lar, skorlar) çiftidir; son
+        # kelimenin grubu önek genişletmelerinin en iyisidir
+        for term in terms[:-1]:
+            if term not in self._postings:
+                return 0, []
+        last = terms[-1]
+        expansions = self._expand_prefix(last)
+        if not expansions:
+            return 0, []
+        groups = [self._term_scores(term) for term in terms[:-1]]
+        groups.append(self._prefix_scores(last, expansions))
+
+        if len(groups) == 1:
+            # Tek grup: slot'ları doğrudan sonuç kümesidir
+            matched, scores = groups[0]
+            scores = scores.astype(np.float64)
+        else:
+            size = len(self._ids)
+            total = np.zeros(size, dtype=np.float64)
+            hits = np.zeros(size, dtype=np.int16)
+            for slots, scores in groups:
+                total[slots] += scores
+                hits[slots] += 1
+            matched = np.flatnonzero(hits == len(groups))
+            scores = total[matched]
+
+        alive = np.frombuffer(self._alive, dtype=np.uint8)[matched].astype(bool)
+        if not alive.all():
+            matched, scores = matched[alive], scores[alive]
+        count = len(matched)
+        wanted = offset + limit
+        if count == 0 or offset >= count:
+            return count, []
+
+        # Sadece ilk `wanted` adayı tam sırala; eşit skorlarda çok satanlar önde
+        if count > wanted:
+            kth = np.partition(scores, count - wanted)[count - wanted]
+            candidates = np.flatnonzero(scores >= kth)
+            matched, scores = matched[candidates], scores[candidates]
+        bestseller = np.frombuffer(self._bestseller, dtype=np.uint8)[matched]
+        order = np.lexsort((matched, 1 - bestseller, -scores))[offset:wanted]
+        return count, [self._ids[slot] for slot in matched[order]]
+
+
+class SuggestIndex:
+    """
+    Yazarken öneri (typeahead) için sıralı anahtar dizisi.
+
+    Her ürün başlığı, kelime başlarından itibaren tüm son ekleriyle
+    ("kirmizi gul buketi", "gul buketi", "buketi") sıralı listeye girer;
+    önek araması iki bisect ile aralığa iner. Aynı başlığı taşıyan ürünler
+    tek öneride birleşir ve çok satan/ürün sayısına göre sıralanır; sıralama
+    anahtarları ayrı tutulur, aralıktan ilk N heapq ile seçilir. Geniş
+    aralıklı kısa önekler için ilk TOP_N sonuç önbelleğe alınır (tek harfler
+    warm() ile önceden); bir kayıt değişince yalnızca anahtarlarının önekleri
+    yerinde güncellenir, gerekirse önbellekten düşülür.
+
+    add_many yeni girdileri sona ekleyip tek seferde sıralar (timsort iki
+    sıralı parçayı doğrusal birleştirir); tek tek insort ile kurulum
+    kareseldir.
+    """
+
+    SCAN_LIMIT = 200
+    CACHE_SIZE = 4096
+    TOP_N = 20  # önbellekte önek başına tutulan sonuç (endpoint üst sınırı)
+    CATEGORY_RANK = (1 << 30, 0)
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self._entries: List[Tuple[str, str]] = []   # (anahtar, öneri anahtarı) sıralı
+        self._suggestions = {}                      # öneri anahtarı -> öneri kaydı
+        self._products = {}                         # ürün id -> öneri anahtarı
+        self._order = {}                            # öneri anahtarı -> sıralama anahtarı (küçük önde)
+        self._cache = {}                            # önek -> ilk TOP_N öneri anahtarı
+        self._pending: Optional[List[Tuple[str, str]]] = None  # toplu eklemede sıralanmamış girdiler
+        self._touched: Optional[dict] = None                    # toplu eklemede değişen anahtar -> eski sıra
+
+    def __len__(self) -> int:
+        return len(self._suggestions)
+
+    def clear_products(self):
+        """Ürün önerilerini sil, kategori önerilerini koru"""
+        categories = [r for r in self._suggestions.values() if r["type"] == "category"]
+        self.clear()
+        with self._batch():
+            for record in categories:
+                self._changed(self._insert(record["text"], record))
+
+    @contextmanager
+    def _batch(self):
+        """Girdileri sona biriktir; çıkışta bir kez sırala ve önbelleği güncelle"""
+        self._pending, self._touched = [], {}
+        try:
+            yield
+        finally:
+            pending, touched = self._pending, self._touched
+            self._pending = self._touched = None
+            if pending:
+                self._entries.extend(pending)
+                self._entries.sort()
+            self._refresh_cache(touched)
+
+    @staticmethod
+    def _keys(record_key: str) -> List[str]:
+        tokens = record_key[2:].split(" ")
+        return [" ".join(tokens[start:]) for start in range(len(tokens))]
+
+    def _insert(self, text: str, record: dict):
+        tokens = tokenize(text)
+        if not tokens:
+            return None
+        record_key = record["type"][0] + ":" + " ".join(tokens)
+        if record_key in self._suggestions:
+            return record_key
+        self._suggestions[record_key] = record
+        for key in self._keys(record_key):
+            if self._pending is not None:
+                self._pending.append((key, record_key))
+            else:
+                bisect.insort(self._entries, (key, record_key))
+        return record_key
+
+    def _drop(self, record_key: str):
+        self._suggestions.pop(record_key, None)
+        self._order.pop(record_key, None)
+        for key in self._keys(record_key):
+            entry = (key, record_key)
+            position = bisect.bisect_left(self._entries, entry)
+            if position < len(self._entries) and self._entries[position] == entry:
+                del self._entries[position]
+            elif self._pending:
+                try:
+                    self._pending.remove(entry)  # aynı toplu eklemede eklenip silinen
+                except ValueError:
+                    pass
+
+    def _changed(self, record_key: str, previous=None):
+        """Kaydın sıralama anahtarını yenile; önbellekteki önek sonuçlarını güncelle"""
+        record = self._suggestions.get(record_key)
+        if record is not None:
+            rank = self._rank(record)
+            self._order[record_key] = (-rank[0], -rank[1], len(record["text"]), record_key)
+        if self._touched is not None:
+            self._touched.setdefault(record_key, previous)
+        elif self._cache:
+            self._refresh_cache({record_key: previous})
+
+    def _refresh_cache(self, changed: dict):
+        """
+        changed: öneri anahtarı -> değişiklik öncesi sıra (yeni kayıtta None).
+        Önbellekteki ilk TOP_N listesi, aralıktaki diğer kayıtlar değişmediği
+        için yerinde düzeltilebilir; yalnızca listedeki bir kayıt geriye
+        düştüğünde veya silindiğinde önek düşülür (sonraki aramada yeniden
+        hesaplanır).
+        """
+        if not self._cache or not changed:
+            return
+        keys = sorted((key, record_key) for record_key in changed for key in self._keys(record_key))
+        order = self._order
+        for prefix, top in list(self._cache.items()):
+            position = bisect.bisect_left(keys, (prefix,))
+            affected = set()
+            while position < len(keys) and keys[position][0].startswith(prefix):
+                affected.add(keys[position][1])
+                position += 1
+            if not affected:
+                continue
+            members = set(top)
+            demoted = any(
+                record_key in members and (
+                    order.get(record_key) is None or changed[record_key] is None or order[record_key] > changed[record_key]
+                )
+                for record_key in affected
+            )
+            if demoted:
+                del self._cache[prefix]  # listeden düşebilir: sonraki aramada yeniden hesaplanır
+            else:
+                members.update(record_key for record_key in affected if record_key in order)
+                self._cache[prefix] = heapq.nsmallest(self.TOP_N, members, key=order.__getitem__)
+
+    def add(self, product: dict):
+        product_id = product.get("id")
+        title = product.get("title") or ""
+        if not product_id or not title:
+            return
+        if product_id in self._products:
+            self.remove(product_id)
+        record_key = self._insert(title, {"type": "product", "text": title, "products": {}})
+        if record_key is None:
+            return
+        self._suggestions[record_key]["products"][product_id] = bool(product.get("is_bestseller"))
+        self._products[product_id] = record_key
+        self._changed(record_key, self._order.get(record_key))
+
+    def add_many(self, products: Iterable[dict]):
+        if self._pending is not None:
+            for product in products:
+                self.add(product)
+            return
+        with self._batch():
+            for product in products:
+                self.add(product)
+
+    def remove(self, product_id: str):
+        record_key = self._products.pop(product_id, None)
+        if record_key is None:
+            return
+        previous = self._order.get(record_key)
+        record = self._suggestions.get(record_key)
+        if record is not None:
+            record["products"].pop(product_id, None)
+            if not record["products"]:
+                self._drop(record_key)
+        self._changed(record_key, previous)
+
+    def set_categories(self, categories: Iterable[dict]):
+        with self._batch():
+            for record_key in [k for k, r in self._suggestions.items() if r["type"] == "category"]:
+                previous = self._order.get(record_key)
+                self._drop(record_key)
+                self._changed(record_key, previous)
+            for category in categories:
+                if category.get("name"):
+                    record_key = self._insert(category["name"], {"type": "category", "text": category["name"], "slug": category.get("slug", "")})
+                    if record_key is not None:
+                        self._changed(record_key)
+
+    def _rank(self, record: dict):
+        if record["type"] == "category":
+            return self.CATEGORY_RANK
+        products = record["products"]
+        return (sum(products.values()), len(products))
+
+    def _top(self, lo: int, hi: int, limit: int) -> List[str]:
+        seen = {record_key for _, record_key in self._entries[lo:hi]}
+        return heapq.nsmallest(limit, seen, key=self._order.__getitem__)
+
+    def warm(self, depth: int = 2):
+        """
+        depth harfe kadar kısa öneklerin sonuçlarını önceden hesapla; en geniş
+        aralıklar bunlardır. Kurulumdan sonra executor'da çağrılır.
+        """
+        entries = self._entries
+        parents = [""]
+        for _ in range(depth):
+            prefixes = []
+            for parent in parents:
+                position = bisect.bisect_left(entries, (parent,))
+                end = bisect.bisect_left(entries, (parent + "\x7f",), position)
+                while position < end:
+                    key = entries[position][0]
+                    if len(key) <= len(parent):
+                        position += 1
+                        continue
+                    prefix = key[:len(parent) + 1]
+                    position = bisect.bisect_left(entries, (prefix + "\x7f",), position)
+                    if not prefix.endswith(" "):
+                        prefixes.append(prefix)
+            for prefix in prefixes:
+                self.suggest(prefix)
+            parents = prefixes
+
+    def suggest(self, query: str, limit: int = 8) -> List[dict]:
+        prefix = " ".join(tokenize(query))
+        if not prefix:
+            return []
+        top = self._cache.get(prefix) if limit <= self.TOP_N else None
+        if top is None:
+            lo = bisect.bisect_left(self._entries, (prefix,))
+            hi = bisect.bisect_left(self._entries, (prefix + "\x7f",), lo)
+            top = self._top(lo, hi, max(limit, self.TOP_N))
+            if hi - lo > self.SCAN_LIMIT and limit <= self.TOP_N:
+                if len(self._cache) >= self.CACHE_SIZE:
+                    self._cache.clear()
+                self._cache[prefix] = top
+        results = []
+        for record_key in top[:limit]:
+            record = self._suggestions[record_key]
+            if record["type"] == "category":
+                results.append({"type": "category", "text": record["text"], "slug": record["slug"]})
+            else:
+                products = record["products"]
+                product_id = next((pid for pid, best in products.items() if best), next(iter(products)))
+                results.append({"type": "product", "text": record["text"], "product_id": product_id, "count": len(products)})
+        return results
@@ -1,24 +1,48 @@
-from fastapi import FastAPI, APIRouter, HTTPException, Query, UploadFile, File
+from fastapi import FastAPI, APIRouter, HTTPException, Query, UploadFile, File, Response, Request
+from fastapi.responses import JSONResponse, FileResponse
+import orjson
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import InsertOne, UpdateOne, ReturnDocument
+from pymongo.errors import BulkWriteError
 import os
 import logging
-from pathlib import Path
+from pathlib import Path, PurePosixPath
 from pydantic import BaseModel, Field, ConfigDict
-from typing import List, Optional
+from typing import List, Optional, Tuple
 import uuid
 from datetime import datetime, timezone
 import json
+import base64
+import hashlib
+import time
+import asyncio
+import re
+import random
+import zipfile
+import zlib
+import tempfile
+from collections import OrderedDict
+from email.utils import format_datetime, parsedate_to_datetime
 import httpx
 
+from search_index import SearchIndex, SuggestIndex, INDEXED_FIELDS
+from gazetteer import Gazetteer, location_key
+from json_stream import JSONItemDecoder
+from compression import CompressionMiddleware, compress_variants, negotiate_encoding
+from image_variants import ImageVariants
+import metrics
+import catalog
+
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
 # MongoDB connection
 mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
+# Komut süreleri /api/metrics ve Server-Timing için ölçülür
+client = AsyncIOMotorClient(mongo_url, event_listeners=[metrics.MongoCommandListener()])
 db = client[os.environ['DB_NAME']]
 
 # Create the main app without a prefix
@@ -28,6 +52,32 @@ app = FastAPI()
 api_router = APIRouter(prefix="/api")
 
 
+def dump_json(content) -> bytes:
+    """orjson ile serileştir; Mongo'dan gelen naive datetime'lar UTC kabul edilir"""
+    return orjson.dumps(content, option=orjson.OPT_NAIVE_UTC | orjson.OPT_UTC_Z)
+
+
+class FastJSONResponse(JSONResponse):
+    """jsonable_encoder'ı atlamak için endpoint'ten doğrudan döndürülür"""
+
+    def render(self, content) -> bytes:
+        return dump_json(content)
+
+
+# Yanıt sıkıştırma eşiği; bundan küçük gövdeler sıkıştırılmaz
+COMPRESSION_MIN_SIZE = int(os.environ.get('COMPRESSION_MIN_SIZE', '1024'))
+
+
+def precompressed_response(request: Request, variants: dict, headers: Optional[dict] = None) -> Response:
+    """Önbellekte hazır duran kodlamalardan istemcinin kabul ettiğini gönder"""
+    encoding = negotiate_encoding(request.headers.get("accept-encoding", ""))
+    headers = {**(headers or {}), "Vary": "Accept-Encoding"}
+    if encoding in variants:
+        headers["Content-Encoding"] = encoding
+        return Response(content=variants[encoding], media_type="application/json", headers=headers)
+    return Response(content=variants["identity"], media_type="application/json", headers=headers)
+
+
 # Define Models
 class StatusCheck(BaseModel):
     model_config = ConfigDict(extra="ignore")
@@ -120,198 +170,1064 @@ class PaginatedProducts(BaseModel):
     total_pages: int
 
 
+# ===== PRODUCT PROJECTIONS =====
+# Liste kartları yalnızca kart alanlarını alır; scraper'dan gelen çok KB'lık
+# description/contents/all_images sadece detay sayfasında gönderilir.
+PRODUCT_CARD_FIELDS = ("id", "title", "price", "image", "badge", "category", "is_bestseller", "created_at")
+PRODUCT_DETAIL_FIELDS = PRODUCT_CARD_FIELDS + ("description", "contents", "all_images", "product_code", "source_url")
+# fields= ile her zaman dönen alanlar: id ve sıralama anahtarı (cursor için)
+PRODUCT_KEY_FIELDS = ("id", "created_at")
+
+PRODUCT_CARD_PROJECTION = {"_id": 0, **{name: 1 for name in PRODUCT_CARD_FIELDS}}
+PRODUCT_DETAIL_PROJECTION = {"_id": 0}
+
+# Kart görsellerinin AVIF/WebP türevleri (image_derivatives.py çıktısı);
+# yanıtlara image_variants (srcset) olarak eklenir.
+IMAGE_ROOT = Path(os.environ.get('IMAGE_ROOT', str(ROOT_DIR.parent / 'images')))
+IMAGE_CACHE_MAX_AGE = 31536000  # içerik adresli dosyalar: 1 yıl, immutable
+image_variants = ImageVariants(
+    IMAGE_ROOT,
+    base_url=os.environ.get('IMAGE_BASE_URL', '/api/images'),
+    poll_interval=float(os.environ.get('IMAGE_VARIANTS_POLL', '30')),
+)
+
+
+def product_projection(fields: Optional[str], default: dict) -> dict:
+    """fields=title,price,description gibi virgüllü listeyi Mongo projeksiyonuna çevir"""
+    if not fields:
+        return default
+    names = [name.strip() for name in fields.split(",") if name.strip()]
+    unknown = [name for name in names if name not in PRODUCT_DETAIL_FIELDS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Geçersiz alan: {', '.join(unknown)}")
+    return {"_id": 0, **{name: 1 for name in (*PRODUCT_KEY_FIELDS, *names)}}
+
+
+# ===== KEYSET PAGINATION =====
+# Ürün listeleri seçilen sıralamaya göre, eşitlikte id ile sabit sıralanır;
+# cursor modu bu anahtar üzerinden index'li range sorgusu yapar, skip ile
+# belge atlamaz. Her sıralamanın index'i INDEX_SPECS'te tanımlıdır.
+PRODUCT_SORTS = {
+    "created_at": [("created_at", 1), ("id", 1)],
+    "newest": [("created_at", -1), ("id", -1)],
+    "price_asc": [("price", 1), ("id", 1)],
+    "price_desc": [("price", -1), ("id", -1)],
+    "bestseller": [("is_bestseller", -1), ("created_at", 1), ("id", 1)],
+}
+PRODUCT_SORT = PRODUCT_SORTS["created_at"]
+
+
+def encode_cursor(product: dict, sort: str = "created_at") -> str:
+    """Son ürünün sıralama anahtarını opak bir cursor'a çevir"""
+    values = []
+    for name, _ in PRODUCT_SORTS[sort]:
+        value = product.get(name)
+        if isinstance(value, datetime):
+            # BSON tarihi: milisaniye hassasiyetinde, tipi korunarak saklanır
+            value = {"d": round(value.replace(tzinfo=timezone.utc).timestamp() * 1000)}
+        values.append(value)
+    raw = json.dumps({"s": sort, "k": values}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, sort: str = "created_at") -> dict:
+    """Cursor'ı sıralama anahtarına ({alan: değer}) geri çevir"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        if "k" in data:
+            cursor_sort = data["s"]
+            values = [
+                datetime.fromtimestamp(value["d"] / 1000, tz=timezone.utc) if isinstance(value, dict) else value
+                for value in data["k"]
+            ]
+        else:
+            # Eski biçim: yalnızca (created_at, id)
+            cursor_sort = "created_at"
+            created_at = datetime.fromtimestamp(data["d"] / 1000, tz=timezone.utc) if "d" in data else data["c"]
+            values = [created_at, data["i"]]
+        fields = [name for name, _ in PRODUCT_SORTS[cursor_sort]]
+        if len(values) != len(fields):
+            raise ValueError("cursor anahtarı eksik")
+    except Exception:
+        raise HTTPException(status_code=400, detail="Geçersiz sayfa imleci")
+    if cursor_sort != sort:
+        raise HTTPException(status_code=400, detail="Sayfa imleci farklı bir sıralamaya ait")
+    return dict(zip(fields, values))
+
+
+async def migrate_created_at():
+    """
+    Eski kayıtlarda ISO string olarak duran created_at alanını BSON tarihine
+    çevir; karışık tipler (created_at, id) sıralamasını bozar.
+    """
+    if await db.products.find_one({"created_at": {"$type": "string"}}, {"_id": 1}) is None:
+        return
+    result = await db.products.update_many(
+        {"created_at": {"$type": "string"}},
+        [{"$set": {"created_at": {"$toDate": "$created_at"}}}],
+    )
+    logger.info(f"created_at tarihe çevrildi: {result.modified_count} ürün")
+
+
+def keyset_query(query: dict, after: dict, sort: list = PRODUCT_SORT) -> dict:
+    """Filtreye sıralamada 'bu anahtardan sonra gelenler' koşulunu ekle"""
+    clauses = []
+    for position, (name, direction) in enumerate(sort):
+        clause = {prefix: after[prefix] for prefix, _ in sort[:position]}
+        clause[name] = {"$gt" if direction == 1 else "$lt": after[name]}
+        clauses.append(clause)
+    after_clause = {"$or": clauses}
+    if not query:
+        return after_clause
+    return {"$and": [query, after_clause]}
+
+
+# ===== IN-PROCESS CACHES =====
+class TTLCache:
+    """
+    Süre (TTL) ve isteğe bağlı boyut (LRU) sınırlı basit önbellek.
+    Yazma endpoint'leri invalidate() çağırır; TTL diğer worker'ların
+    yazdıklarını da sınırlı sürede yansıtmak için güvenlik payıdır.
+    """
+
+    def __init__(self, ttl: float, maxsize: Optional[int] = None):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.evictions = 0
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is not None and entry[1] > time.monotonic():
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+        if entry is not None:
+            del self._entries[key]
+        self.misses += 1
+        return None
+
+    def set(self, key, value):
+        self._entries[key] = (value, time.monotonic() + self.ttl)
+        self._entries.move_to_end(key)
+        if self.maxsize is not None:
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self):
+        self._entries.clear()
+        self.invalidations += 1
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "invalidations": self.invalidations,
+            "evictions": self.evictions,
+            "ttl_seconds": self.ttl,
+        }
+
+
+product_totals = TTLCache(ttl=float(os.environ.get('PRODUCT_TOTALS_TTL', '60')))
+# Kategori vitrinlerinin ilk sayfaları: serileştirilmiş ve sıkıştırılmış gövde.
+# Anahtar ürün sürümünü içerir; yazmalardan sonra eski kayıtlar kullanılmaz.
+first_page_cache = TTLCache(
+    ttl=float(os.environ.get('FIRST_PAGE_CACHE_TTL', '60')),
+    maxsize=int(os.environ.get('FIRST_PAGE_CACHE_SIZE', '500')),
+)
+# Filtresiz listede count_documents yerine koleksiyon metadata'sını kullan
+USE_ESTIMATED_TOTAL = os.environ.get('PRODUCT_TOTALS_ESTIMATE', 'false').lower() in ('1', 'true', 'yes')
+
+
+def filter_key(query: dict) -> str:
+    """Filtre sözlüğünün önbellek anahtarı (alan sırasından bağımsız)"""
+    return json.dumps(query, sort_keys=True, default=str)
+
+
+async def count_products(query: dict) -> int:
+    key = filter_key(query)
+    total = product_totals.get(key)
+    if total is not None:
+        return total
+    if not query and USE_ESTIMATED_TOTAL:
+        total = await db.products.estimated_document_count()
+    else:
+        total = await db.products.count_documents(query)
+    product_totals.set(key, total)
+    return total
+
+
+# ===== PRODUCT FILTERS & FACETS =====
+# Liste filtreleri iki gruba ayrılır: facet boyutları (kategori, fiyat, rozet)
+# ve ortak koşullar (bestseller). Her facet kendi boyutunun filtresi hariç
+# sayılır; böylece "gul" seçiliyken diğer kategorilerin sayıları da görünür.
+FACET_DIMENSIONS = ("category", "price", "badge")
+product_facets_cache = TTLCache(
+    ttl=float(os.environ.get('PRODUCT_TOTALS_TTL', '60')),
+    maxsize=int(os.environ.get('FIRST_PAGE_CACHE_SIZE', '500')),
+)
+
+
+def split_values(value: Optional[str]) -> List[str]:
+    """'gul,orkide' gibi virgüllü parametreyi sıralı, tekil listeye çevir"""
+    if not value:
+        return []
+    return sorted({part.strip() for part in value.split(",") if part.strip()})
+
+
+def product_filters(
+    category: Optional[str] = None,
+    categories: Optional[str] = None,
+    bestseller: Optional[bool] = None,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    badge: Optional[str] = None,
+) -> Tuple[dict, dict]:
+    """Query parametrelerinden (ortak koşullar, facet boyutu -> koşul) üret"""
+    base = {}
+    if bestseller is not None:
+        base["is_bestseller"] = bestseller
+    dimensions = {}
+    slugs = split_values(",".join(value for value in (category, categories) if value))
+    if slugs:
+        dimensions["category"] = slugs[0] if len(slugs) == 1 else {"$in": slugs}
+    if min_price is not None and max_price is not None and min_price > max_price:
+        raise HTTPException(status_code=400, detail="min_price, max_price'tan büyük olamaz")
+    price = {}
+    if min_price is not None:
+        price["$gte"] = min_price
+    if max_price is not None:
+        price["$lte"] = max_price
+    if price:
+        dimensions["price"] = price
+    badges = split_values(badge)
+    if badges:
+        dimensions["badge"] = badges[0] if len(badges) == 1 else {"$in": badges}
+    return base, dimensions
+
+
+def facets_from_stats(stats: dict, dimension: str) -> list:
+    """Filtresiz facet'i catalog_stats belgesinden oku (önceden hesaplanmış sayımlar)"""
+    if dimension == "category":
+        counts = {slug: c.get("count", 0) for slug, c in stats.get("categories", {}).items()}
+    elif dimension == "price":
+        counts = stats.get("price_histogram", {})
+    else:
+        counts = stats.get("badges", {})
+    return [{"value": value, "count": count} for value, count in counts.items() if count > 0]
+
+
+async def product_facets(base: dict, dimensions: dict) -> dict:
+    """
+    Kategori / fiyat aralığı / rozet sayımları. Filtresi boş kalan facet'ler
+    catalog_stats'tan gelir; diğerleri tek bir $facet aggregation'ında sayılır.
+    Sonuç ürün sürümüyle anahtarlanır, yazmadan sonra eski sayım dönmez.
+    """
+    key = (collection_versions.get("products", (0,))[0], filter_key({**base, **dimensions}))
+    facets = product_facets_cache.get(key)
+    if facets is not None:
+        return facets
+
+    facets, matches = {}, {}
+    stats = None
+    for dimension in FACET_DIMENSIONS:
+        match = {**base, **{name: cond for name, cond in dimensions.items() if name != dimension}}
+        if not match:
+            if stats is None:
+                stats = await db.catalog_stats.find_one({"_id": CATALOG_STATS_ID}) or {}
+            if dimension != "badge" or "badges" in stats:
+                facets[dimension] = facets_from_stats(stats, dimension)
+                continue
+        matches[dimension] = match
+
+    if matches:
+        price = {"$cond": [{"$isNumber": "$price"}, {"$max": ["$price", 0]}, 0]}
+        stages = {
+            "category": [{"$group": {"_id": "$category", "count": {"$sum": 1}}}],
+            "price": [{"$bucket": {
+                "groupBy": price,
+                "boundaries": PRICE_HISTOGRAM_EDGES,
+                "default": PRICE_HISTOGRAM_EDGES[-1],
+                "output": {"count": {"$sum": 1}},
+            }}],
+            "badge": [{"$group": {"_id": "$badge", "count": {"$sum": 1}}}],
+        }
+        # Üst seviye $match index'i kullanır; alt pipeline'lar yalnızca bu kümeyi tarar
+        candidates = list(matches.values())
+        top = candidates[0] if len(candidates) == 1 else {"$or": candidates}
+        pipeline = [
+            {"$match": top},
+            {"$facet": {name: [{"$match": match}, *stages[name]] for name, match in matches.items()}},
+        ]
+        result = (await db.products.aggregate(pipeline).to_list(1) or [{}])[0]
+        for dimension in matches:
+            rows = result.get(dimension, [])
+            if dimension == "price":
+                facets[dimension] = [{"value": price_bucket(row["_id"]), "count": row["count"]} for row in rows]
+            else:
+                facets[dimension] = [{"value": row["_id"], "count": row["count"]} for row in rows]
+
+    # Fiyat aralıkları sabit sırada, diğerleri çoktan aza
+    order = {price_bucket(edge): n for n, edge in enumerate(PRICE_HISTOGRAM_EDGES)}
+    facets = {
+        "categories": sorted(facets["category"], key=lambda f: (-f["count"], str(f["value"]))),
+        "price": sorted(facets["price"], key=lambda f: order.get(f["value"], len(order))),
+        "badges": sorted(facets["badge"], key=lambda f: (-f["count"], str(f["value"]))),
+    }
+    product_facets_cache.set(key, facets)
+    return facets
+
+
 # Product Routes
 @api_router.get("/products")
 async def get_products(
     category: Optional[str] = Query(None, description="Filter by category slug"),
     bestseller: Optional[bool] = Query(None, description="Filter bestsellers"),
     page: int = Query(1, ge=1, description="Page number"),
-    per_page: int = Query(24, ge=1, le=100, description="Items per page")
+    per_page: int = Query(24, ge=1, le=100, description="Items per page"),
+    cursor: Optional[str] = Query(None, description="Önceki yanıttaki next_cursor (keyset modu)"),
+    fields: Optional[str] = Query(None, description="Virgülle ayrılmış alanlar (varsayılan: kart alanları)"),
+    categories: Optional[str] = Query(None, description="Virgülle ayrılmış kategori slug'ları"),
+    min_price: Optional[float] = Query(None, ge=0, description="En düşük fiyat"),
+    max_price: Optional[float] = Query(None, ge=0, description="En yüksek fiyat"),
+    badge: Optional[str] = Query(None, description="Virgülle ayrılmış rozetler"),
+    sort: str = Query("created_at", pattern="^(created_at|newest|price_asc|price_desc|bestseller)$", description="Sıralama"),
+    facets: bool = Query(False, description="Kategori / fiyat / rozet sayımlarını ekle"),
+    request: Request = None
 ):
-    query = {}
-    if category:
-        query["category"] = category
-    if bestseller is not None:
-        query["is_bestseller"] = bestseller
-    
-    # Get total count
-    total = await db.products.count_documents(query)
+    sort_spec = PRODUCT_SORTS[sort]
+    projection = product_projection(fields, PRODUCT_CARD_PROJECTION)
+    if fields:
+        # Cursor için sıralama anahtarı her zaman döner
+        projection.update({name: 1 for name, _ in sort_spec})
+    base, dimensions = product_filters(category, categories, bestseller, min_price, max_price, badge)
+    query = {**base, **dimensions}
+
+    page_key = None
+    image_variants.refresh()
+    # İlk sayfa önbelleği yalnızca HTTP isteklerinde (doğrudan çağrılarda request yok)
+    if not cursor and page == 1 and request is not None:
+        page_key = (collection_versions.get("products", (0,))[0], image_variants.version, filter_key(query), sort, facets, per_page, fields)
+        variants = first_page_cache.get(page_key)
+        if variants is not None:
+            return precompressed_response(request, variants)
     
-    # Calculate pagination
-    skip = (page - 1) * per_page
+    # Get total count (önbellekten)
+    total = await count_products(query)
     total_pages = (total + per_page - 1) // per_page  # Ceiling division
     
-    products = await db.products.find(query, {"_id": 0}).skip(skip).limit(per_page).to_list(per_page)
+    if cursor:
+        # Keyset modu: index üzerinden kaldığı yerden devam et
+        find_query = keyset_query(query, decode_cursor(cursor, sort), sort_spec)
+        products = await db.products.find(find_query, projection).sort(sort_spec).limit(per_page).to_list(per_page)
+    else:
+        # Klasik sayfa modu (geriye dönük uyumluluk)
+        skip = (page - 1) * per_page
+        products = await db.products.find(query, projection).sort(sort_spec).skip(skip).limit(per_page).to_list(per_page)
     
-    for p in products:
-        if isinstance(p.get('created_at'), str):
-            p['created_at'] = datetime.fromisoformat(p['created_at'])
+    next_cursor = encode_cursor(products[-1], sort) if len(products) == per_page else None
+    image_variants.attach(products)
     
-    return {
+    # created_at BSON tarihi olarak saklanır; satır bazında dönüşüm yapılmaz
+    content = {
         "products": products,
         "total": total,
-        "page": page,
+        "page": None if cursor else page,
         "per_page": per_page,
-        "total_pages": total_pages
+        "total_pages": total_pages,
+        "next_cursor": next_cursor
     }
+    if facets:
+        content["facets"] = await product_facets(base, dimensions)
+    if page_key is not None:
+        variants = compress_variants(dump_json(content), COMPRESSION_MIN_SIZE)
+        first_page_cache.set(page_key, variants)
+        return precompressed_response(request, variants)
+    return FastJSONResponse(content)
 
 @api_router.get("/products/{product_id}", response_model=Product)
-async def get_product(product_id: str):
-    product = await db.products.find_one({"id": product_id}, {"_id": 0})
+async def get_product(
+    product_id: str,
+    fields: Optional[str] = Query(None, description="Virgülle ayrılmış alanlar (varsayılan: tüm belge)")
+):
+    product = await db.products.find_one({"id": product_id}, product_projection(fields, PRODUCT_DETAIL_PROJECTION))
     if not product:
         raise HTTPException(status_code=404, detail="Ürün bulunamadı")
-    if isinstance(product.get('created_at'), str):
-        product['created_at'] = datetime.fromisoformat(product['created_at'])
-    return product
+    image_variants.refresh()
+    image_variants.attach([product])
+    return FastJSONResponse(product)
 
 @api_router.post("/products", response_model=Product)
 async def create_product(input: ProductCreate):
     product_dict = input.model_dump()
     product_obj = Product(**product_dict)
     doc = product_obj.model_dump()
-    doc['created_at'] = doc['created_at'].isoformat()
     _ = await db.products.insert_one(doc)
+    product_totals.invalidate()
+    index_products([doc])
+    await apply_catalog_stats([doc])
+    await bump_collection_version("products")
     return product_obj
 
 
+# ===== REFERENCE DATA CACHE =====
+# Kategoriler ve banner'lar nadiren değişir; bellekte hazır JSON gövdesi ve
+# ETag ile tutulur, istekler Mongo'ya gitmez. Değişiklikler Mongo change
+# stream ile yakalanır; replica set yoksa "versions" koleksiyonundaki sayaç
+# REFERENCE_POLL_INTERVAL saniyede bir okunur.
+REFERENCE_POLL_INTERVAL = float(os.environ.get('REFERENCE_POLL_INTERVAL', '30'))
+
+
+def json_etag(body: bytes) -> str:
+    return 'W/"' + hashlib.sha1(body).hexdigest()[:20] + '"'
+
+
+def not_modified(request: Request, etag: str, last_modified: Optional[datetime]) -> bool:
+    """If-None-Match (zayıf karşılaştırma) veya If-Modified-Since koşulu sağlanıyor mu"""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        if if_none_match.strip() == "*":
+            return True
+        tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        return etag.removeprefix("W/") in tags
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None:
+        try:
+            return parsedate_to_datetime(if_modified_since) >= last_modified.replace(microsecond=0)
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+class ReferenceCache:
+    """Bir koleksiyonun tamamının bellekteki kopyası (model ile doğrulanmış)"""
+
+    def __init__(self, collection: str, model, sort=None, limit: int = 100, key: Optional[str] = None):
+        self.collection = collection
+        self.model = model
+        self.sort = sort
+        self.limit = limit
+        self.key = key
+        self.items: List[dict] = []
+        self.by_key = {}              # key -> gövdenin kodlamaları
+        self.body = b"[]"
+        self.variants = {"identity": self.body}  # gövde + hazır gzip/br
+        self.etag = json_etag(self.body)
+        self.last_modified = datetime.now(timezone.utc)
+        self.version = None           # yüklemedeki "versions" sayacı
+        self.loaded = False
+        self.reloads = 0
+        self._lock = asyncio.Lock()
+
+    async def reload(self):
+        async with self._lock:
+            version = await db.versions.find_one({"_id": self.collection})
+            cursor = db[self.collection].find({}, {"_id": 0})
+            if self.sort:
+                cursor = cursor.sort(self.sort)
+            items = [self.model(**doc).model_dump() for doc in await cursor.to_list(self.limit)]
+            body = json.dumps(items, ensure_ascii=False).encode()
+            etag = json_etag(body)
+            if etag != self.etag:
+                self.last_modified = datetime.now(timezone.utc)
+            if self.key:
+                by_key = {}
+                for item in items:
+                    by_key[item[self.key]] = compress_variants(json.dumps(item, ensure_ascii=False).encode(), COMPRESSION_MIN_SIZE, brotli_quality=11)
+                self.by_key = by_key
+            # Haftada bir değişen veri: en yüksek brotli seviyesi bir kez ödenir
+            self.variants = compress_variants(body, COMPRESSION_MIN_SIZE, brotli_quality=11)
+            self.items, self.body, self.etag = items, body, etag
+            self.version = version.get("version", 0) if version else 0
+            self.loaded = True
+            self.reloads += 1
+
+    async def get(self) -> "ReferenceCache":
+        if not self.loaded:
+            await self.reload()
+        return self
+
+    def stats(self) -> dict:
+        return {
+            "items": len(self.items),
+            "version": self.version,
+            "etag": self.etag,
+            "last_modified": self.last_modified.isoformat(),
+            "reloads": self.reloads,
+        }
+
+
+categories_cache = ReferenceCache("categories", Category, key="slug")
+banners_cache = ReferenceCache("banners", Banner, sort=[("order", 1)], limit=10)
+reference_caches = {cache.collection: cache for cache in (categories_cache, banners_cache)}
+reference_sync = {"mode": "starting"}
+reference_watcher: Optional[asyncio.Task] = None
+
+# "versions" koleksiyonunun süreçteki kopyası: koleksiyon -> (sürüm, değişme zamanı).
+# Ürün yazan her yol sayacı artırır; koşullu GET ETag'leri buradan üretilir.
+STARTED_AT = datetime.now(timezone.utc)
+collection_versions = {}
+
+
+def note_collection_version(doc: dict):
+    changed_at = doc.get("updated_at") or datetime.now(timezone.utc)
+    if changed_at.tzinfo is None:
+        changed_at = changed_at.replace(tzinfo=timezone.utc)
+    collection_versions[doc["_id"]] = (doc.get("version", 0), changed_at)
+
+
+async def load_collection_versions():
+    for doc in await db.versions.find({}).to_list(None):
+        note_collection_version(doc)
+
+
+async def bump_collection_version(collection: str):
+    """Koleksiyon uygulama üzerinden değiştiğinde sayacı artır, diğer süreçlere haber ver"""
+    doc = await db.versions.find_one_and_update(
+        {"_id": collection},
+        {"$inc": {"version": 1}, "$set": {"updated_at": datetime.now(timezone.utc)}},
+        upsert=True,
+        return_document=ReturnDocument.AFTER,
+    )
+    note_collection_version(doc)
+    if collection in reference_caches:
+        await reference_caches[collection].reload()
+
+
+async def watch_reference_data():
+    """Change stream ile dinle; desteklenmiyorsa sürüm sayaçlarını periyodik oku"""
+    try:
+        pipeline = [{"$match": {"ns.coll": {"$in": [*reference_caches, "versions"]}}}]
+        async with db.watch(pipeline, full_document="updateLookup") as stream:
+            reference_sync["mode"] = "change_stream"
+            logger.info("Önbellek sürümleri change stream ile güncel tutuluyor")
+            async for change in stream:
+                name = change["ns"]["coll"]
+                if name == "versions":
+                    if change.get("fullDocument"):
+                        note_collection_version(change["fullDocument"])
+                else:
+                    await reference_caches[name].reload()
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        logger.info(f"Change stream kullanılamıyor ({e}); sürüm sayacı {REFERENCE_POLL_INTERVAL:g} sn'de bir okunacak")
+
+    reference_sync["mode"] = "polling"
+    while True:
+        await asyncio.sleep(REFERENCE_POLL_INTERVAL)
+        try:
+            await load_collection_versions()
+            for name, cache in reference_caches.items():
+                if collection_versions.get(name, (0,))[0] != cache.version:
+                    await cache.reload()
+        except Exception as e:
+            logger.warning(f"Önbellek sürüm kontrolü başarısız: {e}")
+
+
+# ===== CONDITIONAL GET =====
+# Okuma endpoint'leri için zayıf ETag = hash(bağlı koleksiyon sürümleri + yol +
+# sorgu parametreleri). Sürüm değişmediyse 304 endpoint çalışmadan döner;
+# 200 cevaplarına rota bazlı Cache-Control eklenir.
+CACHE_POLICIES = [
+    # (yol, bağlı koleksiyonlar, max-age, stale-while-revalidate)
+    (re.compile(r"/api/products"), ("products",), 30, 120),
+    (re.compile(r"/api/products/[^/]+"), ("products",), 60, 300),
+    (re.compile(r"/api/search"), ("products",), 30, 120),
+    (re.compile(r"/api/categories(/[^/]+)?"), ("categories",), 300, 86400),
+    (re.compile(r"/api/banners"), ("banners",), 300, 86400),
+]
+
+
+def match_cache_policy(path: str):
+    for pattern, collections, max_age, stale in CACHE_POLICIES:
+        if pattern.fullmatch(path):
+            return collections, max_age, stale
+    return None
+
+
+def conditional_validators(request: Request, collections) -> tuple:
+    """İsteğin ETag'i ve Last-Modified değeri; Mongo'ya gitmeden hesaplanır"""
+    parts = [request.url.path, *(f"{k}={v}" for k, v in sorted(request.query_params.multi_items()))]
+    modified = []
+    for name in collections:
+        cache = reference_caches.get(name)
+        if cache is not None:
+            # İçerik hash'i: change stream ile gelen dış değişiklikleri de yansıtır
+            parts.append(cache.etag)
+            modified.append(cache.last_modified)
+        else:
+            version, changed_at = collection_versions.get(name, (0, STARTED_AT))
+            parts.append(f"{name}:{version}")
+            modified.append(changed_at)
+    if request.url.path == "/api/search":
+        parts.append(f"index:{search_index_ready}")  # index hazır olunca sıralama değişir
+    if "products" in collections:
+        image_variants.refresh()
+        parts.append(f"images:{image_variants.version}")  # yeni türevler image_variants'ı değiştirir
+    return json_etag("|".join(parts).encode()), max(modified)
+
+
+@app.middleware("http")
+async def conditional_get(request: Request, call_next):
+    policy = match_cache_policy(request.url.path) if request.method == "GET" else None
+    if policy is None:
+        return await call_next(request)
+    collections, max_age, stale = policy
+    etag, last_modified = conditional_validators(request, collections)
+    headers = {
+        "ETag": etag,
+        "Last-Modified": format_datetime(last_modified, usegmt=True),
+        "Cache-Control": f"public, max-age={max_age}, stale-while-revalidate={stale}",
+    }
+    if not_modified(request, etag, last_modified):
+        return Response(status_code=304, headers=headers)
+    response = await call_next(request)
+    if response.status_code == 200:
+        response.headers.update(headers)
+    return response
+
+
 # Category Routes
 @api_router.get("/categories", response_model=List[Category])
-async def get_categories():
-    categories = await db.categories.find({}, {"_id": 0}).to_list(100)
-    return categories
-
-@api_router.get("/categories/{slug}")
-async def get_category(slug: str):
-    category = await db.categories.find_one({"slug": slug}, {"_id": 0})
-    if not category:
+async def get_categories(request: Request):
+    cache = await categories_cache.get()
+    return precompressed_response(request, cache.variants)
+
+@api_router.get("/categories/{slug}", response_model=Category)
+async def get_category(slug: str, request: Request):
+    cache = await categories_cache.get()
+    variants = cache.by_key.get(slug)
+    if variants is None:
         raise HTTPException(status_code=404, detail="Kategori bulunamadı")
-    return category
+    return precompressed_response(request, variants)
 
 
 # Banner Routes
 @api_router.get("/banners", response_model=List[Banner])
-async def get_banners():
-    banners = await db.banners.find({}, {"_id": 0}).sort("order", 1).to_list(10)
-    return banners
+async def get_banners(request: Request):
+    cache = await banners_cache.get()
+    return precompressed_response(request, cache.variants)
+
+
+# ===== SEARCH INDEX =====
+# Süreç içi ters index ve öneri index'i; startup'ta Mongo'dan kurulur, yazma
+# endpoint'leri tarafından artımlı olarak güncel tutulur.
+search_index = SearchIndex()
+search_index_ready = False
+suggest_index = SuggestIndex()
+# Yeniden kurulum sürerken gelen yazmalar; kurulan index'e yayınlanmadan önce uygulanır
+pending_index_writes: Optional[List[dict]] = None
+REBUILD_BATCH_SIZE = 2000
+
+
+def index_products(products: List[dict]):
+    """Yeni/güncellenen ürünleri arama ve öneri index'lerine ekle"""
+    search_index.add_many(products)
+    suggest_index.add_many(products)
+    if pending_index_writes is not None:
+        pending_index_writes.extend(products)
+
+
+def clear_product_indexes():
+    search_index.clear()
+    suggest_index.clear_products()
+    if pending_index_writes is not None:
+        pending_index_writes.clear()
+
+
+def build_product_indexes(fresh: SearchIndex, fresh_suggest: SuggestIndex, products: List[dict]):
+    """Yayınlanmamış index'lere toplu ekleme (executor'da çalışır); BM25 normalizasyonu sonda bir kez"""
+    fresh.add_many(products, normalize=False)
+    fresh_suggest.add_many(products)
+
+
+def finish_product_indexes(fresh: SearchIndex, fresh_suggest: SuggestIndex):
+    fresh.normalize()
+    fresh_suggest.warm()
+
+
+async def rebuild_search_index():
+    """
+    Index'i Mongo'dan baştan kur. Tokenize/sıralama işi 2000'lik partiler
+    halinde executor'da, yayınlanmamış yeni index'ler üzerinde yapılır; event
+    loop istekleri sunmaya devam eder. Kurulum sürerken yazmalar yayındaki
+    index'lere gider ve biriktirilir, takas öncesi yeni index'lere uygulanır.
+    Aramalar kurulum boyunca regex fallback'e düşer, öneriler eski index'ten
+    gelir.
+    """
+    global search_index, search_index_ready, suggest_index, pending_index_writes
+    started = time.perf_counter()
+    loop = asyncio.get_running_loop()
+    fresh, fresh_suggest = SearchIndex(), SuggestIndex()
+    search_index_ready = False
+    pending = pending_index_writes = []
+    try:
+        fresh_suggest.set_categories(await db.categories.find({}, {"_id": 0, "name": 1, "slug": 1}).to_list(1000))
+        batch = []
+        async for product in db.products.find({}, INDEXED_FIELDS).batch_size(REBUILD_BATCH_SIZE):
+            batch.append(product)
+            if len(batch) >= REBUILD_BATCH_SIZE:
+                await loop.run_in_executor(None, build_product_indexes, fresh, fresh_suggest, batch)
+                batch = []
+        if batch:
+            await loop.run_in_executor(None, build_product_indexes, fresh, fresh_suggest, batch)
+        await loop.run_in_executor(None, finish_product_indexes, fresh, fresh_suggest)
+    finally:
+        if pending_index_writes is pending:
+            pending_index_writes = None
+    build_product_indexes(fresh, fresh_suggest, pending)
+    fresh.normalize(force=False)
+    search_index, suggest_index = fresh, fresh_suggest
+    search_index_ready = True
+    logger.info(f"Arama index'i hazır: {len(fresh)} ürün, {len(fresh_suggest)} öneri ({(time.perf_counter() - started) * 1000:.0f} ms)")
+
+
+search_rebuild_task: Optional[asyncio.Task] = None
+
+
+def start_search_rebuild():
+    """Index'i arka planda yeniden kur; yarım kalan önceki kurulumu iptal et"""
+    global search_rebuild_task
+    if search_rebuild_task is not None and not search_rebuild_task.done():
+        search_rebuild_task.cancel()
+    search_rebuild_task = asyncio.create_task(rebuild_search_index())
 
 
 # Search Route
 @api_router.get("/search")
-async def search_products(q: str = Query(..., min_length=2)):
-    # Text search on title and description
-    products = await db.products.find(
-        {"$or": [
-            {"title": {"$regex": q, "$options": "i"}},
-            {"description": {"$regex": q, "$options": "i"}}
-        ]},
-        {"_id": 0}
-    ).limit(20).to_list(20)
-    return products
+async def search_products(
+    q: str = Query(..., min_length=2),
+    page: int = Query(1, ge=1, description="Page number"),
+    per_page: int = Query(20, ge=1, le=100, description="Items per page"),
+    fields: Optional[str] = Query(None, description="Virgülle ayrılmış alanlar (varsayılan: kart alanları)")
+):
+    projection = product_projection(fields, PRODUCT_CARD_PROJECTION)
+    offset = (page - 1) * per_page
+    if search_index_ready:
+        total, ids = search_index.search(q, offset=offset, limit=per_page)
+        found = await db.products.find({"id": {"$in": ids}}, projection).to_list(len(ids))
+        by_id = {p["id"]: p for p in found}
+        products = [by_id[i] for i in ids if i in by_id]
+    else:
+        # Index henüz kurulmadıysa (startup sırasında) kaçışlı regex ile ara
+        pattern = re.escape(q)
+        query = {"$or": [
+            {"title": {"$regex": pattern, "$options": "i"}},
+            {"description": {"$regex": pattern, "$options": "i"}}
+        ]}
+        total = await db.products.count_documents(query)
+        products = await db.products.find(query, projection).skip(offset).limit(per_page).to_list(per_page)
+    image_variants.refresh()
+    image_variants.attach(products)
+    return FastJSONResponse(products, headers={"X-Total-Count": str(total)})
+
+
+@api_router.get("/search/suggest")
+async def suggest_products(
+    q: str = Query(..., min_length=1),
+    limit: int = Query(8, ge=1, le=20)
+):
+    """Yazarken öneri: kategori adları ve ürün başlıkları (çok satanlar önde)"""
+    return {"query": q, "suggestions": suggest_index.suggest(q, limit)}
 
 
 # ===== LOCATION SEARCH (Gönderim Yeri) =====
-@api_router.get("/locations/search")
-async def search_locations(q: str = Query(..., min_length=1, description="Aranacak konum")):
+PHOTON_URL = os.environ.get('PHOTON_URL', 'https://photon.komoot.io/api/')
+NOMINATIM_URL = os.environ.get('NOMINATIM_URL', 'https://nominatim.openstreetmap.org/search')
+
+# Startup'ta oluşturulan, bağlantıları yeniden kullanan ortak HTTP client
+http_client: Optional[httpx.AsyncClient] = None
+
+# Normalize sorgu -> sonuç; tuş vuruşlarıyla gelen tekrar sorgular upstream'e gitmez
+location_cache = TTLCache(
+    ttl=float(os.environ.get('LOCATION_CACHE_TTL', '86400')),
+    maxsize=int(os.environ.get('LOCATION_CACHE_SIZE', '5000')),
+)
+# Aynı sorgu için uçuşta olan upstream çağrısı (single-flight)
+location_inflight = {}
+location_upstream = {"photon": 0, "nominatim": 0, "coalesced": 0}
+
+
+# Opsiyonel çevrimdışı il/ilçe/mahalle sözlüğü (LOCATION_GAZETTEER=true)
+USE_GAZETTEER = os.environ.get('LOCATION_GAZETTEER', 'false').lower() in ('1', 'true', 'yes')
+GAZETTEER_PATH = Path(os.environ.get('GAZETTEER_PATH', str(ROOT_DIR / 'data' / 'gazetteer_tr.tsv')))
+gazetteer: Optional[Gazetteer] = None
+
+
+def create_http_client() -> httpx.AsyncClient:
+    # Limits transport'a verilir; client'a verilen limits özel transport'ta yok sayılır
+    transport = httpx.AsyncHTTPTransport(limits=httpx.Limits(max_connections=20, max_keepalive_connections=10))
+    return httpx.AsyncClient(
+        timeout=8.0,
+        transport=metrics.InstrumentedTransport(transport),
+        headers={"User-Agent": "cicekci-burada-local-proxy/1.0 (mailto:local@test)"},
+    )
+
+
+def normalize_location_query(q: str) -> str:
+    return " ".join(q.split()).lower()
+
+
+async def fetch_locations(q: str) -> dict:
     """
     Türkiye'deki konumları ara (Photon + Nominatim fallback)
     Tüm şehirler, ilçeler, mahalleler, okullar vs. aranabilir
     """
-    from urllib.parse import quote
-    
-    headers = {
-        "User-Agent": "cicekci-burada-local-proxy/1.0 (mailto:local@test)"
-    }
-    
-    async with httpx.AsyncClient(timeout=8.0) as client:
-        # 1) Photon API (çok hızlı + TR destekli)
-        try:
-            photon_url = f"https://photon.komoot.io/api/?q={quote(q)}&lang=tr&limit=8"
-            response = await client.get(photon_url, headers=headers)
-            
-            if response.status_code == 200:
-                data = response.json()
-                if data.get("features") and len(data["features"]) > 0:
-                    # Photon sonuçlarını formatla
-                    results = []
-                    for feature in data["features"]:
-                        props = feature.get("properties", {})
-                        
-                        # Sadece Türkiye sonuçlarını al
-                        country = props.get("country", "").lower()
-                        if country not in ["türkiye", "turkey", "tr"]:
-                            continue
-                        
-                        # Display name oluştur: Mahalle, İlçe/İl, Türkiye
-                        name = props.get("name", "")
-                        district = props.get("district", props.get("locality", ""))
-                        city = props.get("city", props.get("county", props.get("state", "")))
-                        
-                        if district and city:
-                            display = f"{name}, {district}/{city}, Türkiye" if name else f"{district}/{city}, Türkiye"
-                        elif city:
-                            display = f"{name}, {city}, Türkiye" if name else f"{city}, Türkiye"
-                        else:
-                            display = f"{name}, Türkiye" if name else "Türkiye"
-                        
-                        results.append({
-                            "display_name": display,
-                            "name": name,
-                            "district": district,
-                            "city": city,
-                            "type": props.get("osm_value", props.get("type", ""))
-                        })
+    client = http_client
+    # 1) Photon API (çok hızlı + TR destekli)
+    try:
+        location_upstream["photon"] += 1
+        response = await client.get(PHOTON_URL, params={"q": q, "lang": "tr", "limit": 8})
+        if response.status_code == 200:
+            data = response.json()
+            if data.get("features") and len(data["features"]) > 0:
+                # Photon sonuçlarını formatla
+                results = []
+                for feature in data["features"]:
+                    props = feature.get("properties", {})
                     
-                    if results:
-                        return {"engine": "photon", "results": results}
-        except Exception as e:
-            logger.warning(f"Photon API hatası: {e}")
-        
-        # 2) Nominatim Fallback (daha yavaş ama güvenilir)
-        try:
-            nominatim_url = f"https://nominatim.openstreetmap.org/search?format=jsonv2&addressdetails=1&limit=8&countrycodes=tr&q={quote(q)}"
-            response = await client.get(nominatim_url, headers=headers)
-            
-            if response.status_code == 200:
-                data = response.json()
-                if data and len(data) > 0:
-                    results = []
-                    for item in data:
-                        address = item.get("address", {})
-                        
-                        # İsim belirle
-                        name = item.get("name", "")
-                        if not name:
-                            name = address.get("neighbourhood", address.get("suburb", address.get("village", "")))
-                        
-                        # İlçe ve il belirle
-                        district = address.get("district", address.get("county", address.get("suburb", "")))
-                        city = address.get("city", address.get("town", address.get("province", address.get("state", ""))))
-                        
-                        # Display name formatla
-                        if district and city:
-                            display = f"{name}, {district}/{city}, Türkiye" if name and name != district else f"{district}/{city}, Türkiye"
-                        elif city:
-                            display = f"{name}, {city}, Türkiye" if name else f"{city}, Türkiye"
-                        else:
-                            display = item.get("display_name", "Türkiye")
-                        
-                        results.append({
-                            "display_name": display,
-                            "name": name,
-                            "district": district,
-                            "city": city,
-                            "type": item.get("type", "")
-                        })
+                    # Sadece Türkiye sonuçlarını al
+                    country = props.get("country", "").lower()
+                    if country not in ["türkiye", "turkey", "tr"]:
+                        continue
                     
-                    if results:
-                        return {"engine": "nominatim", "results": results}
-        except Exception as e:
-            logger.warning(f"Nominatim API hatası: {e}")
+                    # Display name oluştur: Mahalle, İlçe/İl, Türkiye
+                    name = props.get("name", "")
+                    district = props.get("district", props.get("locality", ""))
+                    city = props.get("city", props.get("county", props.get("state", "")))
+                    
+                    if district and city:
+                        display = f"{name}, {district}/{city}, Türkiye" if name else f"{district}/{city}, Türkiye"
+                    elif city:
+                        display = f"{name}, {city}, Türkiye" if name else f"{city}, Türkiye"
+                    else:
+                        display = f"{name}, Türkiye" if name else "Türkiye"
+                    
+                    results.append({
+                        "display_name": display,
+                        "name": name,
+                        "district": district,
+                        "city": city,
+                        "type": props.get("osm_value", props.get("type", ""))
+                    })
+                
+                if results:
+                    return {"engine": "photon", "results": results}
+    except Exception as e:
+        logger.warning(f"Photon API hatası: {e}")
     
+    # 2) Nominatim Fallback (daha yavaş ama güvenilir)
+    try:
+        location_upstream["nominatim"] += 1
+        response = await client.get(NOMINATIM_URL, params={
+            "format": "jsonv2", "addressdetails": 1, "limit": 8, "countrycodes": "tr", "q": q
+        })
+        if response.status_code == 200:
+            data = response.json()
+            if data and len(data) > 0:
+                results = []
+                for item in data:
+                    address = item.get("address", {})
+                    
+                    # İsim belirle
+                    name = item.get("name", "")
+                    if not name:
+                        name = address.get("neighbourhood", address.get("suburb", address.get("village", "")))
+                    
+                    # İlçe ve il belirle
+                    district = address.get("district", address.get("county", address.get("suburb", "")))
+                    city = address.get("city", address.get("town", address.get("province", address.get("state", ""))))
+                    
+                    # Display name formatla
+                    if district and city:
+                        display = f"{name}, {district}/{city}, Türkiye" if name and name != district else f"{district}/{city}, Türkiye"
+                    elif city:
+                        display = f"{name}, {city}, Türkiye" if name else f"{city}, Türkiye"
+                    else:
+                        display = item.get("display_name", "Türkiye")
+                    
+                    results.append({
+                        "display_name": display,
+                        "name": name,
+                        "district": district,
+                        "city": city,
+                        "type": item.get("type", "")
+                    })
+                
+                if results:
+                    return {"engine": "nominatim", "results": results}
+    except Exception as e:
+        logger.warning(f"Nominatim API hatası: {e}")
+
     # Hiçbiri çalışmazsa boş döndür
     return {"engine": "none", "results": []}
 
 
+LOCATION_LIMIT = 8
+
+
+def merge_location_results(local: List[dict], upstream: dict) -> dict:
+    """Sözlüğün önek eşleşmeleri önde, upstream sonuçları arada; aynı (il, ilçe, mahalle) bir kez"""
+    head = LOCATION_LIMIT // 2
+    results, seen = [], set()
+    for item in local[:head] + upstream["results"] + local[head:]:
+        key = location_key(item) or (item["display_name"],)
+        if key not in seen:
+            seen.add(key)
+            results.append(item)
+    engine = "gazetteer" if upstream["engine"] == "none" else f"gazetteer+{upstream['engine']}"
+    return {"engine": engine, "results": results[:LOCATION_LIMIT]}
+
+
+async def upstream_locations(q: str, key: str) -> dict:
+    """Önbellek, uçuşta olan aynı sorgu (single-flight), en son yeni Photon/Nominatim çağrısı"""
+    cached = location_cache.get(key)
+    if cached is not None:
+        return cached
+
+    task = location_inflight.get(key)
+    if task is not None:
+        location_upstream["coalesced"] += 1
+    else:
+        # Önbellek/single-flight anahtarı normalize; upstream'e kullanıcının yazdığı sorgu gider
+        task = asyncio.ensure_future(fetch_locations(q))
+        location_inflight[key] = task
+        task.add_done_callback(lambda _: location_inflight.pop(key, None))
+    result = await asyncio.shield(task)
+
+    # Upstream hatasıyla boş dönen sonuçları önbelleğe alma
+    if result["engine"] != "none":
+        location_cache.set(key, result)
+    return result
+
+
+@api_router.get("/locations/search")
+async def search_locations(q: str = Query(..., min_length=1, description="Aranacak konum")):
+    """
+    Konum arama proxy'si. Yerel sözlük (açıksa) yalnızca tam ad eşleşmesinde
+    tek başına cevap verir; önek eşleşmeleri (sözlükte olmayan bir mahalle de
+    olabilir) upstream sonuçlarıyla birleştirilir.
+    """
+    key = normalize_location_query(q)
+    local, complete = gazetteer.lookup(key, LOCATION_LIMIT) if gazetteer is not None else ([], False)
+    if complete:
+        return {"engine": "gazetteer", "results": local}
+    result = await upstream_locations(q, key)
+    return merge_location_results(local, result) if local else result
+
+
+# ===== CATALOG STATS =====
+# /api/import/stats için tek belgede tutulan özet: toplam, kategori ve çok
+# satan sayıları, fiyat min/max ve histogram. Her yazma yolu ($inc/$min/$max
+# ile atomik) kendi farkını uygular; istek başına aggregation yapılmaz.
+# $min/$max yalnızca genişler, silme/fiyat düşüşü sonrası reconcile daraltır.
+CATALOG_STATS_ID = "products"
+CATALOG_STATS_FIELDS = {"_id": 0, "category": 1, "is_bestseller": 1, "price": 1, "badge": 1}
+# Import batch'leri önceki hal -> bulk_write -> yazılan hal farkını bu kilit
+# altında hesaplar; aynı ürünlere dokunan eşzamanlı import'lar farklarını
+# üst üste uygulayıp sayaçları kaydıramaz
+catalog_stats_lock = asyncio.Lock()
+PRICE_HISTOGRAM_EDGES = [0, 250, 500, 750, 1000, 1500, 2000, 3000, 5000]
+
+
+def price_bucket(price) -> str:
+    price = price if isinstance(price, (int, float)) else 0
+    for low, high in zip(PRICE_HISTOGRAM_EDGES, PRICE_HISTOGRAM_EDGES[1:]):
+        if price < high:
+            return f"{low}-{high - 1}"
+    return f"{PRICE_HISTOGRAM_EDGES[-1]}+"
+
+
+def stats_key(slug: str) -> str:
+    """Kategori slug'ını Mongo alan adı olarak güvenli hale getir"""
+    return (slug or "_").replace(".", "_").replace("$", "_")
+
+
+def catalog_stats_delta(products, sign: int = 1, inc: Optional[dict] = None) -> dict:
+    """Ürün listesinin istatistiklere katkısı ($inc alanları)"""
+    inc = {} if inc is None else inc
+
+    def add(field: str):
+        inc[field] = inc.get(field, 0) + sign
+
+    for product in products:
+        category = stats_key(product.get("category", ""))
+        add("total")
+        add(f"categories.{category}.count")
+        if product.get("is_bestseller"):
+            add("bestsellers")
+            add(f"categories.{category}.bestsellers")
+        add(f"price_histogram.{price_bucket(product.get('price'))}")
+        add(f"badges.{stats_key(product.get('badge', ''))}")
+    return inc
+
+
+async def apply_catalog_stats(added, removed=()):
+    """Eklenen/çıkarılan ürünlerin net farkını tek update ile uygula"""
+    inc = catalog_stats_delta(removed, -1, catalog_stats_delta(added))
+    inc = {field: value for field, value in inc.items() if value}
+    prices = [p["price"] for p in added if isinstance(p.get("price"), (int, float))]
+    if not inc and not prices:
+        return
+    update = {"$set": {"updated_at": datetime.now(timezone.utc)}}
+    if inc:
+        update["$inc"] = inc
+    if prices:
+        update["$min"] = {"price_min": min(prices)}
+        update["$max"] = {"price_max": max(prices)}
+    await db.catalog_stats.update_one({"_id": CATALOG_STATS_ID}, update, upsert=True)
+
+
+async def reset_catalog_stats():
+    await db.catalog_stats.replace_one(
+        {"_id": CATALOG_STATS_ID},
+        {"total": 0, "bestsellers": 0, "categories": {}, "price_histogram": {}, "badges": {}, "updated_at": datetime.now(timezone.utc)},
+        upsert=True,
+    )
+
+
+async def compute_catalog_stats() -> dict:
+    """İstatistikleri ürünleri tarayarak baştan hesapla (artımlı yol ile aynı kurallar)"""
+    inc, price_min, price_max = {}, None, None
+    async for product in db.products.find({}, CATALOG_STATS_FIELDS).batch_size(5000):
+        catalog_stats_delta([product], 1, inc)
+        price = product.get("price")
+        if isinstance(price, (int, float)):
+            price_min = price if price_min is None else min(price_min, price)
+            price_max = price if price_max is None else max(price_max, price)
+    stats = {"total": 0, "bestsellers": 0, "categories": {}, "price_histogram": {}, "badges": {}}
+    for field, value in inc.items():
+        target, parts = stats, field.split(".")
+        for part in parts[:-1]:
+            target = target.setdefault(part, {})
+        target[parts[-1]] = value
+    if price_min is not None:
+        stats["price_min"], stats["price_max"] = price_min, price_max
+    return stats
+
+
+def flatten_stats(stats: dict, prefix: str = "") -> dict:
+    flat = {}
+    for key, value in stats.items():
+        if key in ("_id", "updated_at"):
+            continue
+        if isinstance(value, dict):
+            flat.update(flatten_stats(value, f"{prefix}{key}."))
+        elif value:
+            flat[f"{prefix}{key}"] = value
+    return flat
+
+
 # ===== IMPORT ENDPOINTS =====
 
 # Kategori slug mapping (scraper format -> site format)
@@ -354,336 +1270,836 @@ class ImportRequest(BaseModel):
     category_name: str = ""  # Opsiyonel - JSON dosya adından kategori
 
 
-@api_router.post("/import/products")
-async def import_products(data: ImportRequest):
+IMPORT_BATCH_SIZE = int(os.environ.get('IMPORT_BATCH_SIZE', '500'))
+IMPORT_BADGES = ["Aynı Gün Teslimat", "Hızlı Teslimat", "Özel Fiyat", "Yeni"]
+
+
+def resolve_category_slug(item: ImportProductItem, category_name: str) -> str:
+    name = item.category or category_name
+    if not name:
+        return ""
+    return CATEGORY_MAPPING.get(name, name.lower().replace("_", "-"))
+
+
+def parse_price(price: str) -> int:
+    """Fiyat parse et (örn: "599,00 TL" -> 599)"""
+    price_str = price.replace("TL", "").replace(",00", "").replace(".", "").strip()
+    try:
+        return int(price_str)
+    except ValueError:
+        return 0
+
+
+def import_key(item: ImportProductItem, category_slug: str) -> Optional[dict]:
     """
-    Scraper'dan gelen JSON formatında ürünleri içe aktar.
+    Tekrar import'larda aynı ürünü bulmak için doğal anahtar.
+    Aynı ürün birden fazla kategoride listelenebildiği için kategori de anahtara dahil.
     """
-    imported = 0
-    skipped = 0
-    errors = []
-    
-    for item in data.products:
+    if item.url:
+        return {"category": category_slug, "source_url": item.url}
+    if item.product_code and item.product_code != "Bilinmiyor":
+        return {"category": category_slug, "product_code": item.product_code}
+    return None
+
+
+def build_import_operation(item: ImportProductItem, category_name: str):
+    """
+    Scraper ürününü upsert (anahtar varsa) veya insert işlemine çevir.
+    Yazılan ürünü sonradan bulmak için (işlem, sorgu) çifti döndürür.
+    """
+    category_slug = resolve_category_slug(item, category_name)
+
+    # Görsel URL seç (ilk görseli kullan)
+    image_url = ""
+    if item.all_images:
+        image_url = item.all_images[0]
+    elif item.local_images:
+        # Local image path'i URL'e çevir (gerekirse)
+        image_url = f"/images/{item.local_images[0]}"
+
+    fields = {
+        "title": item.name,
+        "description": item.description or f"{item.name} - Özenle hazırlanmış taze çiçekler",
+        "price": parse_price(item.price),
+        "category": category_slug,
+        "image": image_url,
+        "product_code": item.product_code,
+        "source_url": item.url,
+        "all_images": item.all_images,
+        "contents": item.contents,
+    }
+    # Sadece ilk eklemede atanan alanlar: tekrar import id'yi ve rozeti değiştirmez
+    on_insert = {
+        "id": str(uuid.uuid4()),
+        "badge": random.choice(IMPORT_BADGES),
+        "is_bestseller": random.random() < 0.15,  # %15 bestseller
+        "created_at": datetime.now(timezone.utc),
+    }
+    key = import_key(item, category_slug)
+    if key is None:
+        return InsertOne({**fields, **on_insert}), {"id": on_insert["id"]}
+    return UpdateOne(key, {"$set": fields, "$setOnInsert": on_insert}, upsert=True), key
+
+
+def new_import_report() -> dict:
+    return {"imported": 0, "inserted": 0, "updated": 0, "skipped": 0, "errors": [], "batches": []}
+
+
+# Bozuk büyük dosyalarda hata listesi sınırsız büyümesin
+MAX_REPORTED_ERRORS = 100
+
+
+def record_import_errors(report: dict, errors: List[dict]):
+    room = MAX_REPORTED_ERRORS - len(report["errors"])
+    if room > 0:
+        report["errors"].extend(errors[:room])
+
+
+async def write_import_batch(items: List[ImportProductItem], category_name: str, report: dict):
+    """Bir batch'i tek unordered bulk_write ile yaz ve sonucu rapora işle"""
+    batch = {"batch": len(report["batches"]) + 1, "size": len(items), "inserted": 0, "updated": 0, "errors": []}
+    operations, lookups, names = [], [], []
+    for item in items:
         try:
-            # Kategori belirle
-            category_slug = ""
-            if item.category:
-                category_slug = CATEGORY_MAPPING.get(item.category, item.category.lower().replace("_", "-"))
-            elif data.category_name:
-                category_slug = CATEGORY_MAPPING.get(data.category_name, data.category_name.lower().replace("_", "-"))
-            
-            # Fiyat parse et (örn: "599,00 TL" -> 599)
-            price_str = item.price.replace("TL", "").replace(",00", "").replace(".", "").strip()
-            try:
-                price = int(price_str)
-            except:
-                price = 0
-            
-            # Görsel URL seç (ilk görseli kullan)
-            image_url = ""
-            if item.all_images:
-                image_url = item.all_images[0]
-            elif item.local_images:
-                # Local image path'i URL'e çevir (gerekirse)
-                image_url = f"/images/{item.local_images[0]}"
-            
-            # Badge belirle
-            badges = ["Aynı Gün Teslimat", "Hızlı Teslimat", "Özel Fiyat", "Yeni"]
-            import random
-            badge = random.choice(badges)
-            
-            # Ürün oluştur
-            product_doc = {
-                "id": str(uuid.uuid4()),
-                "title": item.name,
-                "description": item.description or f"{item.name} - Özenle hazırlanmış taze çiçekler",
-                "price": price,
-                "category": category_slug,
-                "image": image_url,
-                "badge": badge,
-                "is_bestseller": random.random() < 0.15,  # %15 bestseller
-                "product_code": item.product_code,
-                "source_url": item.url,
-                "all_images": item.all_images,
-                "contents": item.contents,
-                "created_at": datetime.now(timezone.utc).isoformat()
-            }
-            
-            # Veritabanına ekle
-            await db.products.insert_one(product_doc)
-            imported += 1
-            
+            operation, lookup = build_import_operation(item, category_name)
+            operations.append(operation)
+            lookups.append(lookup)
+            names.append(item.name)
         except Exception as e:
-            errors.append({"name": item.name, "error": str(e)})
-            skipped += 1
+            batch["errors"].append({"name": item.name, "error": str(e)})
+
+    if operations:
+        async with catalog_stats_lock:
+            # İstatistik farkı için güncellenecek ürünlerin önceki hali (fiyat değişebilir)
+            previous = await db.products.find({"$or": lookups}, CATALOG_STATS_FIELDS).to_list(None)
+            try:
+                result = await db.products.bulk_write(operations, ordered=False)
+                details = result.bulk_api_result
+            except BulkWriteError as e:
+                details = e.details
+                for error in details.get("writeErrors", []):
+                    batch["errors"].append({"name": names[error["index"]], "error": error.get("errmsg", "")})
+            batch["inserted"] = details.get("nInserted", 0) + details.get("nUpserted", 0)
+            batch["updated"] = details.get("nMatched", 0)
+
+            # Yazılan ürünleri (yeni + güncellenen) arama index'lerine ve istatistiklere al
+            written = await db.products.find({"$or": lookups}, {**INDEXED_FIELDS, **CATALOG_STATS_FIELDS}).to_list(None)
+            index_products(written)
+            await apply_catalog_stats(written, previous)
+
+    written_count = batch["inserted"] + batch["updated"]
+    report["imported"] += written_count
+    report["inserted"] += batch["inserted"]
+    report["updated"] += batch["updated"]
+    report["skipped"] += len(items) - written_count
+    record_import_errors(report, batch["errors"])
+    batch["errors"] = batch["errors"][:10]
+    report["batches"].append(batch)
+    if written_count:
+        product_totals.invalidate()
+        await bump_collection_version("products")
+
+
+@api_router.post("/import/products")
+async def import_products(
+    data: ImportRequest,
+    batch_size: int = Query(IMPORT_BATCH_SIZE, ge=1, le=5000, description="bulk_write başına ürün sayısı"),
+    background: bool = Query(False, description="True ise iş kuyruğa alınır ve hemen iş numarası döner")
+):
+    """
+    Scraper'dan gelen JSON formatında ürünleri içe aktar.
+    Ürünler batch'ler halinde unordered bulk_write ile yazılır; kaynak URL
+    (yoksa ürün kodu) ve kategori aynı olan ürünler tekrar eklenmez, güncellenir.
+    background=true ile içe aktarma arka planda çalışır, ilerleme
+    /api/import/jobs/{id} üzerinden izlenir.
+    """
+    if background:
+        job = ImportJob("products", data.category_name, total=len(data.products))
+        job.runner = lambda on_batch: import_items(data.products, data.category_name, batch_size, job.report, on_batch)
+        submit_import_job(job)
+        return JSONResponse(status_code=202, content=job.to_dict())
+
+    report = new_import_report()
+    await import_items(data.products, data.category_name, batch_size, report)
     
     return {
         "message": "İçe aktarma tamamlandı",
-        "imported": imported,
-        "skipped": skipped,
-        "errors": errors[:10]  # İlk 10 hata
+        **report,
+        "errors": report["errors"][:10]  # İlk 10 hata
     }
 
 
+UPLOAD_CHUNK_SIZE = 64 * 1024
+
+
+def category_from_filename(filename: str) -> str:
+    """json/kokina_urunler.json(.gz) -> kokina"""
+    name = PurePosixPath(filename.replace("\\", "/")).name
+    for suffix in (".gz", ".ndjson", ".jsonl", ".json"):
+        if name.endswith(suffix):
+            name = name[:-len(suffix)]
+    return name.replace("_urunler", "")
+
+
+async def iter_upload_chunks(file: UploadFile):
+    while True:
+        chunk = await file.read(UPLOAD_CHUNK_SIZE)
+        if not chunk:
+            break
+        yield chunk
+
+
+async def iter_gunzip(chunks):
+    inflater = zlib.decompressobj(wbits=31)
+    async for chunk in chunks:
+        data = inflater.decompress(chunk)
+        if data:
+            yield data
+    tail = inflater.flush()
+    if tail:
+        yield tail
+
+
+async def iter_zip_member(archive: zipfile.ZipFile, info: zipfile.ZipInfo):
+    with archive.open(info) as member:
+        while True:
+            chunk = member.read(UPLOAD_CHUNK_SIZE)
+            if not chunk:
+                break
+            yield chunk
+
+
+def zip_json_members(archive: zipfile.ZipFile) -> List[zipfile.ZipInfo]:
+    return [
+        info for info in archive.infolist()
+        if not info.is_dir()
+        and not info.filename.startswith("__MACOSX/")
+        and info.filename.lower().endswith((".json", ".ndjson", ".jsonl", ".json.gz"))
+    ]
+
+
+async def import_items(items: list, category_name: str, batch_size: int, report: dict, on_batch=None):
+    """Bellekteki ürün listesini sabit boyutlu batch'ler halinde bulk writer'a ver"""
+    for start in range(0, len(items), batch_size):
+        await write_import_batch(items[start:start + batch_size], category_name, report)
+        if on_batch is not None:
+            await on_batch(report)
+
+
+async def import_json_stream(chunks, category_name: str, batch_size: int, report: dict, on_batch=None):
+    """
+    JSON dizisi / NDJSON parçalarını çözüp sabit boyutlu batch'ler halinde
+    bulk writer'a ver. Bellekte en fazla bir batch ürün tutulur.
+    """
+    decoder = JSONItemDecoder()
+    batch = []
+    async for chunk in chunks:
+        for raw in decoder.feed(chunk):
+            try:
+                with metrics.span("validation"):
+                    batch.append(ImportProductItem(**raw))
+            except Exception as e:
+                name = raw.get("name", "") if isinstance(raw, dict) else ""
+                record_import_errors(report, [{"name": name, "error": str(e)}])
+                report["skipped"] += 1
+            if len(batch) >= batch_size:
+                await write_import_batch(batch, category_name, report)
+                batch = []
+                if on_batch is not None:
+                    await on_batch(report)
+    decoder.close()
+    if batch:
+        await write_import_batch(batch, category_name, report)
+        if on_batch is not None:
+            await on_batch(report)
+
+
+async def import_upload(file: UploadFile, batch_size: int, report: dict, on_batch=None) -> List[dict]:
+    """
+    Yüklenen dosyayı türüne göre (düz JSON/NDJSON, gzip veya zip) akış
+    halinde içe aktar; dosya başına özet listesi döndür.
+    """
+    filename = file.filename or ""
+    head = await file.read(4)
+    await file.seek(0)
+
+    if head.startswith(b"PK\x03\x04"):
+        archive = zipfile.ZipFile(file.file)
+        sources = []
+        for info in zip_json_members(archive):
+            chunks = iter_zip_member(archive, info)
+            if info.filename.lower().endswith(".gz"):
+                chunks = iter_gunzip(chunks)
+            sources.append((info.filename, chunks))
+    else:
+        chunks = iter_upload_chunks(file)
+        if head.startswith(b"\x1f\x8b"):
+            chunks = iter_gunzip(chunks)
+        sources = [(filename, chunks)]
+
+    files = []
+    for name, chunks in sources:
+        category_name = category_from_filename(name)
+        before = report["imported"]
+        await import_json_stream(chunks, category_name, batch_size, report, on_batch)
+        files.append({"filename": name, "category": category_name, "imported": report["imported"] - before})
+        logger.info(f"İçe aktarıldı: {name} -> {files[-1]['imported']} ürün (toplam {report['imported']})")
+    return files
+
+
 @api_router.post("/import/json-file")
-async def import_json_file(file: UploadFile = File(...)):
+async def import_json_file(
+    file: UploadFile = File(...),
+    batch_size: int = Query(IMPORT_BATCH_SIZE, ge=1, le=5000, description="bulk_write başına ürün sayısı"),
+    background: bool = Query(False, description="True ise iş kuyruğa alınır ve hemen iş numarası döner")
+):
     """
     JSON dosyası yükleyerek ürünleri içe aktar.
     Dosya adı kategori adı olarak kullanılır (örn: kokina_urunler.json)
+    JSON dizisi, NDJSON, .gz ve birden fazla dosya içeren .zip kabul edilir;
+    dosya akış halinde okunur, tamamı belleğe alınmaz.
+    background=true ile dosya geçici diske kopyalanır ve iş kuyruğa alınır.
     """
+    if background:
+        job = await submit_upload_job(file, batch_size)
+        return JSONResponse(status_code=202, content=job.to_dict())
+
+    report = new_import_report()
     try:
-        content = await file.read()
-        products_data = json.loads(content.decode('utf-8'))
-        
-        # Dosya adından kategori çıkar
-        filename = file.filename or ""
-        category_name = filename.replace("_urunler.json", "").replace(".json", "")
-        
-        # ImportRequest oluştur
-        import_data = ImportRequest(
-            products=[ImportProductItem(**p) for p in products_data],
-            category_name=category_name
+        files = await import_upload(file, batch_size, report)
+    except (ValueError, zlib.error, zipfile.BadZipFile) as e:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Geçersiz JSON formatı: {e} ({report['imported']} ürün içe aktarıldı)"
         )
-        
-        # Import işlemini çağır
-        result = await import_products(import_data)
-        result["filename"] = filename
-        result["category"] = category_name
-        
-        return result
-        
-    except json.JSONDecodeError:
-        raise HTTPException(status_code=400, detail="Geçersiz JSON formatı")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"İçe aktarma hatası: {str(e)}")
+    
+    return {
+        "message": "İçe aktarma tamamlandı",
+        **report,
+        "errors": report["errors"][:10],
+        "filename": file.filename or "",
+        "category": files[0]["category"] if len(files) == 1 else "",
+        "files": files
+    }
 
 
 @api_router.delete("/products/clear")
 async def clear_all_products():
     """Tüm ürünleri sil (yeni import öncesi kullanılabilir)"""
     result = await db.products.delete_many({})
+    product_totals.invalidate()
+    clear_product_indexes()
+    await reset_catalog_stats()
+    await bump_collection_version("products")
     return {"message": "Tüm ürünler silindi", "deleted_count": result.deleted_count}
 
 
 @api_router.get("/import/stats")
 async def get_import_stats():
-    """Mevcut veritabanı istatistikleri"""
-    total_products = await db.products.count_documents({})
+    """Mevcut veritabanı istatistikleri (catalog_stats belgesinden, O(1))"""
+    stats = await db.catalog_stats.find_one({"_id": CATALOG_STATS_ID})
+    if stats is None:
+        # İlk çağrı: belge henüz yoksa ürünlerden bir kez hesapla
+        stats = await compute_catalog_stats()
+        await db.catalog_stats.replace_one({"_id": CATALOG_STATS_ID}, {**stats, "updated_at": datetime.now(timezone.utc)}, upsert=True)
     
     # Kategorilere göre ürün sayıları
-    pipeline = [
-        {"$group": {"_id": "$category", "count": {"$sum": 1}}},
-        {"$sort": {"count": -1}}
-    ]
-    category_stats = await db.products.aggregate(pipeline).to_list(100)
+    category_stats = sorted(
+        ({"_id": slug, "count": c.get("count", 0), "bestsellers": c.get("bestsellers", 0)}
+         for slug, c in stats.get("categories", {}).items() if c.get("count", 0) > 0),
+        key=lambda c: -c["count"],
+    )
     
     return {
-        "total_products": total_products,
-        "categories": category_stats
+        "total_products": stats.get("total", 0),
+        "bestsellers": stats.get("bestsellers", 0),
+        "categories": category_stats,
+        "price": {
+            "min": stats.get("price_min"),
+            "max": stats.get("price_max"),
+            "histogram": stats.get("price_histogram", {}),
+        },
+        "badges": stats.get("badges", {}),
+        "updated_at": stats.get("updated_at"),
+    }
+
+
+@api_router.post("/admin/catalog-stats/reconcile")
+async def reconcile_catalog_stats(dry_run: bool = Query(False, description="Sadece farkı raporla, belgeyi yazma")):
+    """
+    İstatistikleri ürünlerden baştan hesapla, saklanan belgeyle farkını
+    (drift) raporla ve belgeyi düzelt. Tarama sırasında gelen yazmalar
+    kaybolabileceğinden yoğun import dışında çalıştırılmalı.
+    """
+    started = time.perf_counter()
+    stored = await db.catalog_stats.find_one({"_id": CATALOG_STATS_ID}) or {}
+    actual = await compute_catalog_stats()
+    stored_flat, actual_flat = flatten_stats(stored), flatten_stats(actual)
+    drift = {
+        field: {"stored": stored_flat.get(field, 0), "actual": actual_flat.get(field, 0)}
+        for field in sorted(set(stored_flat) | set(actual_flat))
+        if stored_flat.get(field, 0) != actual_flat.get(field, 0)
     }
+    if not dry_run:
+        await db.catalog_stats.replace_one({"_id": CATALOG_STATS_ID}, {**actual, "updated_at": datetime.now(timezone.utc)}, upsert=True)
+    if drift:
+        logger.warning(f"catalog_stats sapması: {len(drift)} alan")
+    return {
+        "drift": drift,
+        "drift_fields": len(drift),
+        "fixed": bool(drift) and not dry_run,
+        "scanned": actual["total"],
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+    }
+
+
+@api_router.get("/metrics", include_in_schema=False)
+async def get_metrics():
+    """Prometheus scrape endpoint (route gecikmeleri, Mongo komutları, upstream çağrıları)"""
+    return Response(content=metrics.REGISTRY.render(), media_type=metrics.PROMETHEUS_CONTENT_TYPE)
+
+
+@api_router.get("/images/derived/{shard}/{name}")
+async def get_image_derivative(shard: str, name: str):
+    """
+    Küçük görsel türevi. Dosya adı içerik özeti + genişlik olduğundan adres
+    değişmeden içerik değişmez: 1 yıl, immutable önbelleklenir.
+    """
+    path = image_variants.file_path(shard, name)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Görsel bulunamadı")
+    return FileResponse(
+        path,
+        media_type=image_variants.media_type(name),
+        headers={"Cache-Control": f"public, max-age={IMAGE_CACHE_MAX_AGE}, immutable"},
+    )
+
+
+@api_router.get("/cache/stats")
+async def get_cache_stats():
+    """Uygulama içi önbelleklerin isabet/kaçırma sayaçları"""
+    return {
+        "product_totals": product_totals.stats(),
+        "first_pages": first_page_cache.stats(),
+        "product_facets": product_facets_cache.stats(),
+        "locations": {**location_cache.stats(), "upstream": location_upstream},
+        "gazetteer": gazetteer.stats() if gazetteer is not None else None,
+        "image_variants": image_variants.stats(),
+        "reference": {
+            "sync": reference_sync["mode"],
+            **{name: cache.stats() for name, cache in reference_caches.items()},
+        },
+    }
+
+
+# ===== BACKGROUND IMPORT JOBS =====
+# Büyük içe aktarmalar proxy zaman aşımına takılmasın diye arka planda çalışır.
+# İşler kuyruğa alınır; aynı anda en fazla IMPORT_WORKERS iş çalışır. Kuyruk
+# sınırı (IMPORT_QUEUE_SIZE) bekleyen işlere uygulanır: iptal edilen iş
+# asyncio.Queue'da bir worker alana kadar dursa da yer tutmaz.
+IMPORT_WORKERS = int(os.environ.get('IMPORT_WORKERS', '2'))
+IMPORT_QUEUE_SIZE = int(os.environ.get('IMPORT_QUEUE_SIZE', '10'))
+IMPORT_JOB_HISTORY = int(os.environ.get('IMPORT_JOB_HISTORY', '50'))  # saklanan bitmiş iş sayısı
+
+import_queue: Optional[asyncio.Queue] = None
+import_workers: List[asyncio.Task] = []
+import_jobs: "OrderedDict[str, ImportJob]" = OrderedDict()
+
+
+class ImportCancelled(Exception):
+    pass
+
+
+class ImportJob:
+    """Kuyruktaki / çalışan bir içe aktarma işinin durumu ve ilerlemesi"""
+    FINISHED = ("completed", "failed", "cancelled")
+
+    def __init__(self, kind: str, source: str, total: Optional[int] = None):
+        self.id = str(uuid.uuid4())
+        self.kind = kind
+        self.source = source
+        self.status = "queued"
+        self.total = total            # ürün sayısı biliniyorsa
+        self.bytes_total = None       # dosya işlerinde ilerleme bayt üzerinden hesaplanır
+        self.bytes_read = None        # () -> okunan bayt
+        self.report = new_import_report()
+        self.files: List[dict] = []
+        self.error = ""
+        self.cancel_requested = False
+        self.created_at = datetime.now(timezone.utc)
+        self.started_at = None
+        self.finished_at = None
+        self.runner = None            # async (on_batch) -> Optional[files]
+        self.cleanup = None
+
+    @property
+    def processed(self) -> int:
+        return self.report["imported"] + self.report["skipped"]
+
+    def progress(self) -> Optional[float]:
+        if self.status == "completed":
+            return 1.0
+        if self.total:
+            return min(self.processed / self.total, 1.0)
+        if self.bytes_total and self.bytes_read is not None:
+            return min(self.bytes_read() / self.bytes_total, 1.0)
+        return None
+
+    def to_dict(self) -> dict:
+        elapsed = 0.0
+        if self.started_at is not None:
+            elapsed = (self.finished_at or time.perf_counter()) - self.started_at
+        throughput = self.processed / elapsed if elapsed > 0 else 0.0
+        progress = self.progress()
+        eta = None
+        if self.status == "running" and progress:
+            eta = round(elapsed * (1 - progress) / progress, 1)
+        return {
+            "job_id": self.id,
+            "kind": self.kind,
+            "source": self.source,
+            "status": self.status,
+            "processed": self.processed,
+            "total": self.total,
+            "progress": round(progress, 4) if progress is not None else None,
+            "items_per_second": round(throughput, 1),
+            "elapsed_seconds": round(elapsed, 1),
+            "eta_seconds": eta,
+            **{k: v for k, v in self.report.items() if k not in ("errors", "batches")},
+            "error_count": len(self.report["errors"]),
+            "errors": self.report["errors"][:10],
+            "batch_count": len(self.report["batches"]),
+            "files": self.files,
+            "error": self.error,
+            "created_at": self.created_at.isoformat(),
+        }
+
+    async def on_batch(self, report: dict):
+        if self.cancel_requested:
+            raise ImportCancelled()
+        # Batch'ler arasında event loop'u diğer isteklere bırak
+        await asyncio.sleep(0)
+
+    def release(self):
+        """Geçici dosya gibi kaynakları bir kez serbest bırak"""
+        cleanup, self.cleanup = self.cleanup, None
+        if cleanup is not None:
+            # Kapanan dosyada tell() çalışmaz; ilerleme son konumda kalır
+            if self.bytes_read is not None:
+                position = self.bytes_read()
+                self.bytes_read = lambda: position
+            cleanup()
+
+    async def execute(self):
+        if self.cancel_requested:
+            # Kuyruktayken iptal edildi; kaynakları iptal anında bırakıldı
+            self.status = "cancelled"
+            self.release()
+            return
+        self.status = "running"
+        self.started_at = time.perf_counter()
+        try:
+            files = await self.runner(self.on_batch)
+            self.files = files or []
+            self.status = "completed"
+        except ImportCancelled:
+            self.status = "cancelled"
+        except Exception as e:
+            self.status = "failed"
+            self.error = str(e)
+            logger.exception(f"İçe aktarma işi başarısız: {self.id}")
+        finally:
+            self.finished_at = time.perf_counter()
+            self.release()
+            logger.info(
+                f"İçe aktarma işi {self.id} {self.status}: {self.report['imported']} ürün, "
+                f"{self.finished_at - self.started_at:.1f} s"
+            )
+
+
+def prune_import_jobs():
+    finished = [job_id for job_id, job in import_jobs.items() if job.status in ImportJob.FINISHED]
+    for job_id in finished[:max(len(finished) - IMPORT_JOB_HISTORY, 0)]:
+        del import_jobs[job_id]
+
+
+def queued_import_jobs() -> int:
+    """Başlamayı bekleyen işler; iptal edilenler sayılmaz"""
+    return sum(1 for job in import_jobs.values() if job.status == "queued")
+
+
+def submit_import_job(job: ImportJob):
+    """İşi kuyruğa ekle; bekleyen iş sayısı sınırdaysa 503 döndür"""
+    if import_queue is None:
+        job.release()
+        raise HTTPException(status_code=503, detail="İçe aktarma kuyruğu hazır değil")
+    if queued_import_jobs() >= IMPORT_QUEUE_SIZE:
+        job.release()
+        raise HTTPException(status_code=503, detail="İçe aktarma kuyruğu dolu, daha sonra tekrar deneyin")
+    import_queue.put_nowait(job)
+    prune_import_jobs()
+    import_jobs[job.id] = job
+
+
+async def submit_upload_job(file: UploadFile, batch_size: int) -> ImportJob:
+    """
+    Yüklenen dosya istek bitince kapanır; önce parça parça geçici dosyaya
+    kopyala, iş bu kopyadan okusun.
+    """
+    spool = tempfile.TemporaryFile()
+    try:
+        async for chunk in iter_upload_chunks(file):
+            spool.write(chunk)
+        size = spool.tell()
+        spool.seek(0)
+    except Exception:
+        spool.close()
+        raise
+    copy = UploadFile(file=spool, filename=file.filename)
+    job = ImportJob("json-file", file.filename or "")
+    job.bytes_total = size
+    job.bytes_read = spool.tell
+    job.runner = lambda on_batch: import_upload(copy, batch_size, job.report, on_batch)
+    job.cleanup = spool.close
+    submit_import_job(job)
+    return job
+
+
+async def import_worker():
+    while True:
+        job = await import_queue.get()
+        try:
+            await job.execute()
+        finally:
+            import_queue.task_done()
+
+
+def get_import_job_or_404(job_id: str) -> ImportJob:
+    job = import_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="İçe aktarma işi bulunamadı")
+    return job
+
+
+@api_router.get("/import/jobs")
+async def list_import_jobs():
+    """Kuyruktaki, çalışan ve son biten içe aktarma işleri"""
+    return {
+        "workers": IMPORT_WORKERS,
+        "queued": queued_import_jobs(),
+        "jobs": [job.to_dict() for job in reversed(import_jobs.values())],
+    }
+
+
+@api_router.get("/import/jobs/{job_id}")
+async def get_import_job(job_id: str):
+    """İşin ilerlemesi: işlenen/toplam, ürün/s, hatalar ve tahmini kalan süre"""
+    return get_import_job_or_404(job_id).to_dict()
+
+
+@api_router.delete("/import/jobs/{job_id}")
+async def cancel_import_job(job_id: str):
+    """
+    İşi iptal et. Kuyruktaki iş hiç başlamaz, kuyruk sınırında yer tutmaz ve
+    geçici dosyası hemen silinir; çalışan iş mevcut batch yazıldıktan sonra
+    durur (yazılmış batch'ler geri alınmaz).
+    """
+    job = get_import_job_or_404(job_id)
+    if job.status in ImportJob.FINISHED:
+        raise HTTPException(status_code=409, detail=f"İş zaten sonlanmış: {job.status}")
+    job.cancel_requested = True
+    if job.status == "queued":
+        job.status = "cancelled"
+        job.release()
+    return job.to_dict()
+
+
+# ===== INDEX BOOTSTRAP =====
+# (koleksiyon, anahtarlar, seçenekler) - uygulamanın filtre/sıralama yaptığı her alan
+INDEX_SPECS = [
+    ("products", [("id", 1)], {"unique": True}),
+    ("products", [("category", 1), ("is_bestseller", 1), ("created_at", 1), ("id", 1)], {}),
+    ("products", [("category", 1), ("created_at", 1), ("id", 1)], {}),
+    ("products", [("is_bestseller", 1), ("created_at", 1), ("id", 1)], {}),
+    ("products", [("created_at", 1), ("id", 1)], {}),
+    # Fiyat aralığı / fiyat sıralaması (tek, çoklu veya hiç kategori)
+    ("products", [("category", 1), ("price", 1), ("id", 1)], {}),
+    ("products", [("price", 1), ("id", 1)], {}),
+    # bestseller sıralaması: is_bestseller azalan, created_at artan
+    ("products", [("category", 1), ("is_bestseller", -1), ("created_at", 1), ("id", 1)], {}),
+    ("products", [("is_bestseller", -1), ("created_at", 1), ("id", 1)], {}),
+    ("products", [("badge", 1), ("created_at", 1), ("id", 1)], {}),
+    # Import upsert anahtarları
+    ("products", [("category", 1), ("source_url", 1)], {}),
+    ("products", [("category", 1), ("product_code", 1)], {}),
+    ("categories", [("slug", 1)], {"unique": True}),
+    ("banners", [("order", 1)], {}),
+]
+
+# Son bootstrap sonucunu /api/admin/indexes için sakla
+index_bootstrap = []
+
+
+async def _index_build_progress(collection: str) -> Optional[str]:
+    """Devam eden index build'inin ilerlemesini $currentOp'tan oku"""
+    try:
+        ops = await client.admin.aggregate([
+            {"$currentOp": {}},
+            {"$match": {"command.createIndexes": collection}},
+        ]).to_list(10)
+    except Exception:
+        return None
+    for op in ops:
+        if op.get("progress"):
+            return f"{op['progress'].get('done', 0)}/{op['progress'].get('total', 0)}"
+        if op.get("msg"):
+            return op["msg"]
+    return None
+
+
+async def ensure_indexes():
+    """INDEX_SPECS'teki index'leri sırayla oluştur ve ilerlemeyi logla"""
+    index_bootstrap.clear()
+    total = len(INDEX_SPECS)
+    for position, (collection, keys, options) in enumerate(INDEX_SPECS, start=1):
+        label = f"{collection}(" + ", ".join(k for k, _ in keys) + ")"
+        started = time.perf_counter()
+        entry = {"collection": collection, "keys": dict(keys), "unique": options.get("unique", False)}
+        build = asyncio.ensure_future(db[collection].create_index(keys, **options))
+        try:
+            while True:
+                done, _ = await asyncio.wait({build}, timeout=2.0)
+                if done:
+                    break
+                progress = await _index_build_progress(collection)
+                logger.info(f"Index [{position}/{total}] {label} oluşturuluyor... {progress or ''}")
+            entry["name"] = build.result()
+            entry["status"] = "ok"
+        except Exception as e:
+            entry["status"] = "error"
+            entry["error"] = str(e)
+            logger.warning(f"Index [{position}/{total}] {label} oluşturulamadı: {e}")
+        entry["duration_ms"] = round((time.perf_counter() - started) * 1000, 1)
+        if entry["status"] == "ok":
+            logger.info(f"Index [{position}/{total}] {label} hazır ({entry['duration_ms']} ms)")
+        index_bootstrap.append(entry)
+
+
+@api_router.get("/admin/indexes")
+async def get_index_stats():
+    """Index listesi, bootstrap sonucu ve $indexStats kullanım sayaçları"""
+    collections = {}
+    for name in sorted({spec[0] for spec in INDEX_SPECS}):
+        indexes = await db[name].index_information()
+        try:
+            usage = await db[name].aggregate([{"$indexStats": {}}]).to_list(100)
+        except Exception:
+            usage = []
+        ops_by_name = {u["name"]: u.get("accesses", {}) for u in usage}
+        collections[name] = [
+            {
+                "name": index_name,
+                "keys": dict(info["key"]),
+                "unique": info.get("unique", False),
+                "ops": ops_by_name.get(index_name, {}).get("ops"),
+                "since": ops_by_name.get(index_name, {}).get("since"),
+            }
+            for index_name, info in indexes.items()
+        ]
+    return {"bootstrap": index_bootstrap, "collections": collections}
 
 
 # Seed Data Route (for initial setup)
+# ===== SEED =====
+# Yük testleri için tekrarlanabilir katalog: aynı (size, seed) her seferinde
+# aynı kategorileri, banner'ları ve ürünleri (id'ler dahil) üretir.
+SEED_BATCH_SIZE = int(os.environ.get('SEED_BATCH_SIZE', '5000'))
+
+
+async def write_seed_batch(products: List[dict], report: dict, on_batch=None):
+    started = time.perf_counter()
+    await db.products.insert_many(products, ordered=False)
+    await apply_catalog_stats(products)
+    report["imported"] += len(products)
+    report["inserted"] += len(products)
+    report["batches"].append({
+        "batch": len(report["batches"]) + 1,
+        "size": len(products),
+        "inserted": len(products),
+        "ms": round((time.perf_counter() - started) * 1000, 1),
+    })
+    if on_batch is not None:
+        await on_batch(report)
+
+
+async def seed_catalog(size: int, seed: int, report: dict, on_batch=None):
+    """
+    Kataloğu baştan yaz: kategoriler ve banner'lar değiştirilir, ürünler
+    silinip üreteçten SEED_BATCH_SIZE'lık insert_many çağrılarıyla eklenir.
+    Bellekte en fazla bir batch ürün tutulur.
+    """
+    rng = random.Random(seed)
+    categories_data, banners_data = catalog.build_reference_data(rng)
+    # Kategoriler ve banner'lar her seed'de baştan yazılır (categories.slug unique)
+    await db.categories.delete_many({})
+    await db.categories.insert_many(categories_data)
+    await db.banners.delete_many({})
+    await db.banners.insert_many(banners_data)
+    await bump_collection_version("categories")
+    await bump_collection_version("banners")
+
+    await db.products.delete_many({})
+    clear_product_indexes()
+    await reset_catalog_stats()
+    batch = []
+    for product in catalog.generate_products(size, rng):
+        batch.append(product)
+        if len(batch) >= SEED_BATCH_SIZE:
+            await write_seed_batch(batch, report, on_batch)
+            batch = []
+    if batch:
+        await write_seed_batch(batch, report, on_batch)
+
+    product_totals.invalidate()
+    await bump_collection_version("products")
+    # 1M ürünü istek içinde index'lemek yerine Mongo'dan arka planda kur
+    start_search_rebuild()
+
+
 @api_router.post("/seed")
-async def seed_database():
+async def seed_database(
+    size: int = Query(1000, ge=1000, le=1_000_000, description="Üretilecek ürün sayısı"),
+    seed: int = Query(42, description="Rastgele sayı üreteci tohumu (aynı tohum = aynı katalog)"),
+    reset: bool = Query(False, description="Mevcut ürünleri silip kataloğu yeniden üret"),
+    background: bool = Query(False, description="True ise iş kuyruğa alınır ve hemen iş numarası döner")
+):
     # Check if data already exists
     existing_products = await db.products.count_documents({})
-    if existing_products > 0:
+    if existing_products > 0 and not reset:
         return {"message": "Veritabanı zaten dolu", "products_count": existing_products}
-    
-    # Categories (Scraper kategorileriyle uyumlu)
-    categories_data = [
-        {"id": str(uuid.uuid4()), "name": "Kokina", "slug": "kokina", "description": "Yeni yılın gözdesi", "icon": "🎄"},
-        {"id": str(uuid.uuid4()), "name": "Doğum Günü Çiçekleri", "slug": "dogum-gunu", "description": "Özel günler için", "icon": "🎂"},
-        {"id": str(uuid.uuid4()), "name": "Sevgiliye Çiçek", "slug": "sevgi-ask", "description": "Aşkınızı çiçeklerle ifade edin", "icon": "❤️"},
-        {"id": str(uuid.uuid4()), "name": "Çiçek Buketleri", "slug": "cicek-buketleri", "description": "Her ocasyon için buketler", "icon": "💐"},
-        {"id": str(uuid.uuid4()), "name": "Saksı Çiçekleri", "slug": "saksi-cicekleri", "description": "Kalıcı saksı bitkileri", "icon": "🪴"},
-        {"id": str(uuid.uuid4()), "name": "Yeni İşe Çiçek", "slug": "yeni-is-terfi", "description": "Başarıları kutlayın", "icon": "🎊"},
-        {"id": str(uuid.uuid4()), "name": "Orkide", "slug": "orkide", "description": "Şık, zarif ve kalıcı hediye", "icon": "🌸"},
-        {"id": str(uuid.uuid4()), "name": "Geçmiş Olsun Çiçekleri", "slug": "gecmis-olsun", "description": "Sevdiklerinize şifa dileyin", "icon": "💐"},
-        {"id": str(uuid.uuid4()), "name": "Gül", "slug": "gul", "description": "Aşkın en klasik hali", "icon": "🌹"},
-        {"id": str(uuid.uuid4()), "name": "Açılış Tören Çiçekleri", "slug": "acilis-kutlama", "description": "Açılış ve kutlamalar için", "icon": "🎉"},
-        {"id": str(uuid.uuid4()), "name": "Çelenk", "slug": "celenk", "description": "Cenaze ve anma çelenkleri", "icon": "🕊️"},
-        {"id": str(uuid.uuid4()), "name": "Yeni Bebek", "slug": "dogum-yeni-bebek", "description": "Yeni hayatı kutlayın", "icon": "👶"},
-        {"id": str(uuid.uuid4()), "name": "Ayçiçeği", "slug": "aycicegi", "description": "Güneş gibi parlak", "icon": "🌻"},
-        {"id": str(uuid.uuid4()), "name": "Papatyalar", "slug": "papatya-gerbera", "description": "Neşeli ve canlı çiçekler", "icon": "🌼"},
-        {"id": str(uuid.uuid4()), "name": "Antoryum", "slug": "antoryum", "description": "Egzotik ve şık", "icon": "❤️"},
-        {"id": str(uuid.uuid4()), "name": "Hüsnüyusuf", "slug": "husnuyusuf", "description": "Romantik ve zarif", "icon": "💜"},
-        {"id": str(uuid.uuid4()), "name": "Tasarım Çiçekler", "slug": "tasarim", "description": "Özel aranjmanlar ve butik işler", "icon": "🎨"},
-        {"id": str(uuid.uuid4()), "name": "Kırmızı Gül", "slug": "kirmizi-gul", "description": "Aşkın sembolü kırmızı güller", "icon": "🌹"},
-        {"id": str(uuid.uuid4()), "name": "Beyaz Gül", "slug": "beyaz-gul", "description": "Saflık ve zarafetin simgesi", "icon": "🤍"},
-        {"id": str(uuid.uuid4()), "name": "Nikah / Düğün", "slug": "nikah-dugun", "description": "Mutlu günlerinize özel", "icon": "💒"},
-    ]
-    await db.categories.insert_many(categories_data)
-    
-    # Banners
-    banners_data = [
-        {"id": str(uuid.uuid4()), "image": "https://images.unsplash.com/photo-1487530811176-3780de880c2d?w=1200&h=400&fit=crop", "title": "Yaz Koleksiyonu", "link": "/kategori/tasarim", "order": 1},
-        {"id": str(uuid.uuid4()), "image": "https://images.unsplash.com/photo-1561181286-d3fee7d55364?w=1200&h=400&fit=crop", "title": "Güller Festivali", "link": "/kategori/gul", "order": 2},
-        {"id": str(uuid.uuid4()), "image": "https://images.unsplash.com/photo-1508610048659-a06b669e3321?w=1200&h=400&fit=crop", "title": "Orkide Şıklığı", "link": "/kategori/orkide", "order": 3},
-    ]
-    await db.banners.insert_many(banners_data)
-    
-    # Products - Güller
-    gul_products = [
-        {"id": str(uuid.uuid4()), "title": "Kırmızı Gül Buketi", "description": "11 adet kırmızı gülden oluşan romantik buket", "price": 599, "category": "gul", "image": "https://images.unsplash.com/photo-1518621736915-f3b1c41bfd00?w=400&h=400&fit=crop", "is_bestseller": True, "badge": "Aynı Gün Teslimat", "created_at": datetime.now(timezone.utc).isoformat()},
-        {"id": str(uuid.uuid4()), "title": "Pembe Gül Aranjmanı", "description": "21 adet pembe gül özel vazo içinde", "price": 899, "category": "gul", "image": "https://images.unsplash.com/photo-1455659817273-f96807779a8a?w=400&h=400&fit=crop", "is_bestseller": True, "badge": "Aynı Gün Teslimat", "created_at": datetime.now(timezone.utc).isoformat()},
-        {"id": str(uuid.uuid4()), "title": "Beyaz Gül Buketi", "description": "15 adet beyaz gül zarif ambalajda", "price": 749, "category": "gul", "image": "https://images.unsplash.com/photo-1582794543139-8ac9cb0f7b11?w=400&h=400&fit=crop", "is_bestseller": False, "badge": "Aynı Gün Teslimat", "created_at": datetime.now(timezone.utc).isoformat()},
-        {"id": str(uuid.uuid4()), "title": "Karışık Renkli Güller", "description": "25 adet karışık renkli gül sepeti", "price": 1099, "category": "gul", "image": "https://images.unsplash.com/photo-1494972308805-463bc619d34e?w=400&h=400&fit=crop", "is_bestseller": False, "badge": "Aynı Gün Teslimat", "created_at": datetime.now(timezone.utc).isoformat()},
-        {"id": str(uuid.uuid4()), "title": "Sarı Gül Buketi", "description": "9 adet sarı gül dostluk buketi", "price": 449, "category": "gul", "image": "https://images.unsplash.com/photo-1586968304848-f29e3c95cb2c?w=400&h=400&fit=crop", "is_bestseller": False, "badge": "Aynı Gün Teslimat", "created_at": datetime.now(timezone.utc).isoformat()},
-        {"id": str(uuid.uuid4()), "title": "Lüks Gül Kutusu", "description": "50 adet premium gül özel kutuda", "price": 2499, "category": "gul", "image": "https://images.unsplash.com/photo-1548586196-aa5803b77379?w=400&h=400&fit=crop", "is_bestseller": False, "badge": "Premium", "created_at": datetime.now(timezone.utc).isoformat()},
-    ]
-    
-    # Products - Orkideler
-    orkide_products = [
-        {"id": str(uuid.uuid4()), "title": "Beyaz Orkide", "description": "Tek dallı beyaz orkide seramik saksıda", "price": 799, "category": "orkide", "image": "https://images.unsplash.com/photo-1567748157439-651aca2ff064?w=400&h=400&fit=crop", "is_bestseller": True, "badge": "Aynı Gün Teslimat", "created_at": datetime.now(timezone.utc).isoformat()},
-        {"id": str(uuid.uuid4()), "title": "Mor Orkide", "description": "Çift dallı mor orkide premium saksıda", "price": 1299, "category": "orkide", "image": "https://images.unsplash.com/photo-1610397648930-477b8c7f0943?w=400&h=400&fit=crop", "is_bestseller": True, "badge": "Aynı Gün Teslimat", "created_at": datetime.now(timezone.utc).isoformat()},
-        {"id": str(uuid.uuid4()), "title": "Pembe Orkide", "description": "Tek dallı pembe orkide zarif ambalajda", "price": 849, "category": "orkide", "image": "https://images.unsplash.com/photo-1566873535350-a3f5d4a804b7?w=400&h=400&fit=crop", "is_bestseller": False, "badge": "Aynı Gün Teslimat", "created_at": datetime.now(timezone.utc).isoformat()},
-        {"id": str(uuid.uuid4()), "title": "Sarı Orkide", "description": "Nadir sarı orkide özel seramik saksıda", "price": 999, "category": "orkide", "image": "https://images.unsplash.com/photo-1612363148951-15f16817648f?w=400&h=400&fit=crop", "is_bestseller": False, "badge": "Aynı Gün Teslimat", "created_at": datetime.now(timezone.utc).isoformat()},
-        {"id": str(uuid.uuid4()), "title": "İkili Orkide Set", "description": "2 adet tek dallı orkide şık kutuda", "price": 1599, "category": "orkide", "image": "https://images.unsplash.com/photo-1590755726405-6c2e1f9a7dfe?w=400&h=400&fit=crop", "is_bestseller": False, "badge": "Premium", "created_at": datetime.now(timezone.utc).isoformat()},
-    ]
-    
-    # Products - Tasarım
-    tasarim_products = [
-        {"id": str(uuid.uuid4()), "title": "Butik Aranjman", "description": "Mevsim çiçeklerinden özel tasarım", "price": 699, "category": "tasarim", "image": "https://images.unsplash.com/photo-1563241527-3004b7be0ffd?w=400&h=400&fit=crop", "is_bestseller": True, "badge": "Aynı Gün Teslimat", "created_at": datetime.now(timezone.utc).isoformat()},
-        {"id": str(uuid.uuid4()), "title": "Pastel Rüya", "description": "Pastel tonlarda özel aranjman", "price": 899, "category": "tasarim", "image": "https://images.unsplash.com/photo-1520763185298-1b434c919102?w=400&h=400&fit=crop", "is_bestseller": True, "badge": "Aynı Gün Teslimat", "created_at": datetime.now(timezone.utc).isoformat()},
-        {"id": str(uuid.uuid4()), "title": "Tropikal Esen", "description": "Egzotik çiçeklerle tropikal tasarım", "price": 1199, "category": "tasarim", "image": "https://images.unsplash.com/photo-1525310072745-f49212b5ac6d?w=400&h=400&fit=crop", "is_bestseller": False, "badge": "Premium", "created_at": datetime.now(timezone.utc).isoformat()},
-        {"id": str(uuid.uuid4()), "title": "Vintage Şıklık", "description": "Klasik tarzda nostaljik buket", "price": 799, "category": "tasarim", "image": "https://images.unsplash.com/photo-1561181286-d3fee7d55364?w=400&h=400&fit=crop", "is_bestseller": False, "badge": "Aynı Gün Teslimat", "created_at": datetime.now(timezone.utc).isoformat()},
-        {"id": str(uuid.uuid4()), "title": "Modern Minimalist", "description": "Sade ve şık modern aranjman", "price": 649, "category": "tasarim", "image": "https://images.unsplash.com/photo-1487530811176-3780de880c2d?w=400&h=400&fit=crop", "is_bestseller": False, "badge": "Aynı Gün Teslimat", "created_at": datetime.now(timezone.utc).isoformat()},
-    ]
-    
-    # Products - Papatya / Gerbera
-    papatya_products = [
-        {"id": str(uuid.uuid4()), "title": "Papatya Buketi", "description": "Taze papatyalardan neşeli buket", "price": 399, "category": "papatya-gerbera", "image": "https://images.unsplash.com/photo-1490750967868-88aa4486c946?w=400&h=400&fit=crop", "is_bestseller": False, "badge": "Aynı Gün Teslimat", "created_at": datetime.now(timezone.utc).isoformat()},
-        {"id": str(uuid.uuid4()), "title": "Gerbera Aranjmanı", "description": "Renkli gerberalardan canlı aranjman", "price": 549, "category": "papatya-gerbera", "image": "https://images.unsplash.com/photo-1518882605630-8eb573696572?w=400&h=400&fit=crop", "is_bestseller": False, "badge": "Aynı Gün Teslimat", "created_at": datetime.now(timezone.utc).isoformat()},
-    ]
-    
-    # Products - Antoryum
-    antoryum_products = [
-        {"id": str(uuid.uuid4()), "title": "Kırmızı Antoryum", "description": "Tek dallı kırmızı antoryum şık saksıda", "price": 699, "category": "antoryum", "image": "https://images.unsplash.com/photo-1598880940371-c756e015fea1?w=400&h=400&fit=crop", "is_bestseller": True, "badge": "Aynı Gün Teslimat", "created_at": datetime.now(timezone.utc).isoformat()},
-        {"id": str(uuid.uuid4()), "title": "Beyaz Antoryum", "description": "Zarif beyaz antoryum seramik saksıda", "price": 749, "category": "antoryum", "image": "https://images.unsplash.com/photo-1596438459194-f275f413d6ff?w=400&h=400&fit=crop", "is_bestseller": False, "badge": "Aynı Gün Teslimat", "created_at": datetime.now(timezone.utc).isoformat()},
-    ]
-    
-    # Products - Kokina
-    kokina_products = [
-        {"id": str(uuid.uuid4()), "title": "Kokina Aranjmanı", "description": "Yeni yıla özel kokina düzenlemesi", "price": 899, "category": "kokina", "image": "https://images.unsplash.com/photo-1512418490979-92798cec1380?w=400&h=400&fit=crop", "is_bestseller": True, "badge": "Yeni Yıl Özel", "created_at": datetime.now(timezone.utc).isoformat()},
-        {"id": str(uuid.uuid4()), "title": "Lüks Kokina Sepeti", "description": "Premium kokina sepet aranjmanı", "price": 1299, "category": "kokina", "image": "https://images.unsplash.com/photo-1482517967863-00e15c9b44be?w=400&h=400&fit=crop", "is_bestseller": False, "badge": "Premium", "created_at": datetime.now(timezone.utc).isoformat()},
-    ]
-    
-    # Products - Lilyum
-    lilyum_products = [
-        {"id": str(uuid.uuid4()), "title": "Beyaz Lilyum Buketi", "description": "Mis kokulu beyaz lilyumlar", "price": 649, "category": "lilyum", "image": "https://images.unsplash.com/photo-1468327768560-75b778cbb551?w=400&h=400&fit=crop", "is_bestseller": False, "badge": "Aynı Gün Teslimat", "created_at": datetime.now(timezone.utc).isoformat()},
-        {"id": str(uuid.uuid4()), "title": "Pembe Lilyum", "description": "Zarif pembe lilyum aranjmanı", "price": 699, "category": "lilyum", "image": "https://images.unsplash.com/photo-1508610048659-a06b669e3321?w=400&h=400&fit=crop", "is_bestseller": False, "badge": "Aynı Gün Teslimat", "created_at": datetime.now(timezone.utc).isoformat()},
-    ]
-    
-    # Products - Ayçiçeği
-    aycicegi_products = [
-        {"id": str(uuid.uuid4()), "title": "Ayçiçeği Buketi", "description": "Neşeli ayçiçeği buketi", "price": 449, "category": "aycicegi", "image": "https://images.unsplash.com/photo-1551731409-43eb3e517a1a?w=400&h=400&fit=crop", "is_bestseller": False, "badge": "Aynı Gün Teslimat", "created_at": datetime.now(timezone.utc).isoformat()},
-        {"id": str(uuid.uuid4()), "title": "Güneş Sepeti", "description": "Ayçiçeği ve mevsim çiçekleri sepeti", "price": 599, "category": "aycicegi", "image": "https://images.unsplash.com/photo-1557844352-761f2565b576?w=400&h=400&fit=crop", "is_bestseller": False, "badge": "Aynı Gün Teslimat", "created_at": datetime.now(timezone.utc).isoformat()},
-    ]
-    
-    # Products - Çiçek Buketleri
-    buket_products = [
-        {"id": str(uuid.uuid4()), "title": "Karışık Buket", "description": "Mevsim çiçeklerinden renkli buket", "price": 499, "category": "cicek-buketleri", "image": "https://images.unsplash.com/photo-1561181286-d3fee7d55364?w=400&h=400&fit=crop", "is_bestseller": False, "badge": "Aynı Gün Teslimat", "created_at": datetime.now(timezone.utc).isoformat()},
-        {"id": str(uuid.uuid4()), "title": "Romantik Buket", "description": "Aşka özel romantik çiçek buketi", "price": 699, "category": "cicek-buketleri", "image": "https://images.unsplash.com/photo-1487530811176-3780de880c2d?w=400&h=400&fit=crop", "is_bestseller": False, "badge": "Aynı Gün Teslimat", "created_at": datetime.now(timezone.utc).isoformat()},
-    ]
-    
-    # Products - Saksı Çiçekleri
-    saksi_products = [
-        {"id": str(uuid.uuid4()), "title": "Bonsai Ağacı", "description": "Şık bonsai ağacı seramik saksıda", "price": 899, "category": "saksi-cicekleri", "image": "https://images.unsplash.com/photo-1567331711402-509c12c41959?w=400&h=400&fit=crop", "is_bestseller": False, "badge": "Aynı Gün Teslimat", "created_at": datetime.now(timezone.utc).isoformat()},
-        {"id": str(uuid.uuid4()), "title": "Sukulent Set", "description": "3'lü sukulent bitki seti", "price": 399, "category": "saksi-cicekleri", "image": "https://images.unsplash.com/photo-1459411552884-841db9b3cc2a?w=400&h=400&fit=crop", "is_bestseller": False, "badge": "Aynı Gün Teslimat", "created_at": datetime.now(timezone.utc).isoformat()},
-    ]
-    
-    # Generate ~1000 products
-    import random
-    
-    images = [
-        "https://images.unsplash.com/photo-1518621736915-f3b1c41bfd00?w=400&h=400&fit=crop",
-        "https://images.unsplash.com/photo-1455659817273-f96807779a8a?w=400&h=400&fit=crop",
-        "https://images.unsplash.com/photo-1582794543139-8ac9cb0f7b11?w=400&h=400&fit=crop",
-        "https://images.unsplash.com/photo-1494972308805-463bc619d34e?w=400&h=400&fit=crop",
-        "https://images.unsplash.com/photo-1567748157439-651aca2ff064?w=400&h=400&fit=crop",
-        "https://images.unsplash.com/photo-1610397648930-477b8c7f0943?w=400&h=400&fit=crop",
-        "https://images.unsplash.com/photo-1563241527-3004b7be0ffd?w=400&h=400&fit=crop",
-        "https://images.unsplash.com/photo-1520763185298-1b434c919102?w=400&h=400&fit=crop",
-        "https://images.unsplash.com/photo-1490750967868-88aa4486c946?w=400&h=400&fit=crop",
-        "https://images.unsplash.com/photo-1551731409-43eb3e517a1a?w=400&h=400&fit=crop",
-        "https://images.unsplash.com/photo-1487530811176-3780de880c2d?w=400&h=400&fit=crop",
-        "https://images.unsplash.com/photo-1561181286-d3fee7d55364?w=400&h=400&fit=crop",
-        "https://images.unsplash.com/photo-1525310072745-f49212b5ac6d?w=400&h=400&fit=crop",
-        "https://images.unsplash.com/photo-1598880940371-c756e015fea1?w=400&h=400&fit=crop",
-        "https://images.unsplash.com/photo-1468327768560-75b778cbb551?w=400&h=400&fit=crop",
-        "https://images.unsplash.com/photo-1508610048659-a06b669e3321?w=400&h=400&fit=crop",
-        "https://images.unsplash.com/photo-1518882605630-8eb573696572?w=400&h=400&fit=crop",
-        "https://images.unsplash.com/photo-1586968304848-f29e3c95cb2c?w=400&h=400&fit=crop",
-        "https://images.unsplash.com/photo-1548586196-aa5803b77379?w=400&h=400&fit=crop",
-        "https://images.unsplash.com/photo-1566873535350-a3f5d4a804b7?w=400&h=400&fit=crop",
-    ]
-    
-    product_templates = [
-        # Güller
-        {"names": ["Kırmızı Gül", "Pembe Gül", "Beyaz Gül", "Sarı Gül", "Turuncu Gül", "Mor Gül"], "category": "gul", "suffix": ["Buketi", "Sepeti", "Aranjmanı", "Kutusu"]},
-        {"names": ["7'li Gül", "11'li Gül", "21'li Gül", "31'li Gül", "51'li Gül", "101'li Gül"], "category": "gul", "suffix": ["Buketi", "Sepeti"]},
-        # Orkide
-        {"names": ["Beyaz Orkide", "Mor Orkide", "Pembe Orkide", "Sarı Orkide", "Mini Orkide", "Jumbo Orkide"], "category": "orkide", "suffix": ["Tek Dal", "Çift Dal", "3 Dal", "5 Dal"]},
-        # Lilyum
-        {"names": ["Beyaz Lilyum", "Pembe Lilyum", "Sarı Lilyum", "Turuncu Lilyum"], "category": "lilyum", "suffix": ["Buketi", "Sepeti", "Aranjmanı"]},
-        # Ayçiçeği
-        {"names": ["Ayçiçeği", "Güneş Çiçeği"], "category": "aycicegi", "suffix": ["Buketi", "Sepeti", "5'li", "10'lu", "15'li"]},
-        # Papatya/Gerbera
-        {"names": ["Papatya", "Gerbera", "Renkli Gerbera", "Beyaz Papatya"], "category": "papatya-gerbera", "suffix": ["Buketi", "Sepeti", "Aranjmanı"]},
-        # Tasarım
-        {"names": ["Tasarım", "Butik", "Özel", "Premium", "Lüks", "Minimalist", "Modern", "Vintage", "Bohem"], "category": "tasarim", "suffix": ["Aranjman", "Buket", "Sepet", "Kutu"]},
-        # Saksı
-        {"names": ["Orkide Saksı", "Bonsai", "Sukulent", "Kaktüs", "Monstera", "Zamioculcas", "Ficus", "Pothos"], "category": "saksi-cicekleri", "suffix": ["", "Seti", "Koleksiyonu"]},
-        # Antoryum
-        {"names": ["Kırmızı Antoryum", "Beyaz Antoryum", "Pembe Antoryum"], "category": "antoryum", "suffix": ["", "Aranjmanı", "Saksıda"]},
-        # Kokina
-        {"names": ["Kokina", "Atatürk Çiçeği"], "category": "kokina", "suffix": ["", "Aranjmanı", "Sepeti", "Mini"]},
-        # Karanfil
-        {"names": ["Kırmızı Karanfil", "Beyaz Karanfil", "Pembe Karanfil", "Renkli Karanfil"], "category": "karanfil", "suffix": ["Buketi", "Sepeti"]},
-        # Hüsnüyusuf
-        {"names": ["Hüsnüyusuf", "Leylak"], "category": "husnuyusuf", "suffix": ["Buketi", "Aranjmanı"]},
-        # Çiçek Buketleri
-        {"names": ["Mevsim Çiçekleri", "Kır Çiçekleri", "Romantik", "Sevgi", "Aşk", "Özel Gün"], "category": "cicek-buketleri", "suffix": ["Buketi", "Sepeti", "Aranjmanı"]},
-    ]
-    
-    badges = ["Aynı Gün Teslimat", "Hızlı Teslimat", "Özel Fiyat", "Çok Satan", "Yeni", "Premium"]
-    
-    extra_products = []
-    product_id = 1
-    
-    for template in product_templates:
-        for name in template["names"]:
-            for suffix in template["suffix"]:
-                for i in range(5):  # Her kombinasyon için 5 varyasyon
-                    title = f"{name} {suffix}".strip()
-                    if i > 0:
-                        title = f"{title} #{i+1}"
-                    
-                    price = random.randint(29, 299) * 10 + 9  # 299 - 2999 arası
-                    
-                    extra_products.append({
-                        "id": str(uuid.uuid4()),
-                        "title": title,
-                        "description": f"{title} - Özenle hazırlanmış taze çiçekler ile sevdiklerinizi mutlu edin",
-                        "price": price,
-                        "category": template["category"],
-                        "image": images[product_id % len(images)],
-                        "is_bestseller": random.random() < 0.1,
-                        "badge": random.choice(badges),
-                        "created_at": datetime.now(timezone.utc).isoformat()
-                    })
-                    product_id += 1
-    
-    all_products = gul_products + orkide_products + tasarim_products + papatya_products + antoryum_products + kokina_products + lilyum_products + aycicegi_products + buket_products + saksi_products + extra_products
-    await db.products.insert_many(all_products)
+
+    if background:
+        job = ImportJob("seed", f"size={size} seed={seed}", total=size)
+        job.runner = lambda on_batch: seed_catalog(size, seed, job.report, on_batch)
+        submit_import_job(job)
+        return JSONResponse(status_code=202, content=job.to_dict())
+
+    report = new_import_report()
+    started = time.perf_counter()
+    await seed_catalog(size, seed, report)
+    elapsed = time.perf_counter() - started
     
     return {
         "message": "Veritabanı başarıyla dolduruldu",
-        "categories_count": len(categories_data),
-        "banners_count": len(banners_data),
-        "products_count": len(all_products)
+        "seed": seed,
+        "categories_count": len(catalog.CATEGORIES),
+        "banners_count": len(catalog.BANNERS),
+        "products_count": report["inserted"],
+        "batches": len(report["batches"]),
+        "elapsed_seconds": round(elapsed, 2),
+        "products_per_second": round(report["inserted"] / elapsed) if elapsed > 0 else None,
     }
 
 
@@ -696,6 +2112,22 @@ app.add_middleware(
     allow_origins=os.environ.get('CORS_ORIGINS', '*').split(','),
     allow_methods=["*"],
     allow_headers=["*"],
+    # /api/search toplam sonuç sayısını gövde yerine bu başlıkta döner
+    expose_headers=["X-Total-Count"],
+)
+
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=COMPRESSION_MIN_SIZE,
+    gzip_level=int(os.environ.get('COMPRESSION_GZIP_LEVEL', '6')),
+    brotli_quality=int(os.environ.get('COMPRESSION_BROTLI_QUALITY', '4')),
+)
+
+# En dışta: süre ölçümü sıkıştırma ve 304 yanıtlarını da kapsar
+app.add_middleware(
+    metrics.MetricsMiddleware,
+    router=app.router,
+    server_timing=os.environ.get('SERVER_TIMING', 'false').lower() in ('1', 'true', 'yes'),
 )
 
 # Configure logging
@@ -705,6 +2137,46 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+@app.on_event("startup")
+async def startup_indexes():
+    await migrate_created_at()
+    await ensure_indexes()
+    # Arama index'i arka planda kurulur; hazır olana kadar regex fallback çalışır
+    start_search_rebuild()
+
+@app.on_event("startup")
+async def startup_http_client():
+    global http_client, gazetteer
+    http_client = create_http_client()
+    if USE_GAZETTEER:
+        try:
+            loaded = Gazetteer()
+            loaded.load(GAZETTEER_PATH)
+            gazetteer = loaded
+            logger.info(f"Konum sözlüğü yüklendi: {len(loaded)} kayıt, {loaded.load_ms} ms, {loaded.memory_bytes / 1024:.0f} KB")
+        except Exception as e:
+            logger.warning(f"Konum sözlüğü yüklenemedi ({GAZETTEER_PATH}): {e}")
+
+@app.on_event("startup")
+async def startup_reference_cache():
+    global reference_watcher
+    await load_collection_versions()
+    for cache in reference_caches.values():
+        await cache.reload()
+    reference_watcher = asyncio.create_task(watch_reference_data())
+
+@app.on_event("startup")
+async def startup_import_workers():
+    global import_queue
+    import_queue = asyncio.Queue()  # sınır submit_import_job'da, bekleyen işler üzerinden
+    import_workers[:] = [asyncio.create_task(import_worker()) for _ in range(IMPORT_WORKERS)]
+
 @app.on_event("shutdown")
 async def shutdown_db_client():
+    for worker in import_workers:
+        worker.cancel()
+    if reference_watcher is not None:
+        reference_watcher.cancel()
     client.close()
+    if http_client is not None:
+        await http_client.aclose()
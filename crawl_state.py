@@ -0,0 +1,131 @@
+"""
+Artımlı tarama için kalıcı durum (SQLite).
+
+Ürün sayfaları ve görseller URL ile anahtarlanır; ETag, Last-Modified ve
+içerik özeti (sha256) saklanır. Sonraki çalıştırmada If-None-Match /
+If-Modified-Since gönderilir; 304 veya aynı özet gelen ürünler önceki
+JSON'dan olduğu gibi taşınır, görselleri yeniden indirilmez.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS pages (
+    url TEXT PRIMARY KEY,
+    etag TEXT,
+    last_modified TEXT,
+    content_hash TEXT,
+    fetched_at REAL
+);
+CREATE TABLE IF NOT EXISTS images (
+    url TEXT PRIMARY KEY,
+    etag TEXT,
+    last_modified TEXT,
+    content_hash TEXT,
+    path TEXT,
+    fetched_at REAL
+);
+"""
+
+
+def content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def conditional_headers(row: Optional[dict]) -> Dict[str, str]:
+    """Kayıtlı doğrulayıcılardan koşullu istek başlıkları"""
+    headers = {}
+    if row:
+        if row.get("etag"):
+            headers["If-None-Match"] = row["etag"]
+        if row.get("last_modified"):
+            headers["If-Modified-Since"] = row["last_modified"]
+    return headers
+
+
+def load_previous(json_path: str) -> Dict[str, dict]:
+    """Önceki çalıştırmanın kategori JSON'u: ürün URL'si -> kayıt"""
+    if not os.path.exists(json_path):
+        return {}
+    try:
+        with open(json_path, encoding="utf-8") as f:
+            return {product["url"]: product for product in json.load(f) if product.get("url")}
+    except (OSError, ValueError):
+        return {}
+
+
+def previous_folder_name(product: Optional[dict]) -> Optional[str]:
+    """Önceki kayıttaki ürün klasörünün adı (Windows'ta yazılmış '\\' ayraçları da)"""
+    if not product or not product.get("folder"):
+        return None
+    return product["folder"].replace("\\", "/").rstrip("/").split("/")[-1] or None
+
+
+class CrawlState:
+    def __init__(self, path: str):
+        self.path = path
+        # Görsel worker thread'leri de okuyup yazar; tek bağlantı kilitle paylaşılır
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.row_factory = sqlite3.Row
+        self.lock = threading.RLock()
+        self.db.executescript(SCHEMA)
+        self.stats = {
+            "pages_new": 0,
+            "pages_changed": 0,
+            "pages_unchanged": 0,
+        }
+
+    def _execute(self, sql: str, params=()):
+        with self.lock:
+            return self.db.execute(sql, params).fetchone()
+
+    def _get(self, table: str, url: str) -> Optional[dict]:
+        row = self._execute(f"SELECT * FROM {table} WHERE url = ?", (url,))
+        return dict(row) if row is not None else None
+
+    def get_page(self, url: str) -> Optional[dict]:
+        return self._get("pages", url)
+
+    def get_image(self, url: str) -> Optional[dict]:
+        return self._get("images", url)
+
+    def record_page(self, url: str, headers, digest: str):
+        """200 yanıtının doğrulayıcılarını sakla (304'te touch_page kullanılır)"""
+        self._execute(
+            "INSERT OR REPLACE INTO pages (url, etag, last_modified, content_hash, fetched_at) VALUES (?, ?, ?, ?, ?)",
+            (url, headers.get("etag"), headers.get("last-modified"), digest, time.time()),
+        )
+
+    def record_image(self, url: str, headers, digest: str, path: str):
+        self._execute(
+            "INSERT OR REPLACE INTO images (url, etag, last_modified, content_hash, path, fetched_at) VALUES (?, ?, ?, ?, ?, ?)",
+            (url, headers.get("etag"), headers.get("last-modified"), digest, path, time.time()),
+        )
+
+    def touch_page(self, url: str):
+        self._execute("UPDATE pages SET fetched_at = ? WHERE url = ?", (time.time(), url))
+
+    def touch_image(self, url: str, path: Optional[str] = None):
+        if path is None:
+            self._execute("UPDATE images SET fetched_at = ? WHERE url = ?", (time.time(), url))
+        else:
+            self._execute("UPDATE images SET fetched_at = ?, path = ? WHERE url = ?", (time.time(), path, url))
+
+    def count(self, key: str, amount: int = 1):
+        with self.lock:
+            self.stats[key] += amount
+
+    def commit(self):
+        with self.lock:
+            self.db.commit()
+
+    def close(self):
+        with self.lock:
+            self.db.commit()
+            self.db.close()
@@ -0,0 +1,226 @@
+"""
+Asenkron tarama motoru (httpx + asyncio).
+
+Sabit time.sleep yerine host başına token bucket hız sınırı ve eşzamanlılık
+sınırı kullanılır; işler sınırlı sayıda worker'dan oluşan bir havuzda
+çalışır. 429/5xx ve bağlantı hatalarında Retry-After veya üstel geri
+çekilmeyle yeniden denenir.
+
+    async with Crawler(headers=HEADERS) as crawler:
+        response = await crawler.fetch(url)
+        results = await crawler.map(isle, ogeler)
+"""
+import asyncio
+import random
+import time
+from contextlib import asynccontextmanager
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class BodyInterrupted(httpx.TransportError):
+    """stream() yanıt başlıkları geldikten sonra, gövde okunurken kopan bağlantı"""
+
+
+class TokenBucket:
+    """Saniyede `rate` istek, en fazla `burst` kadar ani yükseliş"""
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        if self.rate <= 0:
+            return  # sınırsız
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class HostPolicy:
+    def __init__(self, rate: float = 4.0, burst: int = 4, concurrency: int = 4):
+        self.rate = rate
+        self.burst = burst
+        self.concurrency = concurrency
+
+
+class _HostState:
+    def __init__(self, policy: HostPolicy):
+        self.bucket = TokenBucket(policy.rate, policy.burst)
+        self.semaphore = asyncio.Semaphore(policy.concurrency)
+
+
+class Crawler:
+    def __init__(
+        self,
+        workers: int = 16,
+        policy: Optional[HostPolicy] = None,
+        host_policies: Optional[Dict[str, HostPolicy]] = None,
+        headers: Optional[dict] = None,
+        timeout: float = 30.0,
+        retries: int = 3,
+        backoff: float = 1.0,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        self.workers = workers
+        self.policy = policy or HostPolicy()
+        self.host_policies = host_policies or {}
+        self.headers = headers or {}
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.transport = transport
+        self.client: Optional[httpx.AsyncClient] = None
+        self._hosts: Dict[str, _HostState] = {}
+        self.stats = {"requests": 0, "retries": 0, "errors": 0, "bytes": 0, "by_status": {}}
+        self.started = time.perf_counter()
+
+    async def __aenter__(self):
+        self.client = httpx.AsyncClient(
+            headers=self.headers,
+            timeout=self.timeout,
+            follow_redirects=True,
+            transport=self.transport,
+            limits=httpx.Limits(max_connections=max(self.workers, 1) * 2, max_keepalive_connections=max(self.workers, 1)),
+        )
+        self.started = time.perf_counter()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.client.aclose()
+
+    def _host(self, url: str) -> _HostState:
+        host = urlsplit(url).hostname or ""
+        state = self._hosts.get(host)
+        if state is None:
+            state = self._hosts[host] = _HostState(self.host_policies.get(host, self.policy))
+        return state
+
+    def _retry_delay(self, attempt: int, response: Optional[httpx.Response]) -> float:
+        if response is not None:
+            retry_after = response.headers.get("retry-after", "")
+            if retry_after.isdigit():
+                return float(retry_after)
+        return self.backoff * (2 ** attempt) * random.uniform(0.5, 1.5)
+
+    async def fetch(self, url: str, headers: Optional[dict] = None) -> httpx.Response:
+        """
+        URL'yi host sınırlarına uyarak indir. Yeniden denemeler bittiğinde son
+        yanıt döner (durum kontrolü çağırana kalır) veya son hata fırlatılır.
+        """
+        host = self._host(url)
+        for attempt in range(self.retries + 1):
+            response, error = None, None
+            await host.bucket.acquire()
+            async with host.semaphore:
+                try:
+                    response = await self.client.get(url, headers=headers)
+                except httpx.TransportError as e:
+                    error = e
+            self.stats["requests"] += 1
+            if response is not None:
+                self._count_status(response)
+                self.stats["bytes"] += len(response.content)
+                if response.status_code not in RETRY_STATUSES:
+                    return response
+            if attempt == self.retries:
+                break
+            self.stats["retries"] += 1
+            await asyncio.sleep(self._retry_delay(attempt, response))
+        self.stats["errors"] += 1
+        if error is not None:
+            raise error
+        return response
+
+    @asynccontextmanager
+    async def stream(self, url: str, headers: Optional[dict] = None):
+        """
+        Gövdeyi belleğe almadan okumak için akış yanıtı (async with ... as response).
+        Yalnızca yanıt başlıkları gelene kadarki hatalar yeniden denenir; gövde
+        okunurken kopan bağlantı çağırana BodyInterrupted olarak iletilir
+        (tekrarlanıp tekrarlanmayacağına çağıran karar verir). Okunan baytları
+        çağıran count_bytes() ile bildirir.
+        """
+        host = self._host(url)
+        for attempt in range(self.retries + 1):
+            yielded = False
+            await host.bucket.acquire()
+            async with host.semaphore:
+                try:
+                    async with self.client.stream("GET", url, headers=headers) as response:
+                        self.stats["requests"] += 1
+                        self._count_status(response)
+                        if response.status_code not in RETRY_STATUSES or attempt == self.retries:
+                            if response.status_code in RETRY_STATUSES:
+                                self.stats["errors"] += 1
+                            yielded = True
+                            yield response
+                            return
+                        delay = self._retry_delay(attempt, response)
+                except BodyInterrupted:
+                    raise
+                except httpx.TransportError as e:
+                    if yielded:
+                        self.stats["errors"] += 1
+                        raise BodyInterrupted(str(e), request=response.request) from e
+                    self.stats["requests"] += 1
+                    if attempt == self.retries:
+                        self.stats["errors"] += 1
+                        raise
+                    delay = self._retry_delay(attempt, None)
+            self.stats["retries"] += 1
+            await asyncio.sleep(delay)
+
+    def count_bytes(self, amount: int):
+        self.stats["bytes"] += amount
+
+    def _count_status(self, response: httpx.Response):
+        status = str(response.status_code)
+        self.stats["by_status"][status] = self.stats["by_status"].get(status, 0) + 1
+
+    async def map(self, func: Callable[..., Awaitable], items: Iterable) -> List:
+        """
+        func(item) işlerini `workers` kadar eşzamanlı çalıştır; sonuçlar girdi
+        sırasıyla döner. Hata veren işin sonucu istisna nesnesidir.
+        """
+        items = list(items)
+        results: List = [None] * len(items)
+        queue: asyncio.Queue = asyncio.Queue()
+        for position, item in enumerate(items):
+            queue.put_nowait((position, item))
+
+        async def worker():
+            while True:
+                try:
+                    position, item = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                try:
+                    results[position] = await func(item)
+                except Exception as e:
+                    results[position] = e
+
+        await asyncio.gather(*(worker() for _ in range(min(self.workers, len(items)) or 1)))
+        return results
+
+    def summary(self) -> dict:
+        elapsed = time.perf_counter() - self.started
+        return {
+            **self.stats,
+            "elapsed_seconds": round(elapsed, 2),
+            "requests_per_second": round(self.stats["requests"] / elapsed, 2) if elapsed > 0 else 0.0,
+        }
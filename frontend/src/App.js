@@ -6,6 +6,35 @@ import axios from "axios";
 const BACKEND_URL = process.env.REACT_APP_BACKEND_URL;
 const API = `${BACKEND_URL}/api`;
 
+// Backend'in göreli türev URL'lerini (/api/images/...) backend köküne bağla
+const assetUrl = (url) => (url && url.startsWith("/") ? `${BACKEND_URL}${url}` : url);
+const assetSrcSet = (srcset) => srcset.split(", ").map(assetUrl).join(", ");
+
+// ===== PRODUCT IMAGE =====
+// image_variants varsa AVIF/WebP küçük türevler srcset ile, yoksa orijinal görsel
+const ProductImage = ({ product, sizes, className, loading = "lazy" }) => {
+  const variants = product.image_variants;
+  if (!variants) {
+    return <img src={product.image} alt={product.title} className={className} loading={loading} />;
+  }
+  return (
+    <picture>
+      {variants.sources.map((source) => (
+        <source key={source.type} type={source.type} srcSet={assetSrcSet(source.srcset)} sizes={sizes} />
+      ))}
+      <img
+        src={assetUrl(variants.src)}
+        alt={product.title}
+        width={variants.width}
+        height={variants.height}
+        className={className}
+        loading={loading}
+        decoding="async"
+      />
+    </picture>
+  );
+};
+
 // ===== LOGO COMPONENT (Pink Hearts Style) =====
 const Logo = () => (
   <Link to="/" className="flex items-center gap-2" data-testid="logo-link">
@@ -406,9 +435,9 @@ const ProductCard = ({ product }) => {
       data-testid={`product-card-${product.id}`}
     >
       <div className="relative aspect-square overflow-hidden">
-        <img 
-          src={product.image}
-          alt={product.title}
+        <ProductImage
+          product={product}
+          sizes="(min-width: 1536px) 17vw, (min-width: 1024px) 25vw, (min-width: 768px) 33vw, (min-width: 640px) 50vw, 100vw"
           className="w-full h-full object-cover group-hover:scale-105 transition-transform duration-300"
         />
         {product.badge && (
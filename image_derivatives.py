@@ -0,0 +1,195 @@
+"""
+Görsel türevleri: depodaki her blob için sabit genişliklerde AVIF/WebP küçük
+görseller üretir. Liste kartları tam boy /l/ JPEG'ler yerine bunları srcset
+ile ister; backend dosyaları /api/images/derived/ altından immutable önbellek
+başlıklarıyla sunar.
+
+    python image_derivatives.py --root images [--sizes 160,320,640] [--formats avif,webp] [--workers 4]
+
+Çıktı images/derived/<ilk 2 hane>/<sha256>-<genişlik>.<biçim> dosyaları ve
+images/derivatives.json manifest'idir:
+
+    spec:   üretimde kullanılan genişlik/biçim/kodlayıcı ayarları (değişirse yeniden üretilir)
+    images: sha256 -> {width, height, variants: [{width, height, format, path, size}]}
+    urls:   görsel URL'si -> sha256   (ürünlerin image alanı CDN URL'sidir)
+    paths:  local_images yolu -> sha256
+
+Dosya adı içerikten türediği için aynı ad hiçbir zaman farklı bayt taşımaz.
+Yeniden boyutlandırma CPU'ya bağlı olduğundan işler süreç havuzunda çalışır;
+yalnızca manifest'te eksik olan blob'lar işlenir.
+
+Pillow gerekir (backend/requirements.txt: pillow>=11.3.0). AVIF kodlayıcısı
+11.3.0'dan itibaren wheel'lere gömülü gelir; daha eski ya da kaynaktan
+libavif'siz derlenmiş bir Pillow'da features.check("avif") False döner ve AVIF uyarıyla atlanır: yalnızca WebP
+türevleri üretilir, kartların <picture> kaynaklarında AVIF <source>'u olmaz ve
+tarayıcı WebP <source>'unu kullanır. Biçim listesi
+manifest spec'ine girdiği için AVIF desteği sonradan gelince sonraki çalıştırma
+türevleri yeniden üretir.
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, Optional
+
+from image_store import ImageStore
+
+
+DEFAULT_SIZES = (160, 320, 640)
+DEFAULT_FORMATS = ("avif", "webp")
+# AVIF speed=8: varsayılana (6) göre ~3,5 kat hızlı, dosya ~%4 büyük
+ENCODER_OPTIONS = {"avif": {"quality": 50, "speed": 8}, "webp": {"quality": 75, "method": 4}}
+MANIFEST_NAME = "derivatives.json"
+
+
+def variant_widths(source_width: int, sizes) -> List[int]:
+    """Büyütme yapılmaz: kaynaktan dar genişlikler ve gerekirse kaynağın kendisi"""
+    widths = [size for size in sorted(sizes) if size < source_width]
+    if len(widths) < len(sizes):
+        widths.append(min(source_width, max(sizes)))
+    return widths
+
+
+def render(source_path: str, digest: str, out_root: str, sizes, formats) -> dict:
+    """
+    Tek blob'un türevlerini üret (süreç havuzunda çalışır). JPEG'ler draft()
+    ile en büyük hedef genişliğe yakın ölçekte çözülür; küçük boyutlar bir
+    öncekinden küçültülür.
+    """
+    from PIL import Image, ImageOps
+
+    with Image.open(source_path) as image:
+        original_width = image.size[0]
+        image.draft("RGB", (max(sizes), 1))  # yalnızca genişlik hedefi bağlayıcı
+        scale = original_width / image.size[0]
+        image = ImageOps.exif_transpose(image)
+        has_alpha = image.mode in ("RGBA", "LA") or (image.mode == "P" and "transparency" in image.info)
+        image = image.convert("RGBA" if has_alpha else "RGB")
+    width, height = image.size
+    variants = []
+    current = image
+    for target in sorted(variant_widths(width, sizes), reverse=True):
+        target_height = max(1, round(height * target / width))
+        if current.size != (target, target_height):
+            current = current.resize((target, target_height), Image.LANCZOS, reducing_gap=3.0)
+        for fmt in formats:
+            relative = f"derived/{digest[:2]}/{digest}-{target}.{fmt}"
+            target_path = os.path.join(out_root, relative)
+            os.makedirs(os.path.dirname(target_path), exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(target_path), prefix=".part-")
+            with os.fdopen(fd, "wb") as f:
+                current.save(f, format=fmt.upper(), **ENCODER_OPTIONS[fmt])
+            os.replace(temp_path, target_path)
+            variants.append({"width": target, "height": target_height, "format": fmt, "path": relative, "size": os.path.getsize(target_path)})
+    variants.sort(key=lambda v: (v["format"], v["width"]))
+    # Manifest'te kaynağın (draft öncesi) boyutu
+    return {"digest": digest, "width": round(width * scale), "height": round(height * scale), "variants": variants}
+
+
+def available_formats(formats) -> List[str]:
+    from PIL import features
+
+    usable = [fmt for fmt in formats if features.check(fmt)]
+    for fmt in formats:
+        if fmt not in usable:
+            print(f"⚠️  Pillow {fmt} desteği olmadan kurulmuş, {fmt} türevleri atlanıyor")
+    return usable
+
+
+class DerivativeManifest:
+    def __init__(self, root: str):
+        self.path = os.path.join(root, MANIFEST_NAME)
+        data = {}
+        if os.path.exists(self.path):
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+        self.spec: dict = data.get("spec", {})
+        self.images: Dict[str, dict] = data.get("images", {})
+        self.urls: Dict[str, str] = data.get("urls", {})
+        self.paths: Dict[str, str] = data.get("paths", {})
+
+    def save(self):
+        data = {"version": 1, "spec": self.spec, "images": self.images, "urls": self.urls, "paths": self.paths}
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(self.path) or ".", prefix=".derivatives-")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=1, sort_keys=True)
+        os.replace(temp_path, self.path)
+
+
+def generate(root: str, sizes=DEFAULT_SIZES, formats=DEFAULT_FORMATS, workers: Optional[int] = None, force: bool = False) -> dict:
+    store = ImageStore(root)
+    manifest = DerivativeManifest(root)
+    formats = available_formats(formats)
+    spec = {"sizes": sorted(sizes), "formats": list(formats), "options": {fmt: ENCODER_OPTIONS[fmt] for fmt in formats}}
+    if force or manifest.spec != spec:
+        manifest.images = {}
+    manifest.spec = spec
+
+    def usable(entry):
+        return all(os.path.isfile(os.path.join(root, v["path"])) for v in entry["variants"])
+
+    pending = [
+        (digest, blob) for digest, blob in store.blobs.items()
+        if blob.get("content_type", "").startswith("image/") or blob["path"].endswith((".jpg", ".png", ".webp", ".gif", ".avif"))
+        if digest not in manifest.images or not usable(manifest.images[digest])
+    ]
+    stats = {"blobs": len(store.blobs), "pending": len(pending), "generated": 0, "failed": 0, "errors": [], "bytes_in": 0, "bytes_out": 0}
+    started = time.perf_counter()
+    if pending and formats:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {
+                pool.submit(render, os.path.join(root, blob["path"]), digest, root, spec["sizes"], formats): (digest, blob)
+                for digest, blob in pending
+            }
+            for done, future in enumerate(as_completed(futures), 1):
+                digest, blob = futures[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    stats["failed"] += 1
+                    stats["errors"].append({"digest": digest, "error": f"{type(e).__name__}: {e}"})
+                    continue
+                manifest.images[digest] = {key: result[key] for key in ("width", "height", "variants")}
+                stats["generated"] += 1
+                stats["bytes_in"] += blob.get("size", 0)
+                stats["bytes_out"] += sum(v["size"] for v in result["variants"])
+                if done % 200 == 0:
+                    manifest.save()  # uzun çalışmada ara kayıt
+                    print(f"   {done}/{len(pending)} blob işlendi")
+
+    # URL ve local_images eşlemeleri yalnızca türevi olan blob'lar için
+    manifest.urls = {url: digest for url, digest in store.urls.items() if digest in manifest.images}
+    manifest.paths = {path: digest for path, digest in store.products.items() if digest in manifest.images}
+    manifest.save()
+    elapsed = time.perf_counter() - started
+    stats["elapsed_seconds"] = round(elapsed, 2)
+    stats["images_per_second"] = round(stats["generated"] / elapsed, 1) if elapsed > 0 else 0.0
+    stats["errors"] = stats["errors"][:20]
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Depodaki görsellerden AVIF/WebP küçük görseller üret")
+    parser.add_argument("--root", default="images", help="Görsel deposu kökü (blobs/ ve manifest.json)")
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)), help="Virgülle ayrılmış genişlikler (px)")
+    parser.add_argument("--formats", default=",".join(DEFAULT_FORMATS), help="Virgülle ayrılmış biçimler (avif, webp)")
+    parser.add_argument("--workers", type=int, default=None, help="Süreç sayısı (varsayılan: CPU sayısı)")
+    parser.add_argument("--force", action="store_true", help="Mevcut türevleri yok say, hepsini yeniden üret")
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(",") if size.strip()]
+    formats = [fmt.strip().lower() for fmt in args.formats.split(",") if fmt.strip()]
+    unknown = [fmt for fmt in formats if fmt not in ENCODER_OPTIONS]
+    if unknown:
+        parser.error(f"desteklenmeyen biçim: {', '.join(unknown)}")
+    try:
+        import PIL  # noqa: F401
+    except ImportError:
+        parser.error("Pillow kurulu değil (pip install pillow)")
+    print(json.dumps(generate(args.root, sizes, formats, args.workers, args.force), ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+"""
+Görsel indirme aşaması.
+
+Ürün ayrıştırıcı görsel URL'lerini submit() ile kuyruğa atar ve beklemeden
+sonraki ürüne geçer; ayrı bir worker havuzu kuyruğu boşaltıp görselleri
+ImageStore'a parça parça akıtır. Her submit() bir future döndürür (blob
+özeti); ürün JSON'u yazılmadan önce bu future'lar toplanıp local_images
+yollarına bağlanır. Aynı URL ikinci kez kuyruğa girmez.
+
+Geçici hatalar üstel geri çekilmeyle yeniden denenir: async hatta 429/5xx ve
+başlıklardan önceki bağlantı hataları Crawler.stream'de, yarıda kopan gövde
+burada; thread'li hatta
+hepsi burada; summary() indirilen bayt, bayt/sn ve hataları verir.
+
+    async with AsyncImagePipeline(store, crawler, state) as images:   # scraper_v2
+        future = images.submit(url)
+    with ThreadedImagePipeline(store, state=state) as images:          # scraper.py
+        future = images.submit(url, headers)
+"""
+import asyncio
+import random
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from crawler import RETRY_STATUSES, BodyInterrupted
+
+
+def backoff_delay(backoff: float, attempt: int, retry_after: str = "") -> float:
+    if retry_after and retry_after.isdigit():
+        return float(retry_after)
+    return backoff * (2 ** attempt) * random.uniform(0.5, 1.5)
+
+
+class _PipelineStats:
+    def __init__(self, store):
+        self.store = store
+        self.lock = threading.Lock()
+        self.counts = {"submitted": 0, "deduped": 0, "done": 0, "failed": 0, "retries": 0}
+        self.failures = []
+        self.started = None
+        self.finished = None
+        self._bytes_at_start = store.stats["bytes_read"]
+
+    def add(self, key: str, amount: int = 1):
+        with self.lock:
+            self.counts[key] += amount
+            if self.started is None:
+                self.started = time.perf_counter()
+            if key in ("done", "failed"):
+                self.finished = time.perf_counter()
+
+    def fail(self, url: str, error: Exception):
+        with self.lock:
+            self.failures.append({"url": url, "error": f"{type(error).__name__}: {error}"})
+        self.add("failed")
+
+    def summary(self) -> dict:
+        elapsed = (self.finished - self.started) if self.started and self.finished else 0.0
+        downloaded = self.store.stats["bytes_read"] - self._bytes_at_start
+        return {
+            **self.counts,
+            "bytes": downloaded,
+            "elapsed_seconds": round(elapsed, 2),
+            "bytes_per_second": round(downloaded / elapsed) if elapsed > 0 else 0,
+            "failures": self.failures[:20],
+        }
+
+
+class AsyncImagePipeline:
+    def __init__(self, store, crawler, state=None, workers: int = 8, retries: int = 2, backoff: float = 0.5):
+        self.store = store
+        self.crawler = crawler
+        self.state = state
+        self.workers = max(1, workers)
+        self.retries = retries
+        self.backoff = backoff
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self.futures: Dict[str, asyncio.Future] = {}
+        self.stats = _PipelineStats(store)
+        self._tasks = []
+
+    async def __aenter__(self):
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.queue.join()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def submit(self, url: str) -> asyncio.Future:
+        """URL'yi kuyruğa al (beklemez); future blob özetiyle tamamlanır"""
+        future = self.futures.get(url)
+        if future is not None:
+            self.stats.add("deduped")
+            return future
+        future = self.futures[url] = asyncio.get_running_loop().create_future()
+        self.stats.add("submitted")
+        self.queue.put_nowait(url)
+        return future
+
+    async def _worker(self):
+        while True:
+            url = await self.queue.get()
+            future = self.futures[url]
+            try:
+                future.set_result(await self._fetch(url))
+                self.stats.add("done")
+            except Exception as e:
+                future.set_exception(e)
+                self.stats.fail(url, e)
+            finally:
+                self.queue.task_done()
+
+    async def _fetch(self, url: str) -> str:
+        # 429/5xx ve başlıklardan önceki bağlantı hataları Crawler.stream içinde
+        # zaten yeniden denenir; oradan çıkan hata tekrarları tükenmiş demektir.
+        # Burada yalnızca gövde okunurken kopan bağlantılar (BodyInterrupted)
+        # tekrarlanır, böylece host başına istek bütçesi katlanmaz.
+        for attempt in range(self.retries + 1):
+            try:
+                return await self.store.fetch(self.crawler, url, self.state)
+            except BodyInterrupted:
+                if attempt == self.retries:
+                    raise
+                self.stats.add("retries")
+                await asyncio.sleep(backoff_delay(self.backoff, attempt))
+
+    def summary(self) -> dict:
+        return self.stats.summary()
+
+
+class ThreadedImagePipeline:
+    """requests.Session (bağlantı havuzu) + thread havuzu; selenium tarayıcısı için"""
+
+    def __init__(self, store, session: Optional[requests.Session] = None, state=None, workers: int = 8,
+                 retries: int = 3, backoff: float = 1.0, timeout: float = 20):
+        self.store = store
+        self.state = state
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.session = session or requests.Session()
+        adapter = HTTPAdapter(pool_connections=workers, pool_maxsize=workers)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="image")
+        self.futures: Dict[str, Future] = {}
+        self.stats = _PipelineStats(store)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.executor.shutdown(wait=True)
+        self.session.close()
+
+    def submit(self, url: str, headers: Optional[dict] = None) -> Future:
+        """URL'yi thread havuzuna ver (beklemez); future blob özetiyle tamamlanır"""
+        future = self.futures.get(url)
+        if future is not None:
+            self.stats.add("deduped")
+            return future
+        self.stats.add("submitted")
+        future = self.futures[url] = self.executor.submit(self._run, url, headers)
+        return future
+
+    def _run(self, url: str, headers: Optional[dict]) -> str:
+        try:
+            digest = self._fetch(url, headers)
+        except Exception as e:
+            self.stats.fail(url, e)
+            raise
+        self.stats.add("done")
+        return digest
+
+    def _fetch(self, url: str, headers: Optional[dict]) -> str:
+        for attempt in range(self.retries + 1):
+            try:
+                return self.store.fetch_sync(self.session, url, headers, self.state, self.timeout)
+            except (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError, requests.HTTPError) as e:
+                response = e.response if isinstance(e, requests.HTTPError) else None
+                if attempt == self.retries or (response is not None and response.status_code not in RETRY_STATUSES):
+                    raise
+                self.stats.add("retries")
+                retry_after = response.headers.get("retry-after", "") if response is not None else ""
+                time.sleep(backoff_delay(self.backoff, attempt, retry_after))
+
+    def summary(self) -> dict:
+        return self.stats.summary()
@@ -0,0 +1,318 @@
+"""
+İçerik adresli görsel deposu.
+
+Görseller images/blobs/<ilk 2 hane>/<sha256>.<uzantı> olarak bir kez saklanır;
+aynı CDN görseli (ör. cs557.jpg) birden çok kategoride geçse de tek dosyadır.
+images/manifest.json üç eşlemeyi tutar:
+
+    blobs:    sha256 -> {path, size, content_type}
+    urls:     görsel URL'si -> sha256     (URL ile tekrar ayıklama)
+    products: "Gul/Ürün Adı/1.jpg" -> sha256  (JSON'daki local_images yolları)
+
+JSON'lardaki local_images yolları değişmez; resolve() bu yolu blob dosyasına
+çevirir (eski klasör ağacındaki dosyalar da bulunur). İndirmeler parça parça
+geçici dosyaya yazılırken özetlenir; aynı içerik zaten varsa geçici dosya silinir.
+
+Eski images/<Kategori>/<Ürün>/<n>.jpg ağaçlarını depoya almak için:
+    python image_store.py import-tree images --json-dir . [--delete]
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import mimetypes
+import os
+import tempfile
+import threading
+from pathlib import PurePosixPath
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+from crawl_state import conditional_headers
+
+
+CHUNK_SIZE = 64 * 1024
+EXTENSIONS = {"image/jpeg": ".jpg", "image/png": ".png", "image/webp": ".webp", "image/gif": ".gif", "image/avif": ".avif"}
+
+
+def normalize_path(local_path: str) -> str:
+    """local_images yolunu manifest anahtarına çevir ('\\' -> '/')"""
+    return local_path.replace("\\", "/").strip("/")
+
+
+def blob_extension(content_type: str, url: str = "") -> str:
+    content_type = (content_type or "").split(";")[0].strip().lower()
+    if content_type in EXTENSIONS:
+        return EXTENSIONS[content_type]
+    suffix = PurePosixPath(urlsplit(url).path).suffix.lower()
+    if suffix in (".jpg", ".jpeg"):
+        return ".jpg"
+    return suffix if suffix in EXTENSIONS.values() else ".bin"
+
+
+class BlobWriter:
+    """Parçaları geçici dosyaya yazarken sha256 hesaplar; commit() blob'u yerine koyar"""
+
+    def __init__(self, store: "ImageStore"):
+        self.store = store
+        self._hash = hashlib.sha256()
+        self.size = 0
+        fd, self.temp_path = tempfile.mkstemp(dir=store.blob_root, prefix=".part-")
+        self._file = os.fdopen(fd, "wb")
+
+    def write(self, chunk: bytes):
+        self._hash.update(chunk)
+        self._file.write(chunk)
+        self.size += len(chunk)
+
+    def commit(self, content_type: str = "", url: str = "") -> str:
+        self._file.close()
+        digest = self._hash.hexdigest()
+        with self.store.lock:
+            self.store.stats["bytes_read"] += self.size
+            if self.store.has_blob(digest):
+                os.remove(self.temp_path)
+                self.store.stats["content_deduped"] += 1
+            else:
+                relative = self.store.blob_relative(digest, blob_extension(content_type, url))
+                target = os.path.join(self.store.root, relative)
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                os.replace(self.temp_path, target)
+                self.store.blobs[digest] = {"path": relative, "size": self.size, "content_type": content_type.split(";")[0].strip()}
+                self.store.stats["stored"] += 1
+                self.store.stats["bytes_stored"] += self.size
+            self.store.dirty = True
+        return digest
+
+    def abort(self):
+        self._file.close()
+        with self.store.lock:
+            self.store.stats["bytes_read"] += self.size
+            self.store.stats["failed"] += 1
+        if os.path.exists(self.temp_path):
+            os.remove(self.temp_path)
+
+
+class ImageStore:
+    def __init__(self, root: str = "images", refresh: bool = False):
+        self.root = root
+        self.refresh = refresh  # True: bilinen URL'lere de güvenme, yeniden indir
+        self.blob_root = os.path.join(root, "blobs")
+        self.manifest_path = os.path.join(root, "manifest.json")
+        os.makedirs(self.blob_root, exist_ok=True)
+        manifest = {}
+        if os.path.exists(self.manifest_path):
+            with open(self.manifest_path, encoding="utf-8") as f:
+                manifest = json.load(f)
+        self.blobs: Dict[str, dict] = manifest.get("blobs", {})
+        self.urls: Dict[str, str] = manifest.get("urls", {})
+        self.products: Dict[str, str] = manifest.get("products", {})
+        self.dirty = False
+        self._inflight = {}     # URL -> bu çalıştırmada süren indirme (single-flight)
+        self._seen_urls = set()  # bu çalıştırmada doğrulanmış URL'ler
+        self.lock = threading.Lock()  # ThreadedImagePipeline worker'ları aynı depoya yazar
+        self.stats = {"url_deduped": 0, "content_deduped": 0, "not_modified": 0, "stored": 0, "bytes_stored": 0, "bytes_read": 0, "failed": 0}
+
+    # ===== Manifest =====
+    def blob_relative(self, digest: str, extension: str) -> str:
+        return f"blobs/{digest[:2]}/{digest}{extension}"
+
+    def has_blob(self, digest: Optional[str]) -> bool:
+        blob = self.blobs.get(digest) if digest else None
+        return blob is not None and os.path.isfile(os.path.join(self.root, blob["path"]))
+
+    def link(self, local_path: str, digest: str):
+        """Ürünün local_images yolunu blob'a bağla"""
+        key = normalize_path(local_path)
+        if self.products.get(key) != digest:
+            self.products[key] = digest
+            self.dirty = True
+
+    def folders(self, category: str) -> set:
+        """Kategoride manifest'e kayıtlı ürün klasörleri"""
+        prefix = normalize_path(category) + "/"
+        return {key[len(prefix):].split("/")[0] for key in self.products if key.startswith(prefix)}
+
+    def resolve(self, local_path: str) -> Optional[str]:
+        """local_images yolunu diskteki dosyaya çevir (blob veya eski klasör ağacı)"""
+        digest = self.products.get(normalize_path(local_path))
+        if self.has_blob(digest):
+            return os.path.join(self.root, self.blobs[digest]["path"])
+        legacy = os.path.join(self.root, *normalize_path(local_path).split("/"))
+        return legacy if os.path.isfile(legacy) else None
+
+    def save(self):
+        with self.lock:
+            if not self.dirty:
+                return
+            manifest = {"version": 1, "blobs": dict(self.blobs), "urls": dict(self.urls), "products": dict(self.products)}
+            self.dirty = False
+        fd, temp_path = tempfile.mkstemp(dir=self.root, prefix=".manifest-")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=1, sort_keys=True)
+        os.replace(temp_path, self.manifest_path)
+
+    # ===== İndirme =====
+    async def fetch(self, crawler, url: str, state=None) -> str:
+        """
+        URL'nin blob özetini döndür. Bu çalıştırmada görülen URL ağa gitmez;
+        tarama durumu varsa bilinen URL koşullu istenir (304 -> mevcut blob).
+        Aynı URL için eşzamanlı çağrılar tek indirmeyi bekler.
+        """
+        known = self.urls.get(url)
+        if url in self._seen_urls and self.has_blob(known):
+            self.stats["url_deduped"] += 1
+            return known
+        if url in self._inflight:
+            self.stats["url_deduped"] += 1
+            return await self._inflight[url]
+        if known and self.has_blob(known) and state is None and not self.refresh:
+            # Durum tutulmuyorsa URL içeriği değişmez kabul edilir
+            self._seen_urls.add(url)
+            self.stats["url_deduped"] += 1
+            return known
+        task = self._inflight[url] = asyncio.ensure_future(self._download(crawler, url, known, state))
+        try:
+            return await task
+        finally:
+            self._inflight.pop(url, None)
+
+    async def _download(self, crawler, url: str, known: Optional[str], state) -> str:
+        row = state.get_image(url) if state is not None and self.has_blob(known) else None
+        async with crawler.stream(url, headers=conditional_headers(row) or None) as response:
+            if response.status_code == 304 and known:
+                self.stats["not_modified"] += 1
+                state.touch_image(url)
+                self._seen_urls.add(url)
+                return known
+            response.raise_for_status()
+            writer = BlobWriter(self)
+            try:
+                async for chunk in response.aiter_bytes(CHUNK_SIZE):
+                    writer.write(chunk)
+                    crawler.count_bytes(len(chunk))
+            except BaseException:
+                writer.abort()
+                raise
+            digest = writer.commit(response.headers.get("content-type", ""), url)
+            if state is not None:
+                state.record_image(url, response.headers, digest, self.blobs[digest]["path"])
+        if self.urls.get(url) != digest:
+            self.urls[url] = digest
+            self.dirty = True
+        self._seen_urls.add(url)
+        return digest
+
+    def fetch_sync(self, session, url: str, headers: Optional[dict] = None, state=None, timeout: float = 20) -> str:
+        """requests.Session ile aynı akış (selenium tarayıcısı için)"""
+        known = self.urls.get(url)
+        if self.has_blob(known) and (url in self._seen_urls or (state is None and not self.refresh)):
+            self.stats["url_deduped"] += 1
+            return known
+        row = state.get_image(url) if state is not None and self.has_blob(known) else None
+        with session.get(url, headers={**(headers or {}), **conditional_headers(row)}, timeout=timeout, stream=True) as response:
+            if response.status_code == 304 and known:
+                with self.lock:
+                    self.stats["not_modified"] += 1
+                state.touch_image(url)
+                self._seen_urls.add(url)
+                return known
+            response.raise_for_status()
+            writer = BlobWriter(self)
+            try:
+                for chunk in response.iter_content(CHUNK_SIZE):
+                    writer.write(chunk)
+            except BaseException:
+                writer.abort()
+                raise
+            digest = writer.commit(response.headers.get("content-type", ""), url)
+            if state is not None:
+                state.record_image(url, response.headers, digest, self.blobs[digest]["path"])
+        with self.lock:
+            if self.urls.get(url) != digest:
+                self.urls[url] = digest
+                self.dirty = True
+            self._seen_urls.add(url)
+        return digest
+
+    def ingest_file(self, path: str, url: str = "") -> str:
+        """Diskteki dosyayı depoya al (eski klasör ağaçları için)"""
+        writer = BlobWriter(self)
+        content_type = mimetypes.guess_type(path)[0] or ""
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+                writer.write(chunk)
+        digest = writer.commit(content_type, url or path)
+        if url and self.urls.get(url) != digest:
+            self.urls[url] = digest
+        return digest
+
+    def summary(self) -> dict:
+        return {
+            **self.stats,
+            "blobs": len(self.blobs),
+            "urls": len(self.urls),
+            "product_images": len(self.products),
+            "blob_bytes": sum(blob["size"] for blob in self.blobs.values()),
+        }
+
+
+def import_tree(store: ImageStore, tree: str, json_dir: str = "", delete: bool = False) -> dict:
+    """
+    images/<Kategori>/<Ürün>/<n>.jpg ağacını depoya al. json_dir verilirse
+    *_urunler.json kayıtlarındaki all_images URL'leri de eşlenir (local_images
+    ile aynı sıradadır), böylece sonraki taramada bu URL'ler indirilmez.
+    """
+    url_for_path = {}
+    if json_dir:
+        for name in sorted(os.listdir(json_dir)):
+            if not name.endswith("_urunler.json") or name == "tum_urunler.json":
+                continue
+            with open(os.path.join(json_dir, name), encoding="utf-8") as f:
+                for product in json.load(f):
+                    for local_path, url in zip(product.get("local_images", []), product.get("all_images", [])):
+                        url_for_path[normalize_path(local_path)] = url
+
+    files = 0
+    for directory, dirnames, filenames in os.walk(tree):
+        dirnames[:] = [d for d in dirnames if d != "blobs"]
+        for filename in sorted(filenames):
+            path = os.path.join(directory, filename)
+            relative = normalize_path(os.path.relpath(path, tree).replace(os.sep, "/"))
+            if relative.count("/") != 2:
+                continue  # yalnızca Kategori/Ürün/dosya
+            digest = store.ingest_file(path, url_for_path.get(relative, ""))
+            store.link(relative, digest)
+            files += 1
+            if delete:
+                os.remove(path)
+    store.dirty = True
+    store.save()
+    return {"files": files, **store.summary()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="İçerik adresli görsel deposu")
+    parser.add_argument("--root", default="images", help="Depo kökü (blobs/ ve manifest.json)")
+    commands = parser.add_subparsers(dest="command", required=True)
+    tree = commands.add_parser("import-tree", help="Eski Kategori/Ürün/n.jpg ağacını depoya al")
+    tree.add_argument("tree")
+    tree.add_argument("--json-dir", default="", help="*_urunler.json dosyalarının klasörü (URL eşlemesi için)")
+    tree.add_argument("--delete", action="store_true", help="Depoya alınan eski dosyaları sil")
+    commands.add_parser("stats", help="Depo özeti")
+    resolve = commands.add_parser("resolve", help="local_images yolunu dosyaya çevir")
+    resolve.add_argument("path")
+    args = parser.parse_args()
+
+    store = ImageStore(args.root)
+    if args.command == "import-tree":
+        result = import_tree(store, args.tree, args.json_dir, args.delete)
+    elif args.command == "resolve":
+        result = {"path": args.path, "file": store.resolve(args.path)}
+    else:
+        result = store.summary()
+    print(json.dumps(result, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -4,6 +4,7 @@ import random
 import requests
 import os
 import re
+import sys
 from bs4 import BeautifulSoup
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
@@ -13,6 +14,9 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import *
+from crawl_state import CrawlState, conditional_headers, content_hash, load_previous, previous_folder_name
+from image_pipeline import ThreadedImagePipeline
+from image_store import ImageStore
 
 # Güvenli isim fonksiyonları
 def safe_name(name):
@@ -22,16 +26,14 @@ def safe_name(name):
         name = name[:100]
     return name
 
-def get_unique_folder(parent_path, base_folder_name):
+def get_unique_folder_name(existing, base_folder_name):
     folder_name = base_folder_name
-    folder_path = os.path.join(parent_path, folder_name)
     counter = 2
-    while os.path.exists(folder_path):
+    while folder_name in existing:
         folder_name = f"{base_folder_name} ({counter})"
-        folder_path = os.path.join(parent_path, folder_name)
         counter += 1
-    os.makedirs(folder_path, exist_ok=True)
-    return folder_path, folder_name
+    existing.add(folder_name)
+    return folder_name
 
 # Kategoriler
 categories = [
@@ -56,19 +58,23 @@ categories = [
     {"url": "https://www.ciceksepeti.vip/cicek/nikah-dugun-cicekleri/", "name": "Nikah_Dugun_Cicekleri"}
 ]
 
-# Ana images klasörü
-if not os.path.exists("images"):
-    os.makedirs("images")
+# Artımlı tarama durumu: değişmeyen ürünler tarayıcı açılmadan önceki JSON'dan taşınır.
+# "python scraper.py --full" her şeyi baştan indirir.
+state = None if "--full" in sys.argv else CrawlState("crawl_state.sqlite3")
+# Görseller images/blobs altında bir kez saklanır; images/manifest.json yolları eşler
+store = ImageStore("images", refresh="--full" in sys.argv)
+# Görseller ayrı bir thread havuzunda (ortak requests.Session) iner; ürün döngüsü beklemez
+images = ThreadedImagePipeline(store, state=state, workers=8)
 
 # Her kategori için ayrı driver
 for cat_idx, cat in enumerate(categories):
     cat_url = cat["url"]
     cat_name = cat["name"]
-    cat_folder = os.path.join("images", cat_name)
-    if not os.path.exists(cat_folder):
-        os.makedirs(cat_folder)
+    folders = store.folders(cat_name)
 
     print(f"\n=== {cat_idx+1}/{len(categories)} Kategori: {cat_name} ===")
+    json_file = f"{cat_name.lower()}_urunler.json"
+    previous = load_previous(json_file)
 
     # Yeni driver başlat
     chrome_options = Options()
@@ -96,6 +102,7 @@ for cat_idx, cat in enumerate(categories):
 
         print(f"{len(product_cards)} ürün bulundu.")
         products_data = []
+        pending_images = []  # (ürün kaydı, [(local_images yolu, future)])
 
         for index, card in enumerate(product_cards):
             try:
@@ -109,6 +116,23 @@ for cat_idx, cat in enumerate(categories):
 
                 print(f"[{index+1}/{len(product_cards)}] İşleniyor: {product_name}")
 
+                # Ham sayfayı koşullu iste; önceki çalıştırmadan beri değişmediyse kaydı taşı
+                prev = previous.get(product_link)
+                row = state.get_page(product_link) if state is not None and prev is not None else None
+                probe = None
+                if state is not None:
+                    try:
+                        probe = requests.get(product_link, headers={"User-Agent": "Mozilla/5.0", **conditional_headers(row)}, timeout=20)
+                    except Exception:
+                        probe = None
+                if row is not None and probe is not None and (
+                    probe.status_code == 304 or (probe.ok and content_hash(probe.content) == row["content_hash"])
+                ):
+                    state.touch_page(product_link)
+                    products_data.append({**prev, "price": price})
+                    print("   Değişmemiş, önceki kayıt kullanıldı")
+                    continue
+
                 driver.execute_script("window.open('');")
                 driver.switch_to.window(driver.window_handles[1])
                 driver.get(product_link)
@@ -148,26 +172,22 @@ for cat_idx, cat in enumerate(categories):
 
                 all_images = sorted(list(all_images))
 
-                # Klasör oluştur
-                base_folder = safe_name(title)
-                product_folder_path, folder_name = get_unique_folder(cat_folder, base_folder)
+                # Klasör oluştur (daha önce görülen ürün kendi klasörünü kullanır, kopya açılmaz)
+                folder_name = previous_folder_name(prev)
+                if folder_name:
+                    folders.add(folder_name)
+                else:
+                    base_folder = safe_name(title)
+                    folder_name = get_unique_folder_name(folders, base_folder)
                 print(f"   Klasör: {cat_name}/{folder_name}")
 
-                # Görselleri indir
-                downloaded_images = []
+                # Görselleri indirme kuyruğuna at (sonuçlar kategori sonunda toplanır)
                 headers = {"User-Agent": "Mozilla/5.0", "Referer": product_link}
-                for i, img_url in enumerate(all_images):
-                    try:
-                        response = requests.get(img_url, headers=headers, timeout=20)
-                        response.raise_for_status()
-                        filename = f"{i+1}.jpg"
-                        path = os.path.join(product_folder_path, filename)
-                        with open(path, "wb") as f:
-                            f.write(response.content)
-                        downloaded_images.append(os.path.join(cat_name, folder_name, filename))
-                        print(f"   İndirildi ({i+1}/{len(all_images)}): {filename}")
-                    except Exception as e:
-                        print(f"   İndirilemedi ({i+1}): {e}")
+                image_jobs = [
+                    (os.path.join(cat_name, folder_name, f"{i+1}.jpg"), images.submit(img_url, headers))
+                    for i, img_url in enumerate(all_images)
+                ]
+                print(f"   {len(image_jobs)} görsel kuyruğa alındı")
 
                 # Açıklama vb.
                 description = soup.select_one("div.m-productContent__info").get_text(strip=True, separator="\n") if soup.select_one("div.m-productContent__info") else ""
@@ -179,11 +199,14 @@ for cat_idx, cat in enumerate(categories):
                     "price": price,
                     "url": product_link,
                     "folder": os.path.join(cat_name, folder_name),
-                    "local_images": downloaded_images,
+                    "local_images": [],
                     "all_images": all_images,
                     "contents": contents,
                     "description": description
                 })
+                pending_images.append((products_data[-1], image_jobs))
+                if state is not None and probe is not None and probe.ok:
+                    state.record_page(product_link, probe.headers, content_hash(probe.content))
 
                 driver.close()
                 driver.switch_to.window(driver.window_handles[0])
@@ -199,11 +222,22 @@ for cat_idx, cat in enumerate(categories):
                     pass
                 time.sleep(5)
 
+        # İndirme aşamasını bekle; başarılı görseller local_images'a yazılır
+        for product, image_jobs in pending_images:
+            for i, (relative_path, future) in enumerate(image_jobs):
+                try:
+                    store.link(relative_path, future.result())
+                    product["local_images"].append(relative_path)
+                except Exception as e:
+                    print(f"   İndirilemedi ({product['name']} {i+1}): {e}")
+
         # Kategori JSON
-        json_file = f"{cat_name.lower()}_urunler.json"
         with open(json_file, "w", encoding="utf-8") as f:
             json.dump(products_data, f, ensure_ascii=False, indent=2)
         print(f"{cat_name} tamamlandı! {len(products_data)} ürün.")
+        store.save()
+        if state is not None:
+            state.commit()
 
     except Exception as e:
         print(f"Kategori hatası ({cat_name}): {e}")
@@ -216,4 +250,15 @@ for cat_idx, cat in enumerate(categories):
 
     time.sleep(10)  # Kategoriler arası dinlenme
 
+images.close()
+if state is not None:
+    state.close()
+store.save()
+
 print("\nTüm kategoriler tamamlandı! 🎉")
+print(f"Görsel deposu: {store.summary()}")
+pipeline = images.summary()
+print(f"İndirme aşaması: {pipeline['done']} görsel, {pipeline['failed']} hata, {pipeline['retries']} tekrar, "
+      f"{pipeline['bytes'] / 1024 / 1024:.1f} MB, {pipeline['bytes_per_second'] / 1024:.0f} KB/sn")
+for failure in pipeline["failures"]:
+    print(f"   {failure['url']}: {failure['error']}")
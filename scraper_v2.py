@@ -1,11 +1,15 @@
+import argparse
+import asyncio
 import json
-import time
-import random
-import requests
 import os
 import re
 from bs4 import BeautifulSoup
-from urllib.parse import urljoin
+from urllib.parse import urljoin, urlsplit, urlunsplit
+
+from crawler import Crawler, HostPolicy
+from crawl_state import CrawlState, conditional_headers, content_hash, load_previous, previous_folder_name
+from image_pipeline import AsyncImagePipeline
+from image_store import ImageStore
 
 # Güvenli isim fonksiyonları
 def safe_name(name):
@@ -15,26 +19,22 @@ def safe_name(name):
         name = name[:100]
     return name
 
-def get_unique_folder(parent_path, base_folder_name):
+def get_unique_folder_name(existing, base_folder_name):
+    """Kategoride kullanılmamış klasör adı ("Ad", "Ad (2)", ...); adı existing'e ekler"""
     folder_name = base_folder_name
-    folder_path = os.path.join(parent_path, folder_name)
     counter = 2
-    while os.path.exists(folder_path):
+    while folder_name in existing:
         folder_name = f"{base_folder_name} ({counter})"
-        folder_path = os.path.join(parent_path, folder_name)
         counter += 1
-    os.makedirs(folder_path, exist_ok=True)
-    return folder_path, folder_name
+    existing.add(folder_name)
+    return folder_name
 
-# Session oluştur
-session = requests.Session()
-session.headers.update({
+# İstek başlıkları (Accept-Encoding'i httpx kurulu çözücülere göre kendisi belirler)
+HEADERS = {
     "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
     "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
     "Accept-Language": "tr-TR,tr;q=0.9,en-US;q=0.8,en;q=0.7",
-    "Accept-Encoding": "gzip, deflate, br",
-    "Connection": "keep-alive",
-})
+}
 
 # Kategoriler
 categories = [
@@ -59,180 +59,356 @@ categories = [
     {"url": "https://www.ciceksepeti.vip/cicek/nikah-dugun-cicekleri/", "name": "Nikah_Dugun_Cicekleri"}
 ]
 
-# Ana images klasörü
-if not os.path.exists("images"):
-    os.makedirs("images")
 
-all_products = []
+# ===== HTML AYRIŞTIRMA =====
+def parse_category(html, cat_url):
+    """Kategori sayfasındaki ürün kartları: link, ad, fiyat, kart görseli"""
+    soup = BeautifulSoup(html, "html.parser")
+    product_cards = soup.select("div.o-productCard")
+    if not product_cards:
+        # Alternatif selector dene
+        product_cards = soup.select("a.o-productCard__link")
+
+    cards = []
+    for index, card in enumerate(product_cards):
+        link_elem = card.select_one("a.o-productCard__link") or card
+        product_link = link_elem.get("href", "")
+        if product_link and not product_link.startswith("http"):
+            product_link = urljoin(cat_url, product_link)
+
+        name_elem = card.select_one("strong.o-productCard__name")
+        product_name = name_elem.text.strip() if name_elem else f"Ürün {index+1}"
+
+        price_elem = card.select_one("span.o-productCard__priceContent--value")
+        price = price_elem.text.strip() + ",00 TL" if price_elem else "Fiyat bulunamadı"
+
+        # Ürün görseli
+        img_elem = card.select_one("img")
+        image_url = ""
+        if img_elem:
+            image_url = img_elem.get("src") or img_elem.get("data-src") or ""
+            if image_url and image_url.startswith("//"):
+                image_url = "https:" + image_url
+
+        cards.append({"link": product_link, "name": product_name, "price": price, "image_url": image_url})
+    return cards
+
+
+def parse_detail(html):
+    """Ürün detay sayfası: başlık, ürün kodu, görseller, açıklama ve içerik"""
+    detail_soup = BeautifulSoup(html, "html.parser")
+    detail = {"name": None, "product_code": None, "all_images": [], "description": "", "contents": []}
+
+    # Başlık
+    title_elem = detail_soup.select_one("h1.o-productDetail__title")
+    if title_elem:
+        detail["name"] = title_elem.text.strip()
+
+    # Ürün kodu
+    code_elem = detail_soup.find("span", string=lambda t: t and "Çiçek Sepeti Kodu:" in t if t else False)
+    if code_elem:
+        next_span = code_elem.find_next("span")
+        if next_span:
+            detail["product_code"] = next_span.text.strip()
+
+    # Görseller
+    for img in detail_soup.select("div.gallery-top img, div.swiper-slide img"):
+        src = img.get("src") or img.get("data-src") or ""
+        if src:
+            if src.startswith("//"):
+                src = "https:" + src
+            if "cdn.ciceksepeti.vip" in src or "ciceksepeti" in src:
+                detail["all_images"].append(src)
 
-for cat_idx, cat in enumerate(categories):
+    # Thumbnail'lardan büyük görseller
+    for thumb in detail_soup.select("div.gallery-thumbs div.swiper-slide"):
+        style = thumb.get("style", "")
+        if "background-image" in style:
+            try:
+                src = style.split('url("')[1].split('")')[0]
+                src = src.replace("/s/", "/l/")  # Büyük versiyon
+                if src.startswith("//"):
+                    src = "https:" + src
+                detail["all_images"].append(src)
+            except:
+                pass
+
+    # Açıklama
+    desc_elem = detail_soup.select_one("div.m-productContent__info")
+    if desc_elem:
+        detail["description"] = desc_elem.get_text(strip=True, separator="\n")
+        detail["contents"] = [li.get_text(strip=True) for li in desc_elem.select("ul li")]
+    return detail
+
+
+# ===== TARAMA =====
+async def crawl_product(crawler, card, position, total, previous=None, state=None, images=None):
+    """
+    Kartı detay sayfasıyla zenginleştir. Görseller indirme aşamasının
+    kuyruğuna atılır ve beklenmez; future'lar "_images" altında döner.
+    Önceki çalıştırmada görülen ürün için koşullu istek atılır; sayfa
+    değişmemişse önceki kayıt "_carried" işaretiyle olduğu gibi döner.
+    """
+    product_name = card["name"]
+    print(f"[{position}/{total}] {product_name} - {card['price']}")
+
+    all_images = []
+    description = ""
+    contents = []
+    product_code = "Bilinmiyor"
+
+    prev = (previous or {}).get(card["link"])
+    row = state.get_page(card["link"]) if state is not None and prev is not None else None
+    if card["link"]:
+        try:
+            detail_response = await crawler.fetch(card["link"], headers=conditional_headers(row) or None)
+            not_modified = detail_response.status_code == 304 and row is not None
+            if detail_response.status_code != 200 and not not_modified:
+                # Tekrarlar sonrası hâlâ 5xx veya 404: hata sayfası ürün verisi değildir,
+                # önceki kayıt varsa aşağıda olduğu gibi taşınır
+                raise RuntimeError(f"HTTP {detail_response.status_code}")
+            digest = None if not_modified else content_hash(detail_response.content)
+            if not_modified or (row is not None and digest == row["content_hash"]):
+                state.touch_page(card["link"])
+                state.count("pages_unchanged")
+                # Fiyat kategori kartından gelir; detay aynı olsa da değişmiş olabilir
+                return {**prev, "price": card["price"], "_carried": True, "_changed": prev.get("price") != card["price"]}
+            detail = parse_detail(detail_response.text)
+            product_name = detail["name"] or product_name
+            product_code = detail["product_code"] or product_code
+            all_images = detail["all_images"]
+            description = detail["description"]
+            contents = detail["contents"]
+            if state is not None and digest is not None:
+                state.record_page(card["link"], detail_response.headers, digest)
+                state.count("pages_changed" if prev is not None else "pages_new")
+        except Exception as e:
+            print(f"   Detay sayfası hatası: {e}")
+            if prev is not None:
+                return {**prev, "price": card["price"], "_carried": True, "_changed": prev.get("price") != card["price"]}
+
+    # Eğer detaydan görsel gelemediyse, kart görselini kullan
+    if not all_images and card["image_url"]:
+        all_images = [card["image_url"]]
+
+    # Tekrarları kaldır
+    all_images = list(dict.fromkeys(all_images))
+    image_futures = [images.submit(img_url) for img_url in all_images[:5]] if images is not None else []  # Max 5 görsel
+    return {
+        "product_code": product_code,
+        "name": product_name,
+        "price": card["price"],
+        "url": card["link"],
+        "all_images": all_images,
+        "contents": contents,
+        "description": description,
+        "_previous": prev,
+        "_images": image_futures,
+    }
+
+
+async def link_image(store, future, relative_path, number):
+    """İndirme aşamasının sonucunu bekleyip ürün yoluna bağla; başarılıysa yolu döndür"""
+    try:
+        store.link(relative_path, await future)
+        return relative_path
+    except Exception as e:
+        print(f"   Görsel {number} indirilemedi: {e}")
+        return None
+
+
+def product_record(product, cat_name):
+    return {
+        "product_code": product["product_code"],
+        "name": product["name"],
+        "price": product["price"],
+        "url": product["url"],
+        "category": cat_name,
+        "folder": os.path.join(cat_name, product["_folder"]) if product["local_images"] else "",
+        "local_images": product["local_images"],
+        "all_images": product["all_images"],
+        "contents": product["contents"],
+        "description": product["description"],
+    }
+
+
+async def crawl_category(crawler, cat, images, output_dir, state=None):
+    """Kategoriyi tara; (tüm ürünler, yeni/değişen ürünler) döndürür"""
     cat_url = cat["url"]
     cat_name = cat["name"]
-    cat_folder = os.path.join("images", cat_name)
-    if not os.path.exists(cat_folder):
-        os.makedirs(cat_folder)
+    json_file = os.path.join(output_dir, f"{cat_name.lower()}_urunler.json")
+    store = images.store
+    # Önceki kayıtlar --full ile de okunur: ürünler klasör adlarını korur
+    previous = load_previous(json_file)
 
-    print(f"\n=== {cat_idx+1}/{len(categories)} Kategori: {cat_name} ===")
+    print(f"\n=== Kategori: {cat_name} ===")
     print(f"URL: {cat_url}")
 
     try:
         # Kategori sayfasını çek
-        response = session.get(cat_url, timeout=30)
+        response = await crawler.fetch(cat_url)
         response.raise_for_status()
-        soup = BeautifulSoup(response.text, "html.parser")
-        
-        # Ürün kartlarını bul
-        product_cards = soup.select("div.o-productCard")
-        
-        if not product_cards:
-            # Alternatif selector dene
-            product_cards = soup.select("a.o-productCard__link")
-        
-        print(f"{len(product_cards)} ürün bulundu.")
-        products_data = []
-
-        for index, card in enumerate(product_cards):
-            try:
-                # Ürün bilgilerini çıkar
-                link_elem = card.select_one("a.o-productCard__link") or card
-                product_link = link_elem.get("href", "")
-                if product_link and not product_link.startswith("http"):
-                    product_link = urljoin(cat_url, product_link)
-                
-                name_elem = card.select_one("strong.o-productCard__name")
-                product_name = name_elem.text.strip() if name_elem else f"Ürün {index+1}"
-                
-                price_elem = card.select_one("span.o-productCard__priceContent--value")
-                price = price_elem.text.strip() + ",00 TL" if price_elem else "Fiyat bulunamadı"
-                
-                # Ürün görseli
-                img_elem = card.select_one("img")
-                image_url = ""
-                if img_elem:
-                    image_url = img_elem.get("src") or img_elem.get("data-src") or ""
-                    if image_url and image_url.startswith("//"):
-                        image_url = "https:" + image_url
-
-                print(f"[{index+1}/{len(product_cards)}] {product_name} - {price}")
-
-                # Ürün detay sayfasını çek (opsiyonel - daha fazla görsel için)
-                all_images = []
-                description = ""
-                contents = []
-                product_code = "Bilinmiyor"
-                
-                if product_link:
-                    try:
-                        time.sleep(random.uniform(1, 2))  # Rate limiting
-                        detail_response = session.get(product_link, timeout=30)
-                        detail_soup = BeautifulSoup(detail_response.text, "html.parser")
-                        
-                        # Başlık
-                        title_elem = detail_soup.select_one("h1.o-productDetail__title")
-                        if title_elem:
-                            product_name = title_elem.text.strip()
-                        
-                        # Ürün kodu
-                        code_elem = detail_soup.find("span", string=lambda t: t and "Çiçek Sepeti Kodu:" in t if t else False)
-                        if code_elem:
-                            next_span = code_elem.find_next("span")
-                            if next_span:
-                                product_code = next_span.text.strip()
-                        
-                        # Görseller
-                        for img in detail_soup.select("div.gallery-top img, div.swiper-slide img"):
-                            src = img.get("src") or img.get("data-src") or ""
-                            if src:
-                                if src.startswith("//"):
-                                    src = "https:" + src
-                                if "cdn.ciceksepeti.vip" in src or "ciceksepeti" in src:
-                                    all_images.append(src)
-                        
-                        # Thumbnail'lardan büyük görseller
-                        for thumb in detail_soup.select("div.gallery-thumbs div.swiper-slide"):
-                            style = thumb.get("style", "")
-                            if "background-image" in style:
-                                try:
-                                    src = style.split('url("')[1].split('")')[0]
-                                    src = src.replace("/s/", "/l/")  # Büyük versiyon
-                                    if src.startswith("//"):
-                                        src = "https:" + src
-                                    all_images.append(src)
-                                except:
-                                    pass
-                        
-                        # Açıklama
-                        desc_elem = detail_soup.select_one("div.m-productContent__info")
-                        if desc_elem:
-                            description = desc_elem.get_text(strip=True, separator="\n")
-                            contents = [li.get_text(strip=True) for li in desc_elem.select("ul li")]
-                        
-                    except Exception as e:
-                        print(f"   Detay sayfası hatası: {e}")
-                
-                # Eğer detaydan görsel gelemediyse, kart görselini kullan
-                if not all_images and image_url:
-                    all_images = [image_url]
-                
-                # Tekrarları kaldır
-                all_images = list(dict.fromkeys(all_images))
-                
-                # Klasör oluştur ve görselleri indir
-                downloaded_images = []
-                if all_images:
-                    base_folder = safe_name(product_name)
-                    product_folder_path, folder_name = get_unique_folder(cat_folder, base_folder)
-                    
-                    for i, img_url in enumerate(all_images[:5]):  # Max 5 görsel
-                        try:
-                            img_response = session.get(img_url, timeout=20)
-                            img_response.raise_for_status()
-                            filename = f"{i+1}.jpg"
-                            path = os.path.join(product_folder_path, filename)
-                            with open(path, "wb") as f:
-                                f.write(img_response.content)
-                            downloaded_images.append(os.path.join(cat_name, folder_name, filename))
-                            print(f"   Görsel {i+1} indirildi")
-                        except Exception as e:
-                            print(f"   Görsel {i+1} indirilemedi: {e}")
-                else:
-                    folder_name = safe_name(product_name)
-
-                product_data = {
-                    "product_code": product_code,
-                    "name": product_name,
-                    "price": price,
-                    "url": product_link,
-                    "category": cat_name,
-                    "folder": os.path.join(cat_name, folder_name) if downloaded_images else "",
-                    "local_images": downloaded_images,
-                    "all_images": all_images,
-                    "contents": contents,
-                    "description": description
-                }
-                
-                products_data.append(product_data)
-                all_products.append(product_data)
-
-            except Exception as e:
-                print(f"   Ürün hatası: {e}")
+        cards = parse_category(response.text, cat_url)
+        print(f"{len(cards)} ürün bulundu ({cat_name}).")
+
+        # 1) Detay sayfaları eşzamanlı; görseller bu sırada ayrı aşamada iner
+        details = await crawler.map(
+            lambda item: crawl_product(crawler, item[1], item[0] + 1, len(cards), previous, state, images),
+            list(enumerate(cards)),
+        )
+
+        # 2) Klasörler kart sırasıyla ayrılır ("Ad (2)" numaraları sıralı çalışmayla aynı).
+        #    Daha önce görülen ürün kendi klasörünü yeniden kullanır, kopya klasör açılmaz.
+        #    Klasörler artık yalnızca local_images yollarında yaşar (dosyalar blobs/ altında).
+        entries, jobs = [], []
+        folders = store.folders(cat_name)
+        for product in details:
+            if isinstance(product, Exception):
+                print(f"   Ürün hatası: {product}")
                 continue
+            if product.get("_carried"):
+                entries.append(product)
+                continue
+            product["local_images"] = []
+            if product["all_images"]:
+                folder_name = previous_folder_name(product["_previous"])
+                if folder_name:
+                    folders.add(folder_name)
+                else:
+                    folder_name = get_unique_folder_name(folders, safe_name(product["name"]))
+                product["_folder"] = folder_name
+                for i, future in enumerate(product["_images"]):
+                    filename = f"{i+1}.jpg"
+                    jobs.append((product, link_image(store, future, os.path.join(cat_name, folder_name, filename), i + 1)))
+            entries.append(product)
+
+        # 3) İndirme aşamasının sonuçları toplanır (iş sırasıyla)
+        downloaded = await asyncio.gather(*(job for _, job in jobs))
+        for (product, _), relative_path in zip(jobs, downloaded):
+            if relative_path is not None:
+                product["local_images"].append(relative_path)
+
+        products_data, changed = [], []
+        for product in entries:
+            if product.get("_carried"):
+                record = {key: value for key, value in product.items() if not key.startswith("_")}
+                if product["_changed"]:
+                    changed.append(record)
+            else:
+                record = product_record(product, cat_name)
+                changed.append(record)
+            products_data.append(record)
 
         # Kategori JSON'u kaydet
-        json_file = f"{cat_name.lower()}_urunler.json"
         with open(json_file, "w", encoding="utf-8") as f:
             json.dump(products_data, f, ensure_ascii=False, indent=2)
-        print(f"✅ {cat_name} tamamlandı! {len(products_data)} ürün kaydedildi.")
+        store.save()
+        if state is not None:
+            state.commit()
+            print(f"✅ {cat_name} tamamlandı! {len(products_data)} ürün kaydedildi ({len(changed)} yeni/değişen).")
+        else:
+            print(f"✅ {cat_name} tamamlandı! {len(products_data)} ürün kaydedildi.")
+        return products_data, changed
 
     except Exception as e:
+        # Kategori sayfası alınamadıysa önceki kayıtlar taşınır; boş liste
+        # dönmek kategoriyi tum_urunler.json'dan sessizce silerdi
         print(f"❌ Kategori hatası ({cat_name}): {e}")
+        if previous:
+            print(f"   ♻️  Önceki {len(previous)} ürün olduğu gibi taşındı.")
+        return list(previous.values()), []
+
+
+def rebase_url(url, base_url):
+    """Kategori URL'sini başka bir köke taşı (yerel test sunucusu için)"""
+    if not base_url:
+        return url
+    base = urlsplit(base_url)
+    parts = urlsplit(url)
+    return urlunsplit((base.scheme, base.netloc, parts.path, parts.query, parts.fragment))
+
+
+async def main(args):
+    output_dir = args.output_dir
+    images_dir = os.path.join(output_dir, "images")
+    # Ana images klasörü
+    os.makedirs(images_dir, exist_ok=True)
+
+    selected = [
+        {**cat, "url": rebase_url(cat["url"], args.base_url)}
+        for cat in categories
+        if not args.categories or cat["name"] in args.categories.split(",")
+    ]
+    # Artımlı tarama durumu; --full ile yok sayılır ve her şey baştan indirilir
+    state = None if args.full else CrawlState(args.state or os.path.join(output_dir, "crawl_state.sqlite3"))
+    # İçerik adresli görsel deposu (images/blobs + manifest.json)
+    store = ImageStore(images_dir, refresh=args.full)
+    # Sayfalar ve CDN ayrı host'lar; her biri kendi hız ve eşzamanlılık sınırıyla
+    page_policy = HostPolicy(rate=args.rate, burst=args.burst, concurrency=args.per_host)
+    image_policy = HostPolicy(rate=args.image_rate, burst=args.burst, concurrency=args.per_host * 2)
+    async with Crawler(
+        workers=args.workers,
+        policy=page_policy,
+        host_policies={"cdn.ciceksepeti.vip": image_policy},
+        headers=HEADERS,
+        retries=args.retries,
+    ) as crawler:
+        # Görsel indirme aşaması ayrıştırmayla eşzamanlı çalışır (aynı httpx bağlantı havuzu)
+        async with AsyncImagePipeline(store, crawler, state, workers=args.image_workers, retries=args.retries) as images:
+            results = await crawler.map(lambda cat: crawl_category(crawler, cat, images, output_dir, state), selected)
+        summary = crawler.summary()
+    store.save()
+    summary["images"] = store.summary()
+    summary["image_pipeline"] = images.summary()
+
+    # Tüm ürünleri tek dosyada kaydet (kategori sırasıyla)
+    results = [result for result in results if isinstance(result, tuple)]
+    all_products = [product for products, _ in results for product in products]
+    with open(os.path.join(output_dir, "tum_urunler.json"), "w", encoding="utf-8") as f:
+        json.dump(all_products, f, ensure_ascii=False, indent=2)
+    if state is not None:
+        # Yalnızca yeni/değişen ürünler (import için küçük fark dosyası)
+        changed = [product for _, products in results for product in products]
+        with open(os.path.join(output_dir, "degisiklikler.json"), "w", encoding="utf-8") as f:
+            json.dump(changed, f, ensure_ascii=False, indent=2)
+        summary["state"] = dict(state.stats)
+        state.close()
+
+    print(f"\n🎉 Tüm kategoriler tamamlandı!")
+    print(f"📦 Toplam {len(all_products)} ürün çekildi.")
+    print(f"🌐 {summary['requests']} istek, {summary['retries']} tekrar, {summary['errors']} hata, "
+          f"{summary['bytes'] / 1024 / 1024:.1f} MB, {summary['elapsed_seconds']} sn ({summary['requests_per_second']} istek/sn)")
+    if state is not None:
+        st = summary["state"]
+        print(f"♻️  Sayfa: {st['pages_new']} yeni, {st['pages_changed']} değişen, {st['pages_unchanged']} aynı")
+    im, ip = summary["images"], summary["image_pipeline"]
+    print(f"⬇️  İndirme aşaması: {ip['done']} görsel, {ip['failed']} hata, {ip['retries']} tekrar, "
+          f"{ip['bytes'] / 1024 / 1024:.1f} MB, {ip['bytes_per_second'] / 1024:.0f} KB/sn")
+    for failure in ip["failures"]:
+        print(f"   ❌ {failure['url']}: {failure['error']}")
+    print(f"🖼️  Görsel: {im['stored']} yeni blob ({im['bytes_stored'] / 1024 / 1024:.1f} MB), "
+          f"{im['url_deduped']} URL tekrarı, {im['content_deduped']} içerik tekrarı, {im['not_modified']} değişmemiş (304); "
+          f"depoda {im['blobs']} blob / {im['product_images']} ürün görseli")
+    print(f"📁 Görseller 'images/blobs' deposunda (images/manifest.json), ürünler JSON dosyalarında kaydedildi.")
+    return summary
+
 
-    time.sleep(random.uniform(3, 5))  # Kategoriler arası bekleme
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="ciceksepeti.vip kategori/ürün/görsel tarayıcısı (asenkron)")
+    parser.add_argument("--workers", type=int, default=16, help="Eşzamanlı iş sayısı")
+    parser.add_argument("--per-host", type=int, default=4, help="Host başına eşzamanlı istek")
+    parser.add_argument("--rate", type=float, default=4.0, help="Sayfa host'u için saniyedeki istek (token bucket)")
+    parser.add_argument("--image-rate", type=float, default=10.0, help="Görsel CDN'i için saniyedeki istek")
+    parser.add_argument("--image-workers", type=int, default=8, help="Görsel indirme aşamasının worker sayısı")
+    parser.add_argument("--burst", type=int, default=4, help="Token bucket kapasitesi")
+    parser.add_argument("--retries", type=int, default=3, help="429/5xx/bağlantı hatasında yeniden deneme")
+    parser.add_argument("--categories", default="", help="Virgülle ayrılmış kategori adları (varsayılan: hepsi)")
+    parser.add_argument("--base-url", default="", help="Kategori URL'lerinin kökünü değiştir (ör. yerel test sunucusu)")
+    parser.add_argument("--output-dir", default=".", help="JSON dosyaları ve images/ klasörünün yazılacağı yer")
+    parser.add_argument("--state", default="", help="Tarama durumu SQLite dosyası (varsayılan: <output-dir>/crawl_state.sqlite3)")
+    parser.add_argument("--full", action="store_true", help="Durumu yok say, tüm sayfa ve görselleri yeniden indir")
+    return parser.parse_args(argv)
 
-# Tüm ürünleri tek dosyada kaydet
-with open("tum_urunler.json", "w", encoding="utf-8") as f:
-    json.dump(all_products, f, ensure_ascii=False, indent=2)
 
-print(f"\n🎉 Tüm kategoriler tamamlandı!")
-print(f"📦 Toplam {len(all_products)} ürün çekildi.")
-print(f"📁 Ürünler 'images' klasöründe ve JSON dosyalarında kaydedildi.")
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
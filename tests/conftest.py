@@ -0,0 +1,146 @@
+"""
+Testler backend/ ve depo kökündeki modülleri düz adla import eder (server,
+search_index, crawl_state, ...). server import edilirken MONGO_URL/DB_NAME
+okunur; Motor bağlantıyı ilk sorguda açtığından testlerde gerçek Mongo
+gerekmez, veri gereken testler mongomock_motor ile server.db'yi değiştirir.
+"""
+import os
+import sys
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+for path in (ROOT_DIR, ROOT_DIR / "backend"):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "test_database")
+
+
+import hashlib
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+import pytest
+
+
+FIXTURES_DIR = Path(__file__).resolve().parent / "fixtures"
+CDN = "https://cdn.ciceksepeti.vip/"
+# Kaydedilmiş ciceksepeti.vip sayfaları: yol -> tests/fixtures/ciceksepeti dosyası
+CICEKSEPETI_PAGES = {
+    "/cicek/gul/": "kategori_gul.html",
+    "/cicek-sepeti/7-kirmizi-gul-buketi/": "7-kirmizi-gul-buketi.html",
+    "/cicek-sepeti/fanusta-kirmizi-gul-ve-kokina-cicegi/": "fanusta-kirmizi-gul-ve-kokina-cicegi.html",
+    "/cicek-sepeti/kutuda-11-beyaz-gul/": "kutuda-11-beyaz-gul.html",
+}
+
+
+class FixtureServer:
+    """
+    Kaydedilmiş sayfaları yerel HTTP sunucusundan verir. Sayfalardaki CDN
+    adresleri sunucunun /cdn.ciceksepeti.vip/ yoluna çevrilir; görsel
+    gövdeleri yola göre sabittir. ETag/If-None-Match (304) desteklenir.
+
+        fail: yol -> kalan 503 sayısı (Retry-After: 0)
+        requests: (yol, durum) listesi, geliş sırasıyla
+    """
+
+    def __init__(self):
+        self.fail = {}
+        self.requests = []
+        self.lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self.httpd.daemon_threads = True
+        self.base_url = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+        self.pages = {
+            path: (FIXTURES_DIR / "ciceksepeti" / name).read_text(encoding="utf-8")
+            for path, name in CICEKSEPETI_PAGES.items()
+        }
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def local(self, url: str) -> str:
+        return url.replace(CDN, f"{self.base_url}/cdn.ciceksepeti.vip/")
+
+    def body(self, path: str):
+        if path in self.pages:
+            return self.local(self.pages[path]).encode("utf-8"), "text/html; charset=utf-8"
+        if path.startswith("/cdn.ciceksepeti.vip/"):
+            return hashlib.sha256(path.encode("utf-8")).digest() * 256, "image/jpeg"
+        return None, None
+
+    def statuses(self, path: str) -> list:
+        return [status for requested, status in self.requests if requested == path]
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                path = urlsplit(self.path).path
+                with server.lock:
+                    fail = server.fail.get(path, 0) > 0
+                    if fail:
+                        server.fail[path] -= 1
+                body, content_type = server.body(path)
+                etag = '"' + hashlib.sha1(body).hexdigest() + '"' if body is not None else None
+                if fail:
+                    status = 503
+                elif body is None:
+                    status = 404
+                elif self.headers.get("If-None-Match") == etag:
+                    status = 304
+                else:
+                    status = 200
+                with server.lock:
+                    server.requests.append((path, status))
+                self.send_response(status)
+                if status == 503:
+                    self.send_header("Retry-After", "0")
+                if status in (200, 304):
+                    self.send_header("ETag", etag)
+                if status == 200:
+                    self.send_header("Content-Type", content_type)
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                    return
+                if status != 304:
+                    self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+@pytest.fixture
+def ciceksepeti_server():
+    server = FixtureServer()
+    yield server
+    server.close()
+
+
+@pytest.fixture
+def api(monkeypatch):
+    """
+    mongomock_motor üzerinde server.app için TestClient. Startup çalışmaz
+    (index, change stream, HTTP client yok); süreç içi önbellekler sıfırlanır.
+    """
+    from fastapi.testclient import TestClient
+    from mongomock_motor import AsyncMongoMockClient
+
+    import server
+
+    monkeypatch.setattr(server, "db", AsyncMongoMockClient()["test_database"])
+    monkeypatch.setattr(server, "collection_versions", {})
+    for cache in (server.product_totals, server.first_page_cache, server.product_facets_cache):
+        cache.invalidate()
+    for cache in server.reference_caches.values():
+        monkeypatch.setattr(cache, "loaded", False)
+    return TestClient(server.app)
@@ -0,0 +1,83 @@
+import asyncio
+
+import server
+
+
+def item(name, price, url=None):
+    return server.ImportProductItem(name=name, price=price, url=url or f"https://x/{name}")
+
+
+def import_batch(items, category="Gül"):
+    report = server.new_import_report()
+    asyncio.run(server.write_import_batch(items, category, report))
+    return report
+
+
+def stored_stats():
+    stats = asyncio.run(server.db.catalog_stats.find_one({"_id": server.CATALOG_STATS_ID})) or {}
+    return server.flatten_stats(stats)
+
+
+def recount():
+    return server.flatten_stats(asyncio.run(server.compute_catalog_stats()))
+
+
+def counters(flat):
+    return {field: value for field, value in flat.items() if value and not field.startswith("price_m")}
+
+
+def test_incremental_stats_match_recount_after_insert_update_and_delete(api):
+    import_batch([item("buket", "450,00 TL"), item("kutu", "1.250,00 TL"), item("sepet", "2.100,00 TL")])
+    assert counters(stored_stats()) == counters(recount())
+    assert stored_stats()["total"] == 3
+
+    # Fiyat değişen ürün histogramda kova değiştirir; yeni ürün eklenir
+    report = import_batch([item("buket", "800,00 TL"), item("orkide", "300,00 TL")])
+    assert (report["inserted"], report["updated"]) == (1, 1)
+    assert counters(stored_stats()) == counters(recount())
+    assert stored_stats()["total"] == 4
+    assert stored_stats()["price_histogram.750-999"] == 1
+
+    api.delete("/api/products/clear")
+    assert counters(stored_stats()) == counters(recount()) == {}
+
+
+def test_concurrent_imports_of_the_same_products_do_not_drift(api, monkeypatch):
+    import_batch([item(f"urun{i}", "500,00 TL") for i in range(6)])
+    collection = type(server.db.products)
+    bulk_write = collection.bulk_write
+
+    async def slow_bulk_write(self, *args, **kwargs):
+        await asyncio.sleep(0.01)  # gerçek Mongo gecikmesi: diğer batch araya girebilir
+        return await bulk_write(self, *args, **kwargs)
+
+    monkeypatch.setattr(collection, "bulk_write", slow_bulk_write)
+    monkeypatch.setattr(server, "catalog_stats_lock", asyncio.Lock())
+
+    async def run():
+        await asyncio.gather(*(
+            server.write_import_batch([item(f"urun{i}", price) for i in range(6)], "Gül", server.new_import_report())
+            for price in ("1.600,00 TL", "2.500,00 TL", "3.500,00 TL")
+        ))
+
+    asyncio.run(run())
+
+    assert counters(stored_stats()) == counters(recount())
+    assert stored_stats()["total"] == 6
+
+
+def test_reconcile_repairs_drifted_counter(api):
+    import_batch([item("buket", "450,00 TL"), item("kutu", "1.250,00 TL")])
+    asyncio.run(server.db.catalog_stats.update_one(
+        {"_id": server.CATALOG_STATS_ID}, {"$inc": {"total": 5, "categories.gul.count": -1}},
+    ))
+
+    dry = api.post("/api/admin/catalog-stats/reconcile", params={"dry_run": True}).json()
+    assert dry["drift"]["total"] == {"stored": 7, "actual": 2}
+    assert dry["fixed"] is False and stored_stats()["total"] == 7
+
+    fixed = api.post("/api/admin/catalog-stats/reconcile").json()
+    assert fixed["fixed"] is True and fixed["drift_fields"] == 2
+    assert counters(stored_stats()) == counters(recount())
+    assert api.get("/api/import/stats").json()["total_products"] == 2
+    assert api.post("/api/admin/catalog-stats/reconcile").json()["drift"] == {}
@@ -0,0 +1,88 @@
+import asyncio
+import re
+
+import server
+
+
+PRODUCT = {"title": "Kırmızı Gül Buketi", "price": 1249, "category": "gul", "image": "https://cdn.example/gul.jpg"}
+
+
+def test_product_listing_sends_validators_and_cache_control(api):
+    response = api.get("/api/products", params={"per_page": 4})
+
+    assert response.status_code == 200
+    assert re.fullmatch(r'W/"[0-9a-f]{20}"', response.headers["etag"])
+    assert response.headers["last-modified"].endswith("GMT")
+    assert response.headers["cache-control"] == "public, max-age=30, stale-while-revalidate=120"
+
+
+def test_matching_if_none_match_returns_304_without_body(api):
+    etag = api.get("/api/products", params={"per_page": 4}).headers["etag"]
+
+    response = api.get("/api/products", params={"per_page": 4}, headers={"If-None-Match": etag})
+
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == etag
+    # Liste içinde ve zayıf önekle gelen etiket de eşleşir
+    listed = api.get("/api/products", params={"per_page": 4}, headers={"If-None-Match": f'"x", W/{etag.removeprefix("W/")}'})
+    assert listed.status_code == 304
+
+
+def test_etag_depends_on_path_and_query(api):
+    first = api.get("/api/products", params={"per_page": 4}).headers["etag"]
+
+    assert api.get("/api/products", params={"per_page": 5}).headers["etag"] != first
+    response = api.get("/api/products", params={"per_page": 5}, headers={"If-None-Match": first})
+    assert response.status_code == 200
+
+
+def test_write_changes_the_etag(api):
+    etag = api.get("/api/products").headers["etag"]
+
+    assert api.post("/api/products", json=PRODUCT).status_code == 200
+
+    response = api.get("/api/products", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+    assert [p["title"] for p in response.json()["products"]] == ["Kırmızı Gül Buketi"]
+
+
+def test_if_modified_since(api):
+    last_modified = api.get("/api/products").headers["last-modified"]
+
+    assert api.get("/api/products", headers={"If-Modified-Since": last_modified}).status_code == 304
+    assert api.get("/api/products", headers={"If-Modified-Since": "Mon, 01 Jan 2001 00:00:00 GMT"}).status_code == 200
+    assert api.get("/api/products", headers={"If-Modified-Since": "yesterday"}).status_code == 200
+
+
+def test_reference_data_etag_follows_content(api):
+    asyncio.run(server.db.categories.insert_one({"id": "c1", "name": "Gül", "slug": "gul"}))
+    asyncio.run(server.categories_cache.reload())  # startup'ta yüklenir
+    response = api.get("/api/categories")
+    etag = response.headers["etag"]
+    assert response.json()[0]["slug"] == "gul"
+    assert response.headers["cache-control"] == "public, max-age=300, stale-while-revalidate=86400"
+    assert api.get("/api/categories", headers={"If-None-Match": etag}).status_code == 304
+
+    asyncio.run(server.db.categories.insert_one({"id": "c2", "name": "Orkide", "slug": "orkide"}))
+    asyncio.run(server.categories_cache.reload())
+
+    response = api.get("/api/categories", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert [c["slug"] for c in response.json()] == ["gul", "orkide"]
+
+
+def test_unlisted_paths_and_non_get_are_not_conditional(api):
+    response = api.get("/api/")
+    assert "etag" not in response.headers
+
+    response = api.post("/api/products", json=PRODUCT)
+    assert "etag" not in response.headers
+
+
+def test_search_total_header_is_exposed_to_browsers(api):
+    response = api.get("/api/search", params={"q": "gül"}, headers={"Origin": "https://cicekci.example"})
+
+    assert response.headers["x-total-count"] == "0"
+    assert "X-Total-Count" in response.headers["access-control-expose-headers"]
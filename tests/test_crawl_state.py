@@ -0,0 +1,156 @@
+import asyncio
+import json
+import sqlite3
+
+import scraper_v2
+from crawl_state import CrawlState, conditional_headers, load_previous, previous_folder_name
+
+
+BUKET = "/cicek-sepeti/7-kirmizi-gul-buketi/"
+FANUS = "/cicek-sepeti/fanusta-kirmizi-gul-ve-kokina-cicegi/"
+KUTU = "/cicek-sepeti/kutuda-11-beyaz-gul/"
+
+
+def crawl(server, output_dir, *extra):
+    args = scraper_v2.parse_args([
+        "--categories", "Gul", "--base-url", server.base_url, "--output-dir", str(output_dir),
+        "--rate", "1000", "--image-rate", "1000", "--burst", "50", "--retries", "2", *extra,
+    ])
+    return asyncio.run(scraper_v2.main(args))
+
+
+def products_by_path(server, output_dir):
+    products = json.loads((output_dir / "gul_urunler.json").read_text(encoding="utf-8"))
+    return {product["url"][len(server.base_url):]: product for product in products}
+
+
+def changed_paths(server, output_dir):
+    changed = json.loads((output_dir / "degisiklikler.json").read_text(encoding="utf-8"))
+    return [product["url"][len(server.base_url):] for product in changed]
+
+
+def page_row(output_dir, url):
+    state = CrawlState(str(output_dir / "crawl_state.sqlite3"))
+    try:
+        return state.get_page(url)
+    finally:
+        state.close()
+
+
+def test_conditional_headers():
+    assert conditional_headers(None) == {}
+    assert conditional_headers({"etag": None, "last_modified": None}) == {}
+    assert conditional_headers({"etag": '"abc"', "last_modified": "Wed, 01 May 2024 10:00:00 GMT"}) == {
+        "If-None-Match": '"abc"',
+        "If-Modified-Since": "Wed, 01 May 2024 10:00:00 GMT",
+    }
+
+
+def test_state_persists_validators(tmp_path):
+    state = CrawlState(str(tmp_path / "state.sqlite3"))
+    state.record_page("https://x/a", {"etag": '"v1"', "last-modified": "yesterday"}, "digest-1")
+    state.close()
+
+    reopened = CrawlState(str(tmp_path / "state.sqlite3"))
+    row = reopened.get_page("https://x/a")
+    assert (row["etag"], row["last_modified"], row["content_hash"]) == ('"v1"', "yesterday", "digest-1")
+    assert reopened.get_page("https://x/b") is None
+    reopened.close()
+
+
+def test_load_previous_and_folder_names(tmp_path):
+    path = tmp_path / "gul_urunler.json"
+    assert load_previous(str(path)) == {}
+    path.write_text("{bozuk", encoding="utf-8")
+    assert load_previous(str(path)) == {}
+    path.write_text(json.dumps([{"url": "https://x/a", "folder": "Gul\\Kırmızı Gül"}, {"url": ""}]), encoding="utf-8")
+    previous = load_previous(str(path))
+
+    assert list(previous) == ["https://x/a"]
+    assert previous_folder_name(previous["https://x/a"]) == "Kırmızı Gül"
+    assert previous_folder_name({"folder": "Gul/Beyaz Gül/"}) == "Beyaz Gül"
+    assert previous_folder_name({"folder": ""}) is None
+
+
+def test_only_changed_detail_page_is_reparsed(ciceksepeti_server, tmp_path):
+    crawl(ciceksepeti_server, tmp_path)
+    first = products_by_path(ciceksepeti_server, tmp_path)
+    ciceksepeti_server.pages[BUKET] = ciceksepeti_server.pages[BUKET].replace("Okaliptus", "Cipso")
+
+    summary = crawl(ciceksepeti_server, tmp_path)
+
+    second = products_by_path(ciceksepeti_server, tmp_path)
+    assert summary["state"] == {"pages_new": 0, "pages_changed": 1, "pages_unchanged": 2}
+    assert changed_paths(ciceksepeti_server, tmp_path) == [BUKET]
+    assert "Cipso ve Yeşillikler" in second[BUKET]["contents"]
+    # Klasör yeniden kullanılır, "Ad (2)" kopyası açılmaz
+    assert second[BUKET]["folder"] == first[BUKET]["folder"]
+    assert second[FANUS] == first[FANUS] and second[KUTU] == first[KUTU]
+
+
+def test_price_change_on_category_card_is_carried_with_new_price(ciceksepeti_server, tmp_path):
+    crawl(ciceksepeti_server, tmp_path)
+    ciceksepeti_server.pages["/cicek/gul/"] = ciceksepeti_server.pages["/cicek/gul/"].replace(">1.899<", ">1.999<")
+
+    summary = crawl(ciceksepeti_server, tmp_path)
+
+    assert summary["state"]["pages_unchanged"] == 3
+    assert ciceksepeti_server.statuses(KUTU)[-1] == 304
+    assert products_by_path(ciceksepeti_server, tmp_path)[KUTU]["price"] == "1.999,00 TL"
+    assert changed_paths(ciceksepeti_server, tmp_path) == [KUTU]
+
+
+def test_same_content_without_validators_is_carried_by_digest(ciceksepeti_server, tmp_path):
+    crawl(ciceksepeti_server, tmp_path)
+    with sqlite3.connect(tmp_path / "crawl_state.sqlite3") as db:
+        db.execute("UPDATE pages SET etag = NULL, last_modified = NULL")
+
+    summary = crawl(ciceksepeti_server, tmp_path)
+
+    assert ciceksepeti_server.statuses(FANUS) == [200, 200]
+    assert summary["state"]["pages_unchanged"] == 3
+    assert changed_paths(ciceksepeti_server, tmp_path) == []
+
+
+def test_failed_detail_page_carries_previous_record_and_keeps_validators(ciceksepeti_server, tmp_path):
+    crawl(ciceksepeti_server, tmp_path)
+    first = products_by_path(ciceksepeti_server, tmp_path)
+    validators = page_row(tmp_path, ciceksepeti_server.base_url + FANUS)
+    ciceksepeti_server.fail[FANUS] = 3           # tekrarlar dahil hep 503
+    del ciceksepeti_server.pages[KUTU]           # 404
+
+    crawl(ciceksepeti_server, tmp_path)
+
+    assert ciceksepeti_server.statuses(FANUS)[-3:] == [503, 503, 503]
+    assert ciceksepeti_server.statuses(KUTU)[-1] == 404
+    second = products_by_path(ciceksepeti_server, tmp_path)
+    assert second[FANUS] == first[FANUS]
+    assert second[KUTU] == first[KUTU]
+    assert changed_paths(ciceksepeti_server, tmp_path) == []
+    row = page_row(tmp_path, ciceksepeti_server.base_url + FANUS)
+    assert (row["etag"], row["content_hash"]) == (validators["etag"], validators["content_hash"])
+
+    # Sayfa geri gelince kayıtlı ETag ile 304 alınır
+    crawl(ciceksepeti_server, tmp_path)
+    assert ciceksepeti_server.statuses(FANUS)[-1] == 304
+
+
+def test_failed_category_page_carries_previous_products(ciceksepeti_server, tmp_path):
+    crawl(ciceksepeti_server, tmp_path)
+    first = json.loads((tmp_path / "tum_urunler.json").read_text(encoding="utf-8"))
+    ciceksepeti_server.fail["/cicek/gul/"] = 3   # tekrarlar dahil hep 503
+
+    crawl(ciceksepeti_server, tmp_path)
+
+    assert ciceksepeti_server.statuses("/cicek/gul/")[-3:] == [503, 503, 503]
+    assert json.loads((tmp_path / "tum_urunler.json").read_text(encoding="utf-8")) == first
+    assert len(first) == 3 and len(products_by_path(ciceksepeti_server, tmp_path)) == 3
+    assert changed_paths(ciceksepeti_server, tmp_path) == []
+
+
+def test_full_crawl_ignores_state(ciceksepeti_server, tmp_path):
+    crawl(ciceksepeti_server, tmp_path, "--full")
+
+    assert not (tmp_path / "crawl_state.sqlite3").exists()
+    assert not (tmp_path / "degisiklikler.json").exists()
+    assert len(products_by_path(ciceksepeti_server, tmp_path)) == 3
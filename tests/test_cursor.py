@@ -0,0 +1,110 @@
+import asyncio
+import base64
+import json
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi import HTTPException
+
+import server
+
+
+CREATED = datetime(2024, 5, 1, 12, 30, 15, 123000, tzinfo=timezone.utc)
+PRODUCT = {"id": "p-42", "created_at": CREATED, "price": 750, "is_bestseller": True}
+
+
+@pytest.mark.parametrize("sort", list(server.PRODUCT_SORTS))
+def test_cursor_round_trip(sort):
+    cursor = server.encode_cursor(PRODUCT, sort)
+
+    assert "=" not in cursor
+    assert server.decode_cursor(cursor, sort) == {name: PRODUCT[name] for name, _ in server.PRODUCT_SORTS[sort]}
+
+
+def test_cursor_keeps_datetime_type_at_millisecond_precision():
+    product = {**PRODUCT, "created_at": CREATED.replace(tzinfo=None) + timedelta(microseconds=456)}
+
+    after = server.decode_cursor(server.encode_cursor(product))
+
+    assert after["created_at"] == CREATED
+    assert after["created_at"].tzinfo is not None
+
+
+def legacy(data: dict) -> str:
+    return base64.urlsafe_b64encode(json.dumps(data).encode()).decode().rstrip("=")
+
+
+def test_legacy_created_at_cursors_still_decode():
+    millis = round(CREATED.timestamp() * 1000)
+
+    assert server.decode_cursor(legacy({"d": millis, "i": "p-42"})) == {"created_at": CREATED, "id": "p-42"}
+    assert server.decode_cursor(legacy({"c": "2024-05-01T12:30:15", "i": "p-42"})) == {
+        "created_at": "2024-05-01T12:30:15", "id": "p-42",
+    }
+
+
+@pytest.mark.parametrize("cursor", [
+    "not-a-cursor",
+    legacy({"s": "price_asc", "k": [750]}),            # anahtar eksik
+    legacy({"s": "unknown", "k": [1, "p-42"]}),         # bilinmeyen sıralama
+    legacy({"i": "p-42"}),
+])
+def test_invalid_cursor_is_rejected(cursor):
+    with pytest.raises(HTTPException) as error:
+        server.decode_cursor(cursor, "price_asc")
+    assert error.value.status_code == 400
+
+
+def test_cursor_from_another_sort_is_rejected():
+    with pytest.raises(HTTPException) as error:
+        server.decode_cursor(server.encode_cursor(PRODUCT, "price_desc"), "price_asc")
+    assert error.value.status_code == 400
+    assert "sıralama" in error.value.detail
+
+
+def test_keyset_query_continues_after_the_cursor():
+    sort = server.PRODUCT_SORTS["bestseller"]
+    after = {"is_bestseller": True, "created_at": CREATED, "id": "p-42"}
+
+    assert server.keyset_query({"category": "gul"}, after, sort) == {"$and": [
+        {"category": "gul"},
+        {"$or": [
+            {"is_bestseller": {"$lt": True}},
+            {"is_bestseller": True, "created_at": {"$gt": CREATED}},
+            {"is_bestseller": True, "created_at": CREATED, "id": {"$gt": "p-42"}},
+        ]},
+    ]}
+
+
+def listing_order(products, sort):
+    """Beklenen sıra: anahtarlar sondan başa kararlı sıralama"""
+    ordered = list(products)
+    for name, direction in reversed(server.PRODUCT_SORTS[sort]):
+        ordered.sort(key=lambda product: product[name], reverse=direction == -1)
+    return [product["id"] for product in ordered]
+
+
+@pytest.mark.parametrize("sort", list(server.PRODUCT_SORTS))
+def test_cursor_pages_walk_the_listing_without_gaps(api, sort):
+    # Fiyat ve tarih tekrarlanır: eşitlikte id sırası devreye girmeli
+    products = [
+        {
+            "id": f"p-{i:02d}", "title": f"Ürün {i}", "category": "gul", "image": "", "badge": "",
+            "price": 100 * (i % 4), "is_bestseller": i % 5 == 0, "created_at": CREATED + timedelta(minutes=i // 3),
+        }
+        for i in range(11)
+    ]
+    asyncio.run(server.db.products.insert_many([dict(product) for product in products]))
+
+    seen, cursor = [], None
+    while True:
+        params = {"per_page": 4, "sort": sort, "fields": "title"}
+        if cursor:
+            params["cursor"] = cursor
+        body = api.get("/api/products", params=params).json()
+        seen.extend(product["id"] for product in body["products"])
+        cursor = body["next_cursor"]
+        if cursor is None or len(seen) > len(products):
+            break
+
+    assert seen == listing_order(products, sort)
@@ -0,0 +1,80 @@
+import asyncio
+from collections import Counter
+from datetime import datetime, timezone
+
+import server
+
+
+# (kategori, fiyat, rozet, çok satan)
+CATALOG = [
+    ("gul", 180, "Yeni", True),
+    ("gul", 450, "İndirim", False),
+    ("gul", 450, "Yeni", False),
+    ("gul", 1200, "Çok Satan", True),
+    ("orkide", 899, "Yeni", False),
+    ("orkide", 2400, "İndirim", True),
+    ("kokina", 320, "Yeni", False),
+    ("kokina", 5600, "Çok Satan", False),
+]
+
+
+def seed(api):
+    products = [
+        {"id": f"p-{n}", "title": f"Ürün {n}", "category": category, "price": price, "badge": badge,
+         "is_bestseller": bestseller, "created_at": datetime(2024, 5, 1, tzinfo=timezone.utc)}
+        for n, (category, price, badge, bestseller) in enumerate(CATALOG)
+    ]
+    asyncio.run(server.db.products.insert_many(products))
+    # Filtresiz facet'ler catalog_stats'tan okunur; sayımı yeniden kur
+    assert api.post("/api/admin/catalog-stats/reconcile").json()["fixed"] is True
+
+
+def expected(rows):
+    """Beklenen facet'ler, API ile aynı sırada"""
+    order = {server.price_bucket(edge): n for n, edge in enumerate(server.PRICE_HISTOGRAM_EDGES)}
+    count = lambda values, key: sorted(
+        ({"value": value, "count": n} for value, n in Counter(values).items()), key=key)
+    by_count = lambda f: (-f["count"], str(f["value"]))
+    return {
+        "categories": count((row[0] for row in rows), by_count),
+        "price": count((server.price_bucket(row[1]) for row in rows), lambda f: order[f["value"]]),
+        "badges": count((row[2] for row in rows), by_count),
+    }
+
+
+def facets(api, **params):
+    response = api.get("/api/products", params={"facets": True, **params})
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_unfiltered_facets_count_the_whole_catalog(api):
+    seed(api)
+
+    result = facets(api)
+
+    assert result["total"] == len(CATALOG)
+    assert result["facets"] == expected(CATALOG)
+
+
+def test_filtered_facets_drop_only_their_own_dimension(api):
+    seed(api)
+
+    result = facets(api, category="gul", min_price=300)
+
+    assert result["total"] == 3
+    # Kategori facet'i kategori filtresi hariç, fiyat facet'i fiyat filtresi hariç sayılır
+    assert result["facets"]["categories"] == expected([row for row in CATALOG if row[1] >= 300])["categories"]
+    assert result["facets"]["price"] == expected([row for row in CATALOG if row[0] == "gul"])["price"]
+    assert result["facets"]["badges"] == expected([row for row in CATALOG if row[0] == "gul" and row[1] >= 300])["badges"]
+
+
+def test_common_filter_applies_to_every_facet(api):
+    seed(api)
+    bestsellers = [row for row in CATALOG if row[3]]
+
+    result = facets(api, bestseller=True, badge="Çok Satan,İndirim")
+
+    assert result["total"] == 2
+    assert result["facets"]["categories"] == expected([row for row in bestsellers if row[2] != "Yeni"])["categories"]
+    assert result["facets"]["badges"] == expected(bestsellers)["badges"]
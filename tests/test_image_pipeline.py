@@ -0,0 +1,71 @@
+import asyncio
+
+import httpx
+import pytest
+
+from crawler import BodyInterrupted, Crawler, HostPolicy
+from image_pipeline import AsyncImagePipeline
+from image_store import ImageStore
+
+
+URL = "https://cdn.example/gul.jpg"
+
+
+class CutBody(httpx.AsyncByteStream):
+    async def __aiter__(self):
+        yield b"yarim"
+        raise httpx.ReadError("bağlantı koptu")
+
+
+def run_pipeline(store, handler, retries=3):
+    calls = []
+
+    def counting(request):
+        calls.append(request.url)
+        return handler(len(calls))
+
+    async def run():
+        transport = httpx.MockTransport(counting)
+        async with Crawler(policy=HostPolicy(rate=0), retries=retries, backoff=0, transport=transport) as crawler:
+            async with AsyncImagePipeline(store, crawler, workers=2, retries=retries, backoff=0) as images:
+                future = images.submit(URL)
+            return future, images.summary(), crawler.stats
+    future, summary, stats = asyncio.run(run())
+    return future, summary, stats, calls
+
+
+def test_unreachable_host_is_tried_once_per_crawler_attempt(tmp_path):
+    def handler(call):
+        raise httpx.ConnectError("bağlantı reddedildi")
+
+    future, summary, stats, calls = run_pipeline(ImageStore(str(tmp_path)), handler, retries=3)
+
+    assert len(calls) == 4 == stats["requests"]
+    assert isinstance(future.exception(), httpx.ConnectError)
+    assert not isinstance(future.exception(), BodyInterrupted)
+    assert (summary["retries"], summary["failed"]) == (0, 1)
+
+
+def test_mid_body_failure_is_retried_by_the_pipeline(tmp_path):
+    def handler(call):
+        if call == 1:
+            return httpx.Response(200, headers={"content-type": "image/jpeg"}, stream=CutBody())
+        return httpx.Response(200, headers={"content-type": "image/jpeg"}, content=b"tam-gorsel")
+
+    store = ImageStore(str(tmp_path))
+    future, summary, stats, calls = run_pipeline(store, handler)
+
+    assert len(calls) == 2
+    assert store.blobs[future.result()]["size"] == len(b"tam-gorsel")
+    assert (summary["retries"], summary["done"], store.stats["failed"]) == (1, 1, 1)
+
+
+def test_mid_body_failures_stop_after_pipeline_retries(tmp_path):
+    def handler(call):
+        return httpx.Response(200, stream=CutBody())
+
+    future, summary, stats, calls = run_pipeline(ImageStore(str(tmp_path)), handler, retries=2)
+
+    assert len(calls) == 3
+    with pytest.raises(BodyInterrupted):
+        future.result()
@@ -0,0 +1,156 @@
+import asyncio
+import json
+import os
+
+import httpx
+import pytest
+
+from crawl_state import CrawlState
+from crawler import Crawler, HostPolicy
+from image_store import BlobWriter, ImageStore, import_tree
+
+
+GORSEL = "/cdn.ciceksepeti.vip/uploads/urun/gul-1.jpg"
+DIGER = "/cdn.ciceksepeti.vip/uploads/urun/gul-2.jpg"
+
+
+def fetch_all(store, urls, state=None):
+    async def run():
+        async with Crawler(policy=HostPolicy(rate=1000, burst=50), retries=0) as crawler:
+            return await asyncio.gather(*(store.fetch(crawler, url, state) for url in urls))
+    return asyncio.run(run())
+
+
+def part_files(store):
+    return [name for _, _, names in os.walk(store.blob_root) for name in names if name.startswith(".part-")]
+
+
+def test_identical_files_share_one_blob(tmp_path):
+    store = ImageStore(str(tmp_path / "images"))
+    for name in ("a.jpg", "b.jpg"):
+        (tmp_path / name).write_bytes(b"ayni-icerik" * 100)
+
+    first = store.ingest_file(str(tmp_path / "a.jpg"), "https://cdn/a.jpg")
+    second = store.ingest_file(str(tmp_path / "b.jpg"), "https://cdn/b.jpg")
+    store.link("Gul\\Kırmızı Gül\\1.jpg", first)
+    store.link("Gul/Beyaz Gül/1.jpg", second)
+
+    assert first == second
+    summary = store.summary()
+    assert (summary["blobs"], summary["stored"], summary["content_deduped"]) == (1, 1, 1)
+    assert summary["blob_bytes"] == 1100 and summary["bytes_read"] == 2200
+    assert store.urls == {"https://cdn/a.jpg": first, "https://cdn/b.jpg": first}
+    blob = os.path.join(store.root, store.blobs[first]["path"])
+    assert store.blobs[first]["path"] == f"blobs/{first[:2]}/{first}.jpg"
+    assert store.resolve("Gul/Kırmızı Gül/1.jpg") == blob
+    assert store.resolve("/Gul\\Beyaz Gül\\1.jpg") == blob
+    assert store.folders("Gul") == {"Kırmızı Gül", "Beyaz Gül"}
+    assert part_files(store) == []
+
+
+def test_manifest_survives_reopen_and_legacy_paths_resolve(tmp_path):
+    root = tmp_path / "images"
+    store = ImageStore(str(root))
+    (tmp_path / "a.png").write_bytes(b"png")
+    store.link("Gul/Urun/1.png", store.ingest_file(str(tmp_path / "a.png")))
+    store.save()
+
+    reopened = ImageStore(str(root))
+    assert reopened.products == store.products and reopened.blobs == store.blobs
+    assert reopened.resolve("Gul/Urun/1.png").endswith(".png")
+
+    legacy = root / "Gul" / "Eski" / "1.jpg"
+    legacy.parent.mkdir(parents=True)
+    legacy.write_bytes(b"eski")
+    assert reopened.resolve("Gul\\Eski\\1.jpg") == str(legacy)
+    assert reopened.resolve("Gul/Yok/1.jpg") is None
+
+
+def test_aborted_writer_leaves_no_partial_file(tmp_path):
+    store = ImageStore(str(tmp_path))
+    writer = BlobWriter(store)
+    writer.write(b"yarim")
+    writer.abort()
+
+    assert part_files(store) == [] and store.blobs == {}
+    assert (store.stats["failed"], store.stats["bytes_read"]) == (1, 5)
+
+
+def test_same_url_is_downloaded_once(ciceksepeti_server, tmp_path):
+    store = ImageStore(str(tmp_path / "images"))
+    url, other = ciceksepeti_server.base_url + GORSEL, ciceksepeti_server.base_url + DIGER
+
+    digests = fetch_all(store, [url, url, other, url])
+    fetch_all(store, [url])
+
+    assert ciceksepeti_server.statuses(GORSEL) == [200]
+    assert digests[0] == digests[1] == digests[3] != digests[2]
+    summary = store.summary()
+    assert (summary["blobs"], summary["urls"], summary["stored"], summary["url_deduped"]) == (2, 2, 2, 3)
+    assert store.blobs[digests[0]]["content_type"] == "image/jpeg"
+
+
+def test_known_url_without_state_skips_network_after_reopen(ciceksepeti_server, tmp_path):
+    url = ciceksepeti_server.base_url + GORSEL
+    store = ImageStore(str(tmp_path / "images"))
+    digest = fetch_all(store, [url])[0]
+    store.save()
+
+    reopened = ImageStore(str(tmp_path / "images"))
+    assert fetch_all(reopened, [url]) == [digest]
+    assert ciceksepeti_server.statuses(GORSEL) == [200]
+    assert reopened.stats["url_deduped"] == 1
+
+    refreshed = ImageStore(str(tmp_path / "images"), refresh=True)
+    assert fetch_all(refreshed, [url]) == [digest]
+    assert ciceksepeti_server.statuses(GORSEL) == [200, 200]
+    assert (refreshed.stats["content_deduped"], refreshed.stats["stored"]) == (1, 0)
+
+
+def test_known_url_with_state_is_revalidated(ciceksepeti_server, tmp_path):
+    url = ciceksepeti_server.base_url + GORSEL
+    state = CrawlState(str(tmp_path / "crawl_state.sqlite3"))
+    store = ImageStore(str(tmp_path / "images"))
+    digest = fetch_all(store, [url], state)[0]
+    store.save()
+    assert state.get_image(url)["etag"]
+
+    reopened = ImageStore(str(tmp_path / "images"))
+    assert fetch_all(reopened, [url], state) == [digest]
+    state.close()
+
+    assert ciceksepeti_server.statuses(GORSEL) == [200, 304]
+    assert (reopened.stats["not_modified"], reopened.stats["bytes_read"]) == (1, 0)
+
+
+def test_failed_download_stores_nothing(ciceksepeti_server, tmp_path):
+    store = ImageStore(str(tmp_path / "images"))
+
+    with pytest.raises(httpx.HTTPStatusError):
+        fetch_all(store, [ciceksepeti_server.base_url + "/yok.jpg"])
+
+    assert store.summary()["blobs"] == 0 and store.urls == {}
+    assert part_files(store) == []
+
+
+def test_import_tree_dedups_and_maps_urls(tmp_path):
+    tree = tmp_path / "eski"
+    for folder, name, body in (("Kırmızı Gül", "1.jpg", b"gul"), ("Kırmızı Gül", "2.jpg", b"yaprak"), ("Beyaz Gül", "1.jpg", b"gul")):
+        (tree / "Gul" / folder).mkdir(parents=True, exist_ok=True)
+        (tree / "Gul" / folder / name).write_bytes(body)
+    (tree / "README.txt").write_text("kategori/urun/dosya dışı", encoding="utf-8")
+    json_dir = tmp_path / "json"
+    json_dir.mkdir()
+    (json_dir / "gul_urunler.json").write_text(json.dumps([{
+        "local_images": ["Gul\\Kırmızı Gül\\1.jpg", "Gul\\Kırmızı Gül\\2.jpg"],
+        "all_images": ["https://cdn/1.jpg", "https://cdn/2.jpg"],
+    }]), encoding="utf-8")
+    store = ImageStore(str(tmp_path / "images"))
+
+    result = import_tree(store, str(tree), str(json_dir), delete=True)
+
+    assert (result["files"], result["blobs"], result["content_deduped"], result["product_images"]) == (3, 2, 1, 3)
+    assert store.products["Gul/Kırmızı Gül/1.jpg"] == store.products["Gul/Beyaz Gül/1.jpg"]
+    assert store.urls == {"https://cdn/1.jpg": store.products["Gul/Kırmızı Gül/1.jpg"], "https://cdn/2.jpg": store.products["Gul/Kırmızı Gül/2.jpg"]}
+    assert not (tree / "Gul" / "Beyaz Gül" / "1.jpg").exists() and (tree / "README.txt").exists()
+    assert ImageStore(str(tmp_path / "images")).products == store.products
@@ -0,0 +1,63 @@
+import asyncio
+import json
+
+import server
+
+
+def catalog():
+    products = [
+        {"name": f"Kırmızı Gül {i}", "price": "450,00 TL", "url": f"https://x/gul/{i}", "all_images": [f"https://cdn/{i}.jpg"]}
+        for i in range(5)
+    ]
+    # URL'siz ürünler ürün koduyla eşleşir
+    products += [{"name": f"Beyaz Gül {i}", "price": "600,00 TL", "product_code": f"KOD-{i}"} for i in range(3)]
+    return products
+
+
+def stored_products():
+    return asyncio.run(server.db.products.find({}, {"_id": 0}).to_list(None))
+
+
+def test_importing_the_same_products_twice_is_idempotent(api):
+    payload = {"products": catalog(), "category_name": "Gul"}
+
+    first = api.post("/api/import/products", params={"batch_size": 3}, json=payload).json()
+    before = {product["source_url"] or product["product_code"]: product for product in stored_products()}
+    second = api.post("/api/import/products", params={"batch_size": 3}, json=payload).json()
+    after = {product["source_url"] or product["product_code"]: product for product in stored_products()}
+
+    assert (first["inserted"], first["updated"]) == (8, 0)
+    assert (second["inserted"], second["updated"], second["skipped"]) == (0, 8, 0)
+    assert len(stored_products()) == len(after) == 8
+    # id, rozet, çok satan ve oluşturulma zamanı yalnızca ilk eklemede atanır
+    for key, product in before.items():
+        for field in ("id", "badge", "is_bestseller", "created_at"):
+            assert after[key][field] == product[field], (key, field)
+    assert api.get("/api/import/stats").json()["total_products"] == 8
+
+
+def test_json_file_reimport_updates_in_place(api):
+    products = catalog()
+    upload = lambda: api.post("/api/import/json-file", files={
+        "file": ("gul_urunler.json", json.dumps(products, ensure_ascii=False).encode(), "application/json"),
+    }).json()
+
+    upload()
+    ids = {product["source_url"] or product["product_code"]: product["id"] for product in stored_products()}
+    products[0]["price"] = "550,00 TL"
+    result = upload()
+
+    assert (result["inserted"], result["updated"]) == (0, 8)
+    stored = {product["source_url"] or product["product_code"]: product for product in stored_products()}
+    assert {key: product["id"] for key, product in stored.items()} == ids
+    assert stored["https://x/gul/0"]["price"] == 550
+
+
+def test_same_url_in_another_category_is_a_separate_product(api):
+    product = catalog()[:1]
+
+    api.post("/api/import/products", json={"products": product, "category_name": "Gul"})
+    api.post("/api/import/products", json={"products": product, "category_name": "Kokina"})
+    api.post("/api/import/products", json={"products": product, "category_name": "Gul"})
+
+    assert sorted(p["category"] for p in stored_products()) == ["gul", "kokina"]
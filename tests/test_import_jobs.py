@@ -0,0 +1,115 @@
+import asyncio
+import json
+from collections import OrderedDict
+
+import pytest
+
+import server
+
+
+def products(count, prefix="Gül"):
+    return [{"name": f"{prefix} {i}", "price": "500,00 TL", "url": f"https://x/{prefix}/{i}"} for i in range(count)]
+
+
+@pytest.fixture
+def jobs(api, monkeypatch):
+    """Worker'sız kuyruk: işler run_queued() ile sırayla çalıştırılır"""
+    monkeypatch.setattr(server, "import_queue", asyncio.Queue())
+    monkeypatch.setattr(server, "import_jobs", OrderedDict())
+    monkeypatch.setattr(server, "IMPORT_QUEUE_SIZE", 2)
+    return api
+
+
+def run_queued():
+    while not server.import_queue.empty():
+        asyncio.run(server.import_queue.get_nowait().execute())
+
+
+def spool_of(job_id):
+    """Yükleme işinin geçici dosyası (bytes_read = spool.tell)"""
+    return server.import_jobs[job_id].bytes_read.__self__
+
+
+def submit(api, count=5, prefix="Gül"):
+    return api.post("/api/import/products", params={"background": True, "batch_size": 2},
+                    json={"products": products(count, prefix), "category_name": prefix})
+
+
+def test_job_reports_progress_per_batch(jobs, monkeypatch):
+    seen = []
+    on_batch = server.ImportJob.on_batch
+
+    async def recording(self, report):
+        seen.append(self.to_dict()["progress"])
+        await on_batch(self, report)
+
+    monkeypatch.setattr(server.ImportJob, "on_batch", recording)
+    queued = submit(jobs)
+    assert queued.status_code == 202
+    assert (queued.json()["status"], queued.json()["progress"]) == ("queued", 0.0)
+
+    run_queued()
+
+    job = jobs.get(f"/api/import/jobs/{queued.json()['job_id']}").json()
+    assert seen == [0.4, 0.8, 1.0]
+    assert (job["status"], job["processed"], job["total"], job["progress"]) == ("completed", 5, 5, 1.0)
+    assert (job["inserted"], job["batch_count"], job["eta_seconds"]) == (5, 3, None)
+
+
+def test_failed_job_keeps_error_and_written_batches(jobs):
+    body = json.dumps(products(3)).encode()[:-20]
+
+    queued = jobs.post("/api/import/json-file", params={"background": True, "batch_size": 2},
+                       files={"file": ("gul_urunler.json", body, "application/json")}).json()
+    spool = spool_of(queued["job_id"])
+    run_queued()
+
+    job = jobs.get(f"/api/import/jobs/{queued['job_id']}").json()
+    assert job["status"] == "failed" and job["error"]
+    assert job["imported"] == 2
+    assert spool.closed
+    assert jobs.delete(f"/api/import/jobs/{queued['job_id']}").status_code == 409
+
+
+def test_cancelled_queued_job_frees_its_slot(jobs):
+    first = submit(jobs, prefix="Gul").json()
+    second = jobs.post("/api/import/json-file", params={"background": True},
+                       files={"file": ("kokina_urunler.json", json.dumps(products(2, "Kokina")).encode(), "application/json")}).json()
+    spool = spool_of(second["job_id"])
+    assert submit(jobs, prefix="Orkide").status_code == 503
+
+    cancelled = jobs.delete(f"/api/import/jobs/{second['job_id']}").json()
+    assert cancelled["status"] == "cancelled"
+    # Geçici dosya iptal anında kapanır, worker'ı beklemez
+    assert spool.closed
+    third = submit(jobs, prefix="Orkide")
+    assert third.status_code == 202
+    assert jobs.get("/api/import/jobs").json()["queued"] == 2
+    assert submit(jobs, prefix="Lale").status_code == 503
+
+    run_queued()
+
+    statuses = {job["job_id"]: (job["status"], job["imported"]) for job in jobs.get("/api/import/jobs").json()["jobs"]}
+    assert statuses == {
+        first["job_id"]: ("completed", 5),
+        second["job_id"]: ("cancelled", 0),
+        third.json()["job_id"]: ("completed", 5),
+    }
+    assert asyncio.run(server.db.products.count_documents({"category": "kokina"})) == 0
+
+
+def test_running_job_stops_after_current_batch(jobs, monkeypatch):
+    on_batch = server.ImportJob.on_batch
+
+    async def cancel_after_first(self, report):
+        if len(report["batches"]) == 1:
+            assert jobs.delete(f"/api/import/jobs/{self.id}").json()["status"] == "running"
+        await on_batch(self, report)
+
+    monkeypatch.setattr(server.ImportJob, "on_batch", cancel_after_first)
+    queued = submit(jobs).json()
+    run_queued()
+
+    job = jobs.get(f"/api/import/jobs/{queued['job_id']}").json()
+    assert (job["status"], job["imported"], job["batch_count"]) == ("cancelled", 2, 1)
+    assert asyncio.run(server.db.products.count_documents({})) == 2
@@ -0,0 +1,127 @@
+import gzip
+import io
+import json
+import zipfile
+
+import pytest
+
+from json_stream import JSONItemDecoder
+
+
+ITEMS = [
+    {"name": "Gül \"Buketi\"", "price": "450,00 TL", "description": "7 adet\\kırmızı gül\nçift \\\"kat\\\""},
+    {"name": "Kokina 🌹 ♥", "price": "1.250,00 TL", "contents": ["[", "]", "{", "}", ","]},
+    {"name": "Orkide", "price": "899,00 TL", "all_images": []},
+]
+
+
+def decode(chunks):
+    decoder = JSONItemDecoder()
+    items = [item for chunk in chunks for item in decoder.feed(chunk)]
+    decoder.close()
+    return items
+
+
+def test_array_split_at_every_byte_boundary():
+    data = json.dumps(ITEMS, ensure_ascii=False, indent=1).encode("utf-8")
+
+    for cut in range(1, len(data)):
+        assert decode([data[:cut], data[cut:]]) == ITEMS, cut
+
+
+def test_byte_by_byte_feed_with_bom_and_ndjson():
+    array = b"\xef\xbb\xbf" + json.dumps(ITEMS, ensure_ascii=False).encode("utf-8")
+    ndjson = "\r\n".join(json.dumps(item, ensure_ascii=False) for item in ITEMS).encode("utf-8") + b"\n"
+
+    for data in (array, ndjson):
+        assert decode(data[i:i + 1] for i in range(len(data))) == ITEMS
+
+
+def test_multibyte_character_split_across_chunks():
+    data = json.dumps([{"name": "🌹Gül"}], ensure_ascii=False).encode("utf-8")
+    rose = data.index("🌹".encode("utf-8"))
+    decoder = JSONItemDecoder()
+
+    assert decoder.feed(data[:rose + 2]) == []
+    assert decoder.feed(data[rose + 2:rose + 5]) == []
+    assert decoder.feed(data[rose + 5:]) == [{"name": "🌹Gül"}]
+    decoder.close()
+    assert decoder.items_decoded == 1
+
+
+@pytest.mark.parametrize("data", [
+    b'[{"name": "Gul"}, {"name": "Kok',
+    b'[{"name": "Gul"}, {"name": "Kokina\\',
+    b'[{"name": "Gul"}, {"name": "G\xc3',
+    b'[{"name": "Gul"}, {"name"',
+])
+def test_truncated_input_fails_on_close(data):
+    decoder = JSONItemDecoder()
+
+    assert decoder.feed(data) == [{"name": "Gul"}]
+    with pytest.raises(ValueError):
+        decoder.close()
+
+
+def test_oversized_pending_object_is_rejected():
+    decoder = JSONItemDecoder()
+    decoder.MAX_PENDING_CHARS = 64
+
+    with pytest.raises(ValueError):
+        decoder.feed(b'[{"name": "' + b"x" * 100)
+
+
+def products(count, prefix):
+    return [{"name": f"{prefix} {i}", "price": "500,00 TL", "url": f"https://x/{prefix}/{i}"} for i in range(count)]
+
+
+def test_gzip_upload_is_streamed_in_batches(api):
+    body = gzip.compress(json.dumps(products(5, "Gül"), ensure_ascii=False).encode("utf-8"))
+
+    response = api.post("/api/import/json-file", params={"batch_size": 2},
+                        files={"file": ("gul_urunler.json.gz", body, "application/gzip")})
+
+    assert response.status_code == 200
+    result = response.json()
+    assert (result["imported"], result["inserted"], result["category"]) == (5, 5, "gul")
+    assert [batch["size"] for batch in result["batches"]] == [2, 2, 1]
+
+
+def test_zip_upload_imports_every_json_member(api):
+    archive = io.BytesIO()
+    with zipfile.ZipFile(archive, "w") as zf:
+        zf.writestr("json/kokina_urunler.json", json.dumps(products(3, "Kokina")))
+        zf.writestr("json/orkide_urunler.ndjson", "\n".join(json.dumps(p) for p in products(2, "Orkide")))
+        zf.writestr("json/papatya_urunler.json.gz", gzip.compress(json.dumps(products(4, "Papatya")).encode()))
+        zf.writestr("__MACOSX/json/._kokina_urunler.json", b"\x00\x05")
+        zf.writestr("json/notlar.txt", "içe aktarılmaz")
+
+    response = api.post("/api/import/json-file", files={"file": ("katalog.zip", archive.getvalue(), "application/zip")})
+
+    assert response.status_code == 200
+    result = response.json()
+    assert result["imported"] == 9
+    assert [(f["filename"], f["category"], f["imported"]) for f in result["files"]] == [
+        ("json/kokina_urunler.json", "kokina", 3),
+        ("json/orkide_urunler.ndjson", "orkide", 2),
+        ("json/papatya_urunler.json.gz", "papatya", 4),
+    ]
+
+
+def test_truncated_upload_returns_400_after_importing_complete_items(api):
+    body = json.dumps(products(3, "Gül")).encode()[:-20]
+
+    response = api.post("/api/import/json-file", params={"batch_size": 2},
+                        files={"file": ("gul_urunler.json", body, "application/json")})
+
+    assert response.status_code == 400
+    assert "2 ürün içe aktarıldı" in response.json()["detail"]
+
+
+def test_corrupt_gzip_upload_returns_400(api):
+    body = gzip.compress(json.dumps(products(3, "Gül")).encode())
+    body = body[:20] + bytes(b ^ 0xFF for b in body[20:40]) + body[40:]
+
+    response = api.post("/api/import/json-file", files={"file": ("gul_urunler.json.gz", body, "application/gzip")})
+
+    assert response.status_code == 400
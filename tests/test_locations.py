@@ -0,0 +1,137 @@
+import asyncio
+
+import httpx
+import pytest
+
+import server
+
+
+PHOTON_FEATURE = {
+    "properties": {"name": "Kadıköy", "city": "İstanbul", "country": "Türkiye", "osm_value": "suburb"},
+}
+
+
+@pytest.fixture
+def upstream(monkeypatch):
+    """Photon yerine sayaçlı sahte upstream; her çağrı uçuşta kısa süre bekler"""
+    calls = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request.url.params["q"])
+        await asyncio.sleep(0.05)
+        return httpx.Response(200, json={"features": [PHOTON_FEATURE]})
+
+    monkeypatch.setattr(server, "location_cache", server.TTLCache(ttl=60, maxsize=100))
+    monkeypatch.setattr(server, "location_inflight", {})
+    monkeypatch.setattr(server, "location_upstream", {"photon": 0, "nominatim": 0, "coalesced": 0})
+    monkeypatch.setattr(server, "gazetteer", None)
+    monkeypatch.setattr(server, "http_client", httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+    return calls
+
+
+def test_concurrent_identical_queries_share_one_upstream_call(upstream):
+    async def run():
+        return await asyncio.gather(*(server.search_locations(q) for q in ["Kadıköy", "kadıköy", "  Kadıköy "] * 4))
+
+    results = asyncio.run(run())
+
+    assert len(upstream) == 1
+    assert server.location_upstream["coalesced"] == 11
+    assert all(result == results[0] for result in results)
+    assert results[0]["engine"] == "photon"
+    assert results[0]["results"][0]["display_name"] == "Kadıköy, İstanbul, Türkiye"
+
+
+def test_upstream_receives_original_query(upstream):
+    asyncio.run(server.search_locations("Kadıköy Moda"))
+
+    assert upstream == ["Kadıköy Moda"]
+
+
+def test_repeated_queries_are_served_from_cache(upstream):
+    async def run():
+        for q in ["Moda", "moda", "MODA ", "Bebek", "bebek", "moda"]:
+            await server.search_locations(q)
+
+    asyncio.run(run())
+
+    assert upstream == ["Moda", "Bebek"]
+    stats = server.location_cache.stats()
+    assert (stats["hits"], stats["misses"]) == (4, 2)
+    assert stats["hit_ratio"] == pytest.approx(4 / 6, abs=1e-4)
+
+
+def test_empty_upstream_result_is_not_cached(monkeypatch, upstream):
+    async def empty(request: httpx.Request) -> httpx.Response:
+        upstream.append(request.url.params["q"])
+        return httpx.Response(503)
+
+    monkeypatch.setattr(server, "http_client", httpx.AsyncClient(transport=httpx.MockTransport(empty)))
+
+    async def run():
+        return [await server.search_locations("Moda") for _ in range(2)]
+
+    results = asyncio.run(run())
+
+    assert [result["engine"] for result in results] == ["none", "none"]
+    assert len(upstream) == 4  # her iki istekte Photon + Nominatim
+
+
+@pytest.fixture
+def local_gazetteer(monkeypatch):
+    gazetteer = server.Gazetteer()
+    for row in [("İstanbul",), ("İstanbul", "Kadıköy"), ("Ankara",), ("Ankara", "Çankaya"), ("Kocaeli", "Kartepe")]:
+        gazetteer.add(*row)
+    gazetteer._keys.sort()
+    monkeypatch.setattr(server, "gazetteer", gazetteer)
+    return gazetteer
+
+
+def test_complete_gazetteer_match_skips_upstream(upstream, local_gazetteer):
+    for q in ["Kadıköy", "kadikoy", "Çankaya Ankara"]:
+        result = asyncio.run(server.search_locations(q))
+        assert result["engine"] == "gazetteer"
+    assert upstream == []
+
+
+def test_gazetteer_prefix_match_is_merged_with_upstream(upstream, local_gazetteer):
+    result = asyncio.run(server.search_locations("Ka"))
+
+    assert upstream == ["Ka"]
+    assert result["engine"] == "gazetteer+photon"
+    names = [item["display_name"] for item in result["results"]]
+    # Photon'un "Kadıköy, İstanbul" sonucu sözlükteki ilçe kaydıyla aynı yer
+    assert names == ["Kadıköy/İstanbul, Türkiye", "Kartepe/Kocaeli, Türkiye"]
+
+
+def test_merge_dedups_on_place_not_display_string():
+    local = [{"display_name": "Moda, Kadıköy/İstanbul, Türkiye", "name": "Moda", "district": "Kadıköy", "city": "İstanbul", "type": "neighbourhood"}]
+    upstream = {"engine": "nominatim", "results": [
+        {"display_name": "Moda, Kadıköy, İstanbul, Türkiye", "name": "Moda", "district": "KADIKÖY", "city": "istanbul", "type": "suburb"},
+        {"display_name": "Moda, Türkiye", "name": "Moda", "district": "", "city": "", "type": "cafe"},
+    ]}
+
+    result = server.merge_location_results(local, upstream)
+
+    assert [item["display_name"] for item in result["results"]] == ["Moda, Kadıköy/İstanbul, Türkiye", "Moda, Türkiye"]
+
+
+def test_no_gazetteer_match_falls_through_to_upstream(upstream, local_gazetteer):
+    result = asyncio.run(server.search_locations("Moda"))
+
+    assert upstream == ["Moda"]
+    assert result["engine"] == "photon"
+
+
+def test_shipped_gazetteer_covers_every_district(upstream, monkeypatch):
+    gazetteer = server.Gazetteer()
+    gazetteer.load(server.ROOT_DIR / "data" / "gazetteer_tr.tsv")
+    monkeypatch.setattr(server, "gazetteer", gazetteer)
+    kinds = [record[3] for record in gazetteer._records]
+    assert (kinds.count("province"), kinds.count("district")) == (81, 973)
+
+    for q in ["Bodrum", "Ürgüp", "hopa", "Merkezefendi Denizli", "Onikişubat"]:
+        result = asyncio.run(server.search_locations(q))
+        assert result["engine"] == "gazetteer", q
+    assert upstream == []
+    assert result["results"][0]["display_name"] == "Onikişubat/Kahramanmaraş, Türkiye"
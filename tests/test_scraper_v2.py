@@ -0,0 +1,134 @@
+import asyncio
+import json
+import os
+from pathlib import Path
+
+import scraper_v2
+from image_store import ImageStore
+
+
+PAGES_DIR = Path(__file__).resolve().parent / "fixtures" / "ciceksepeti"
+
+
+BUKET = "/cicek-sepeti/7-kirmizi-gul-buketi/"
+FANUS = "/cicek-sepeti/fanusta-kirmizi-gul-ve-kokina-cicegi/"
+KUTU = "/cicek-sepeti/kutuda-11-beyaz-gul/"
+
+
+def fixture_html(name: str) -> str:
+    return (PAGES_DIR / name).read_text(encoding="utf-8")
+
+
+def crawl(server, output_dir, *extra):
+    args = scraper_v2.parse_args([
+        "--categories", "Gul", "--base-url", server.base_url, "--output-dir", str(output_dir),
+        "--rate", "1000", "--image-rate", "1000", "--burst", "50", "--retries", "2", *extra,
+    ])
+    return asyncio.run(scraper_v2.main(args))
+
+
+def read_json(path):
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def test_parse_category_page():
+    cards = scraper_v2.parse_category(fixture_html("kategori_gul.html"), "https://www.ciceksepeti.vip/cicek/gul/")
+
+    assert cards == [
+        {
+            "link": "https://www.ciceksepeti.vip/cicek-sepeti/7-kirmizi-gul-buketi/",
+            "name": "7 Kırmızı Gül Buketi",
+            "price": "1.249,00 TL",
+            "image_url": "https://cdn.ciceksepeti.vip/cicek-resim/m/kcm10520.jpg",
+        },
+        {
+            "link": "https://www.ciceksepeti.vip/cicek-sepeti/fanusta-kirmizi-gul-ve-kokina-cicegi/",
+            "name": "Fanusta Kırmızı Gül ve Kokina Çiçeği",
+            "price": "Fiyat bulunamadı",
+            "image_url": "https://cdn.ciceksepeti.vip/cicek-resim/m/cs557.jpg",
+        },
+        {
+            "link": "https://www.ciceksepeti.vip/cicek-sepeti/kutuda-11-beyaz-gul/",
+            "name": "Kutuda 11 Beyaz Gül",
+            "price": "1.899,00 TL",
+            "image_url": "https://cdn.ciceksepeti.vip/cicek-resim/m/kcm20311.jpg",
+        },
+    ]
+
+
+def test_parse_detail_page():
+    detail = scraper_v2.parse_detail(fixture_html("7-kirmizi-gul-buketi.html"))
+
+    assert detail["name"] == "7 Kırmızı Gül Buketi"
+    assert detail["product_code"] == "kcm10520"
+    # Galeri ve thumbnail'lar (/s/ -> /l/) aynı iki görsele çıkar
+    assert list(dict.fromkeys(detail["all_images"])) == [
+        "https://cdn.ciceksepeti.vip/cicek-resim/l/kcm10520.jpg",
+        "https://cdn.ciceksepeti.vip/cicek-resim/l/kcm10520-1.jpg",
+    ]
+    assert detail["contents"] == ["7 Adet Kırmızı Gül", "Okaliptus ve Yeşillikler", "Özel Buket Ambalajı"]
+    assert detail["description"].split("\n") == [
+        "Sevdiklerinize duygularınızı en güzel şekilde anlatan 7 kırmızı gülden oluşan buket.",
+        "Ürünün İçeriği",
+        "7 Adet Kırmızı Gül",
+        "Okaliptus ve Yeşillikler",
+        "Özel Buket Ambalajı",
+        "Not: Güllerin renk tonları mevsime göre değişkenlik gösterebilir.",
+    ]
+
+
+def test_crawl_writes_parsed_products_and_images(ciceksepeti_server, tmp_path):
+    summary = crawl(ciceksepeti_server, tmp_path)
+
+    products = read_json(tmp_path / "gul_urunler.json")
+    assert read_json(tmp_path / "tum_urunler.json") == products
+    assert [(p["name"], p["product_code"], p["price"]) for p in products] == [
+        ("7 Kırmızı Gül Buketi", "kcm10520", "1.249,00 TL"),
+        ("Fanusta Kırmızı Gül ve Kokina Çiçeği", "cs557", "Fiyat bulunamadı"),
+        ("Kutuda 11 Beyaz Gül", "kcm20311", "1.899,00 TL"),
+    ]
+    base = ciceksepeti_server.base_url
+    assert products[0]["url"] == base + BUKET
+    assert products[0]["all_images"] == [
+        f"{base}/cdn.ciceksepeti.vip/cicek-resim/l/kcm10520.jpg",
+        f"{base}/cdn.ciceksepeti.vip/cicek-resim/l/kcm10520-1.jpg",
+    ]
+    assert products[1]["contents"] == ["10 Adet Kokina", "5 Adet Kırmızı Gül", "Cam Fanus Vazo"]
+    assert products[2]["contents"] == []
+    assert [len(p["local_images"]) for p in products] == [2, 2, 1]
+    assert products[0]["folder"] == os.path.join("Gul", "7 Kırmızı Gül Buketi")
+
+    store = ImageStore(str(tmp_path / "images"))
+    for product in products:
+        for relative in product["local_images"]:
+            assert store.resolve(relative) is not None
+    assert summary["state"] == {**summary["state"], "pages_new": 3, "pages_changed": 0, "pages_unchanged": 0}
+    assert summary["image_pipeline"]["done"] == 5
+
+
+def test_crawl_retries_503(ciceksepeti_server, tmp_path):
+    ciceksepeti_server.fail = {"/cicek/gul/": 1, FANUS: 2}
+
+    summary = crawl(ciceksepeti_server, tmp_path)
+
+    assert ciceksepeti_server.statuses("/cicek/gul/") == [503, 200]
+    assert ciceksepeti_server.statuses(FANUS) == [503, 503, 200]
+    assert summary["retries"] == 3
+    products = read_json(tmp_path / "gul_urunler.json")
+    assert [p["product_code"] for p in products] == ["kcm10520", "cs557", "kcm20311"]
+
+
+def test_recrawl_uses_conditional_requests(ciceksepeti_server, tmp_path):
+    crawl(ciceksepeti_server, tmp_path)
+    first = read_json(tmp_path / "gul_urunler.json")
+    ciceksepeti_server.requests.clear()
+
+    summary = crawl(ciceksepeti_server, tmp_path)
+
+    # Detay sayfaları If-None-Match ile istenir ve 304 döner; görseller yeniden inmez
+    for path in (BUKET, FANUS, KUTU):
+        assert ciceksepeti_server.statuses(path) == [304]
+    assert not [path for path, _ in ciceksepeti_server.requests if path.startswith("/cdn.ciceksepeti.vip/")]
+    assert summary["state"]["pages_unchanged"] == 3
+    assert read_json(tmp_path / "gul_urunler.json") == first
+    assert read_json(tmp_path / "degisiklikler.json") == []
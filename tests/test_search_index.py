@@ -0,0 +1,270 @@
+import pytest
+
+from search_index import SearchIndex, SuggestIndex, fold_turkish, tokenize
+
+
+def product(product_id, title, description="", category="", bestseller=False):
+    return {"id": product_id, "title": title, "description": description, "category": category, "is_bestseller": bestseller}
+
+
+@pytest.fixture
+def index():
+    index = SearchIndex()
+    index.add_many([
+        product("buket", "Kırmızı Gül Buketi", "7 adet kırmızı gül", "gul"),
+        product("kutu", "Kutuda Beyaz Güller", "Şık kutuda 11 beyaz gül", "beyaz-gul"),
+        product("orkide", "Mor Orkide", "İki dallı orkide, yanında gül yaprakları", "orkide"),
+        product("papatya", "Papatya Buketi", "Mevsim papatyaları", "papatya-gerbera"),
+        product("sepet", "Sepette Renkli Güller ve Papatyalar", "Uzun bir açıklama: " + "çiçek " * 40, "gul"),
+    ])
+    return index
+
+
+def test_turkish_folding():
+    assert fold_turkish("İSTANBUL Çiçekçi") == "istanbul cicekci"
+    assert fold_turkish("ığüşöç IĞÜŞÖÇ") == "igusoc igusoc"
+    assert tokenize("ORKİDE, gül-buketi (7'li)") == ["orkide", "gul", "buketi", "7", "li"]
+
+
+def test_title_match_outranks_description_only_match(index):
+    total, ids = index.search("gül")
+
+    assert total == 4  # "güller" ayrı terimdir, ama son kelime önek olarak genişler
+    assert ids[0] == "buket"
+    assert ids.index("orkide") > ids.index("buket")
+
+
+def test_shorter_document_wins_for_same_term_frequency():
+    index = SearchIndex()
+    index.add_many([
+        product("uzun", "Orkide", "çok uzun bir açıklama " * 20),
+        product("kisa", "Orkide", "kısa"),
+    ])
+
+    assert index.search("orkide")[1] == ["kisa", "uzun"]
+
+
+def test_all_words_must_match(index):
+    assert index.search("beyaz kutuda")[1] == ["kutu"]
+    assert index.search("beyaz orkide") == (0, [])
+    assert index.search("lilyum") == (0, [])
+    assert index.search("   ") == (0, [])
+
+
+def test_last_word_is_expanded_as_prefix(index):
+    assert index.search("gul buk")[1] == ["buket"]
+    assert set(index.search("papat")[1]) == {"papatya", "sepet"}
+
+
+def test_exact_term_outranks_prefix_expansion():
+    index = SearchIndex()
+    index.add_many([product("guller", "Güller"), product("gul", "Gül")])
+
+    assert index.search("gul")[1] == ["gul", "guller"]
+
+
+def test_rare_expansion_does_not_outrank_exact_term():
+    index = SearchIndex()
+    index.add_many([product("buket", "Kırmızı Gül Buketi"), product("gul", "Beyaz Gül"), product("guller", "Kutuda Güller")])
+
+    # "guller" tek belgede (yüksek idf) ama yazılan terim "gul"
+    assert index.search("gul")[1][-1] == "guller"
+
+
+def test_equal_scores_put_bestsellers_first():
+    index = SearchIndex()
+    index.add_many([product(f"p{i}", "Ayçiçeği Buketi", bestseller=i == 2) for i in range(4)])
+
+    assert index.search("aycicegi")[1] == ["p2", "p0", "p1", "p3"]
+
+
+def test_offset_and_limit(index):
+    total, everything = index.search("gul", limit=20)
+
+    assert index.search("gul", offset=1, limit=2) == (total, everything[1:3])
+    assert index.search("gul", offset=10) == (total, [])
+
+
+def test_update_and_remove(index):
+    index.add(product("papatya", "Beyaz Papatya", "", "papatya-gerbera"))
+    assert len(index) == 5
+    assert index.search("mevsim") == (0, [])
+    assert "papatya" in index.search("beyaz")[1]
+
+    index.remove("buket")
+    assert "buket" not in index
+    assert "buket" not in index.search("kirmizi")[1]
+    assert len(index) == 4
+
+
+def test_compaction_keeps_results(index):
+    before = index.search("gul")
+    index.remove("papatya")
+    index.compact()
+
+    assert index.search("gul") == before
+    assert index.search("mevsim") == (0, [])
+    assert "mevsim" not in index._postings
+
+
+def term_scores(index, term):
+    slots, scores = index._term_scores(term)
+    return {index._ids[slot]: float(score) for slot, score in zip(slots, scores)}
+
+
+def test_length_normalization_does_not_depend_on_insertion_order():
+    index = SearchIndex()
+    index.add(product("ilk", "Orkide", "saksıda orkide"))
+    for i in range(30):
+        index.add(product(f"uzun{i}", "Lilyum", "uzun açıklama " * 30))
+    index.add(product("son", "Orkide", "saksıda orkide"))
+
+    scores = term_scores(index, "orkide")
+    assert scores["ilk"] == scores["son"]
+    assert index.search("orkide") == (2, ["ilk", "son"])
+
+
+def test_batch_and_single_adds_normalize_to_the_final_average(index):
+    products = [product(f"p{i}", "Gül " * (1 + i % 4), "açıklama " * (i % 7)) for i in range(40)]
+    batched, single = SearchIndex(), SearchIndex()
+    batched.add_many(products)
+    for item in reversed(products):
+        single.add(item)
+    single.normalize()
+
+    assert batched._norm_length == pytest.approx(batched._total_length / len(batched))
+    expected = term_scores(batched, "gul")
+    assert term_scores(single, "gul") == pytest.approx(expected, rel=1e-6)
+
+    deferred = SearchIndex()
+    deferred.add_many(products[:20], normalize=False)
+    deferred.add_many(products[20:], normalize=False)
+    deferred.normalize()
+    assert term_scores(deferred, "gul") == pytest.approx(expected, rel=1e-6)
+
+
+def test_cached_prefix_group_is_dropped_on_writes(index):
+    index.PREFIX_CACHE_MIN_POSTINGS = 0
+    total, _ = index.search("pa")
+    assert "pa" in index._prefix_cache
+
+    index.add(product("yeni", "Pamuk Şeker Buketi"))
+    assert index.search("pa")[0] == total + 1
+    index.remove("papatya")
+    assert "papatya" not in index.search("pa")[1]
+    assert index.search("pa") == index.search("pa")
+
+
+@pytest.fixture
+def suggest():
+    index = SuggestIndex()
+    index.set_categories([{"name": "Kırmızı Gül", "slug": "kirmizi-gul"}, {"name": "Orkide", "slug": "orkide"}])
+    index.add_many([
+        product("p1", "Kırmızı Gül Buketi"),
+        product("p2", "Kırmızı Gül Buketi", bestseller=True),
+        product("p3", "Kırmızı Gerbera"),
+        product("p4", "Kutuda Kırmızı Güller"),
+        product("p5", "Mor Orkide"),
+    ])
+    return index
+
+
+def texts(results):
+    return [result["text"] for result in results]
+
+
+def test_suggest_ranks_categories_then_bestsellers_then_counts(suggest):
+    results = suggest.suggest("kır")
+
+    assert texts(results) == ["Kırmızı Gül", "Kırmızı Gül Buketi", "Kırmızı Gerbera", "Kutuda Kırmızı Güller"]
+    assert results[0] == {"type": "category", "text": "Kırmızı Gül", "slug": "kirmizi-gul"}
+    # Aynı başlık tek öneride birleşir; çok satan ürün id'si seçilir
+    assert results[1] == {"type": "product", "text": "Kırmızı Gül Buketi", "product_id": "p2", "count": 2}
+
+
+def test_suggest_matches_word_starts_and_limits(suggest):
+    assert texts(suggest.suggest("orkide")) == ["Orkide", "Mor Orkide"]
+    assert texts(suggest.suggest("gul b")) == ["Kırmızı Gül Buketi"]
+    assert texts(suggest.suggest("KIRMIZI G", limit=2)) == ["Kırmızı Gül", "Kırmızı Gül Buketi"]
+    assert suggest.suggest("zambak") == []
+    assert suggest.suggest("!!") == []
+
+
+def test_suggest_updates_on_add_and_remove(suggest):
+    suggest.add(product("p6", "Kırmızı Gerbera", bestseller=True))
+    assert texts(suggest.suggest("kir"))[1] == "Kırmızı Gerbera"
+
+    suggest.remove("p2")
+    suggest.remove("p1")
+    assert "Kırmızı Gül Buketi" not in texts(suggest.suggest("kir"))
+    # Başlığı değişen ürün eski önerisinden çıkar
+    suggest.add(product("p5", "Beyaz Orkide"))
+    assert texts(suggest.suggest("orkide")) == ["Orkide", "Beyaz Orkide"]
+
+
+def test_clear_products_keeps_categories(suggest):
+    suggest.clear_products()
+
+    assert texts(suggest.suggest("k")) == ["Kırmızı Gül"]
+
+
+def reference_top(products, categories, query, limit):
+    """Önbelleksiz, düz tarama ile beklenen öneri sırası"""
+    prefix = " ".join(tokenize(query))
+    records = {}
+    for name in categories:
+        records["c:" + " ".join(tokenize(name))] = (-(1 << 30), 0, len(name))
+    grouped = {}
+    for item in products.values():
+        grouped.setdefault("p:" + " ".join(tokenize(item["title"])), []).append(item)
+    for key, items in grouped.items():
+        records[key] = (-sum(i["is_bestseller"] for i in items), -len(items), len(items[0]["title"]))
+    matching = [
+        key for key in records
+        if any(" ".join(key[2:].split(" ")[start:]).startswith(prefix) for start in range(len(key[2:].split(" "))))
+    ]
+    return sorted(matching, key=lambda key: (*records[key], key))[:limit]
+
+
+def test_cached_prefixes_stay_correct_under_writes():
+    import random
+
+    rng = random.Random(7)
+    words = ["gul", "gül", "kirmizi", "kutu", "buket", "orkide", "gelin", "gonca", "kek", "beyaz"]
+    categories = ["Gül", "Kek"]
+    index = SuggestIndex()
+    index.SCAN_LIMIT = 0  # her aralık önbelleğe girsin
+    index.set_categories([{"name": name, "slug": name} for name in categories])
+    live = {}
+
+    def random_product():
+        item = product(f"p{rng.randrange(40)}", " ".join(rng.sample(words, rng.randint(1, 3))), bestseller=rng.random() < 0.3)
+        live[item["id"]] = item
+        return item
+
+    for _ in range(1500):
+        roll = rng.random()
+        if roll < 0.35:
+            index.add(random_product())
+        elif roll < 0.45:
+            index.add_many([random_product() for _ in range(rng.randint(1, 5))])
+        elif roll < 0.6:
+            product_id = f"p{rng.randrange(40)}"
+            index.remove(product_id)
+            live.pop(product_id, None)
+        else:
+            query = rng.choice(["g", "k", "gu", "gul", "b", "kirmizi g", "ke"])
+            limit = rng.choice([3, 8, 20])
+            got = ["p:" + " ".join(tokenize(r["text"])) if r["type"] == "product" else "c:" + " ".join(tokenize(r["text"]))
+                   for r in index.suggest(query, limit)]
+            assert got == reference_top(live, categories, query, limit), query
+    assert index._cache  # önbellek gerçekten kullanıldı
+
+
+def test_warm_fills_short_prefixes(suggest):
+    expected = {prefix: suggest.suggest(prefix) for prefix in ("k", "ku", "o")}
+    suggest.SCAN_LIMIT = 0
+    suggest.warm()
+
+    assert {"k", "ki", "ku", "o", "or", "m", "mo", "g", "gu"} <= set(suggest._cache)
+    assert {prefix: suggest.suggest(prefix) for prefix in expected} == expected